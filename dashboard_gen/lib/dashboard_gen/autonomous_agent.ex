@@ -19,6 +19,9 @@ defmodule DashboardGen.AutonomousAgent do
   # Agent states
   @idle :idle
   @planning :planning
+
+  # How often the agent asks the scraper's refresh schedule for due sources
+  @refresh_check_interval :timer.minutes(15)
   
   defstruct [
     :state,
@@ -26,7 +29,8 @@ defmodule DashboardGen.AutonomousAgent do
     :memory,
     :last_analysis,
     :priorities,
-    :scheduled_tasks
+    :scheduled_tasks,
+    :refresh_ref
   ]
   
   ## Public API
@@ -56,6 +60,7 @@ defmodule DashboardGen.AutonomousAgent do
   def init(_opts) do
     # Schedule periodic analysis every 4 hours
     Process.send_after(self(), :periodic_analysis, :timer.hours(4))
+    Process.send_after(self(), :refresh_due_sources, @refresh_check_interval)
     
     state = %__MODULE__{
       state: @idle,
@@ -63,7 +68,8 @@ defmodule DashboardGen.AutonomousAgent do
       memory: Memory.new(),
       last_analysis: nil,
       priorities: %{},
-      scheduled_tasks: []
+      scheduled_tasks: [],
+      refresh_ref: nil
     }
     
     Logger.info("🤖 Autonomous Agent started")
@@ -77,7 +83,8 @@ defmodule DashboardGen.AutonomousAgent do
       current_task: state.current_task,
       last_analysis: state.last_analysis,
       memory_size: Memory.size(state.memory),
-      scheduled_tasks: length(state.scheduled_tasks)
+      scheduled_tasks: length(state.scheduled_tasks),
+      refreshing_sources: state.refresh_ref != nil
     }
     {:reply, status, state}
   end
@@ -126,6 +133,31 @@ defmodule DashboardGen.AutonomousAgent do
     end
   end
   
+  @impl true
+  def handle_info(:refresh_due_sources, state) do
+    Process.send_after(self(), :refresh_due_sources, @refresh_check_interval)
+
+    # Sources learn their own publish rate, so only the ones due are fetched
+    # and the scraper is not started at all when none is; a run still in
+    # progress covers this tick
+    if state.refresh_ref == nil do
+      {:ok, pid} =
+        Task.start(fn ->
+          if Scrapers.any_sources_due?(), do: Scrapers.scrape_due(), else: :nothing_due
+        end)
+
+      {:noreply, %{state | refresh_ref: Process.monitor(pid)}}
+    else
+      {:noreply, state}
+    end
+  end
+
+  @impl true
+  def handle_info({:DOWN, ref, :process, _pid, reason}, %{refresh_ref: ref} = state) do
+    if reason != :normal, do: Logger.warning("🤖 Due-source refresh crashed: #{inspect(reason)}")
+    {:noreply, %{state | refresh_ref: nil}}
+  end
+
   ## Private Functions
   
   defp run_analysis_cycle(state) do
@@ -229,10 +261,10 @@ defmodule DashboardGen.AutonomousAgent do
     {:ok, actions}
   end
   
-  defp schedule_scraping(_company, priority) do
-    # Schedule immediate scraping for high priority
+  defp schedule_scraping(company, priority) do
+    # Schedule immediate scraping of just this company for high priority
     if priority == :high do
-      Task.async(fn -> Scrapers.scrape_all() end)
+      Task.async(fn -> Scrapers.scrape_company(company) end)
     end
   end
   
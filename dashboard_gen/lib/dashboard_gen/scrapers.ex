@@ -8,9 +8,21 @@ defmodule DashboardGen.Scrapers do
 
   @scripts ["scrape_all.py"]
 
+  # scrape_all.py cancels sources still running after this many seconds and
+  # returns what the others found; the process gets a grace period on top
+  # before the caller stops waiting for it
+  @run_deadline_s 300
+  @exit_grace_ms 60_000
+
+  # scrape_all.py only emits items that are new or changed since its last run
+  @script_args %{"scrape_all.py" => ["--incremental", "--deadline", "#{@run_deadline_s}"]}
+
   priv_dir = :code.priv_dir(:dashboard_gen) |> to_string()
   @scripts_path Path.join([priv_dir, "python", "scrapers"])
 
+  # Use absolute path to virtual environment
+  @venv_python "/Users/stephenszpak/workspace/nl-dashboard/dashboard_gen/venv/bin/python"
+
   @doc "Run all configured scraper scripts and company press releases"
   def scrape_all do
     require Logger
@@ -31,28 +43,150 @@ defmodule DashboardGen.Scrapers do
     Logger.info("Running scraper: #{path}")
 
     case File.exists?(path) do
-      true -> run_script(path, Path.rootname(script))
+      true -> run_script(path, Path.rootname(script), script_args(script))
       false -> {:error, :not_found}
     end
   end
 
+  @doc "Re-scrape one company (config slug or name) without paying for a full run"
+  def scrape_company(company) when is_binary(company) do
+    path = Path.join(@scripts_path, "scrape_all.py")
+
+    case File.exists?(path) do
+      true ->
+        args = script_args("scrape_all.py") ++ ["--company", company]
+        run_script(path, "scrape_all", args)
+
+      false ->
+        {:error, :not_found}
+    end
+  end
+
+  def scrape_company(_company), do: {:error, :invalid_company}
+
+  @doc "Scrape only the sources the refresh schedule expects to have published since their last check"
+  def scrape_due do
+    path = Path.join(@scripts_path, "scrape_all.py")
+
+    case File.exists?(path) do
+      true -> run_script(path, "scrape_all", script_args("scrape_all.py") ++ ["--due-only"])
+      false -> {:error, :not_found}
+    end
+  end
+
+  @doc "Each source's learned publish interval and next due time, soonest first"
+  def due_sources do
+    path = Path.join(@scripts_path, "scrape_all.py")
+
+    with true <- File.exists?(path),
+         {output, 0} <- System.cmd(@venv_python, [path, "--schedule-state"], stderr_to_stdout: false),
+         {:ok, sources} when is_list(sources) <- Jason.decode(output) do
+      {:ok, sources}
+    else
+      false -> {:error, :not_found}
+      {output, status} when is_integer(status) -> {:error, {:exit_status, status, output}}
+      other -> {:error, {:unexpected_output, other}}
+    end
+  end
+
+  @doc """
+  Whether a due-only scrape would fetch anything. True when a scheduled
+  source is due, and also when the schedule is empty or cannot be read,
+  since then nothing is known yet.
+  """
+  def any_sources_due? do
+    case due_sources() do
+      {:ok, []} -> true
+      {:ok, sources} -> Enum.any?(sources, & &1["due"])
+      {:error, _reason} -> true
+    end
+  end
+
+  # With `config :dashboard_gen, :scraper_sink_dir, "/path"` scrape_all.py also
+  # appends every item to the partitioned result store under that directory
+  # (query it with `python sink.py DIR query ...`)
+  defp script_args("scrape_all.py" = script) do
+    case Application.get_env(:dashboard_gen, :scraper_sink_dir) do
+      nil -> Map.get(@script_args, script, [])
+      dir -> Map.get(@script_args, script, []) ++ ["--sink", dir]
+    end
+  end
+
+  defp script_args(script), do: Map.get(@script_args, script, [])
+
   defp run_script(path, source, args \\ []) do
     require Logger
     Logger.debug("Running: #{path} #{Enum.join(args, " ")}")
-    
-    # Use absolute path to virtual environment
-    venv_python = "/Users/stephenszpak/workspace/nl-dashboard/dashboard_gen/venv/bin/python"
-    
-    {output, status} = System.cmd(venv_python, [path | args], stderr_to_stdout: false)
-    Logger.debug("Script result: status=#{status}, output_length=#{String.length(output)}")
+
+    # A port (rather than System.cmd in a task) exposes the OS pid, so a
+    # scraper that overruns can be killed instead of left running
+    port = Port.open({:spawn_executable, @venv_python}, [:binary, :exit_status, args: [path | args]])
+    deadline = System.monotonic_time(:millisecond) + @run_deadline_s * 1000 + @exit_grace_ms
+
+    case collect_output(port, deadline, []) do
+      {:ok, output, status} ->
+        Logger.debug("Script result: status=#{status}, output_length=#{String.length(output)}")
+        handle_output(source, output)
+
+      :timeout ->
+        kill_port(port)
+        Logger.error("Scraper #{path} did not finish within #{@run_deadline_s}s, killed it")
+        {:error, :timeout}
+    end
+  end
+
+  defp collect_output(port, deadline, acc) do
+    wait = max(deadline - System.monotonic_time(:millisecond), 0)
+
+    receive do
+      {^port, {:data, data}} -> collect_output(port, deadline, [acc | data])
+      {^port, {:exit_status, status}} -> {:ok, IO.iodata_to_binary(acc), status}
+    after
+      wait -> :timeout
+    end
+  end
+
+  defp kill_port(port) do
+    case Port.info(port, :os_pid) do
+      {:os_pid, pid} -> System.cmd("kill", ["-KILL", Integer.to_string(pid)], stderr_to_stdout: true)
+      nil -> :ok
+    end
+
+    try do
+      Port.close(port)
+    rescue
+      ArgumentError -> :ok
+    end
+
+    flush_port(port)
+  end
+
+  defp flush_port(port) do
+    receive do
+      {^port, _} -> flush_port(port)
+    after
+      0 -> :ok
+    end
+  end
+
+  defp handle_output(source, output) do
+    require Logger
 
     case Jason.decode(output) do
-      {:ok, data} ->
-        Logger.debug("Successfully parsed #{map_size(data)} data items")
+      {:ok, %{"items" => items} = payload} ->
+        watermarks = Map.get(payload, "watermarks", [])
+        Logger.debug("Scraper run: #{length(items)} items, #{length(watermarks)} source watermarks")
+        record_fetch_metrics(Map.get(payload, "metrics"))
+        log_skipped_sources(Map.get(payload, "skipped", []))
+        store_items(source, items)
 
-        %Insight{}
-        |> Insight.changeset(%{source: source, data: data})
-        |> Repo.insert()
+      {:ok, data} when is_list(data) ->
+        Logger.debug("Successfully parsed #{length(data)} data items")
+        store_items(source, data)
+
+      {:ok, other} ->
+        Logger.error("Unexpected scraper output: #{inspect(other)}")
+        {:error, {:unexpected_output, other}}
 
       {:error, reason} ->
         Logger.error("JSON parse error: #{inspect(reason)}")
@@ -60,4 +194,39 @@ defmodule DashboardGen.Scrapers do
         {:error, {reason, output}}
     end
   end
+
+  # Per-host fetch timings from the scraper's metrics summary feed the
+  # AgentMonitor's request/success counters
+  defp record_fetch_metrics(%{"hosts" => hosts} = metrics) when is_map(hosts) do
+    require Logger
+
+    Logger.info(
+      "Scraper fetched #{metrics["fetches"]} URLs (#{metrics["bytes"]} bytes, #{metrics["retries"]} retries)"
+    )
+
+    Enum.each(hosts, fn {host, stats} ->
+      result = if stats["errors"] > 0, do: :error, else: :success
+      DashboardGen.AgentMonitor.record_request({:scraper_fetch, host}, stats["p50_ms"], result)
+    end)
+  end
+
+  defp record_fetch_metrics(_), do: :ok
+
+  # Sources cut off by the run deadline ("partial": true); their items arrive on a later run
+  defp log_skipped_sources([]), do: :ok
+
+  defp log_skipped_sources(skipped) do
+    require Logger
+
+    sources = Enum.map_join(skipped, ", ", fn s -> "#{s["company"]}/#{s["source"]} (#{s["reason"]})" end)
+    Logger.warning("Scraper deadline skipped #{length(skipped)} sources: #{sources}")
+  end
+
+  defp store_items(_source, []), do: {:ok, :no_new_items}
+
+  defp store_items(source, items) do
+    %Insight{}
+    |> Insight.changeset(%{source: source, data: items})
+    |> Repo.insert()
+  end
 end
@@ -0,0 +1,253 @@
+"""Offline scraper benchmarks against recorded fixtures.
+
+Measures, without touching any live site:
+
+* parse throughput of every site adapter and of the RSS/Atom feed parser
+  used by ``scrape_press_releases`` and ``scrape_youtube``
+* end-to-end ``scrape_all`` wall time, peak traced memory, request count and
+  item count, against a local stand-in server, once with a clean network
+  and once with latency, 500s and 429s injected
+
+Each end-to-end scenario runs in a fresh subprocess with its own state
+directory, so limiter, breaker and cache state never leak between runs.
+
+Usage::
+
+    python bench.py                     # run and compare against baselines.json
+    python bench.py --update-baselines  # record the current numbers
+    python bench.py --only parse        # parse benchmarks only
+
+The exit status is 1 when any metric regresses beyond its tolerance.
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scrapers"))
+
+# Never let a benchmark read or write the real scraper state
+if "SCRAPER_STATE_DIR" not in os.environ:
+    os.environ["SCRAPER_STATE_DIR"] = tempfile.mkdtemp(prefix="scraper-bench-")
+    atexit.register(shutil.rmtree, os.environ["SCRAPER_STATE_DIR"], True)
+
+from server import FIXTURES_DIR, Faults, FixtureServer, fixture_urls, mount
+
+from adapters import adapter_for
+from concurrency import configure_limits
+from dedup import Deduplicator
+from discovery import configure_discovery
+from http_cache import configure_cache
+from http_client import DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, configure_client, connection_stats
+from parse_stage import DEFAULT_PARSE_WORKERS, configure_parse_stage, shutdown_parse_stage
+from parsers import BACKENDS, FeedCollector, configure_parser, parser_backend
+from ratelimit import configure_rate_limits
+from scrape_all import scrape_all
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+MIN_PARSE_SECONDS = 0.5
+
+SCENARIOS: Dict[str, Faults] = {
+    "clean": Faults(latency=0.02),
+    "faulty": Faults(latency=0.05, jitter=0.05, error_rate=0.1, throttle_rate=0.1, retry_after="1", seed=7),
+}
+
+# Default allowed relative regression by metric suffix; baselines may override per metric
+TOLERANCES = {
+    "mb_per_s": 0.3,
+    "wall_s": 0.5,
+    "peak_kb": 0.2,
+    "requests": 0.0,
+    "items": 0.0,
+}
+# Metrics where a bigger number is better
+HIGHER_IS_BETTER = ("mb_per_s", "items")
+
+
+def _time_parse(fn, body: bytes) -> float:
+    """Megabytes per second for ``fn(body)``, repeated for at least MIN_PARSE_SECONDS."""
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        fn(body)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_PARSE_SECONDS:
+            return round(runs * len(body) / elapsed / 1e6, 2)
+
+
+def _parse_feed(body: bytes) -> None:
+    # The same collector scrape_press_releases/scrape_youtube stream into,
+    # with no limit so the whole document is parsed
+    collector = FeedCollector(sys.maxsize)
+    collector.feed(body)
+
+
+def parse_benchmarks() -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    seen = set()
+    for entry in fixture_urls():
+        if entry["file"] in seen:
+            continue
+        seen.add(entry["file"])
+        body = (FIXTURES_DIR / entry["file"]).read_bytes()
+        if "xml" in entry["content_type"]:
+            name = "feed_atom" if "atom" in entry["content_type"] else "feed_rss"
+            metrics[f"parse.{name}.mb_per_s"] = _time_parse(_parse_feed, body)
+        else:
+            adapter = adapter_for(entry["url"])
+            url = entry["url"]
+            metrics[f"parse.{adapter.name}.mb_per_s"] = _time_parse(lambda b: adapter.parse(b, url, "Bench"), body)
+    return metrics
+
+
+def run_scenario(name: str, workers: int, parse_workers: int, trace_memory: bool) -> Dict[str, Any]:
+    """One ``scrape_all`` run against the stand-in server (called in a subprocess)."""
+    server = FixtureServer(faults=SCENARIOS[name]).start()
+    try:
+        configure_parse_stage(parse_workers)
+        configure_limits()
+        configure_rate_limits(rate=1000, burst=1000)
+        configure_cache(False)
+        # Probing for feeds happens once per discovery TTL; measure the steady state
+        configure_discovery(False)
+        session = configure_client()
+        mount(session, server.port, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE)
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        items = scrape_all(workers, dedup=Deduplicator())
+        wall = time.perf_counter() - started
+        result = {
+            "wall_s": round(wall, 3),
+            "requests": server.total_requests(),
+            "items": len(items),
+            "client_requests": connection_stats()["requests"],
+            "statuses": {str(status): count for status, count in sorted(server.statuses.items())},
+        }
+        if trace_memory:
+            result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+        return result
+    finally:
+        shutdown_parse_stage()
+        server.stop()
+
+
+def _scenario_subprocess(name: str, workers: int, parse_workers: int, trace_memory: bool) -> Dict[str, Any]:
+    state_dir = tempfile.mkdtemp(prefix="scraper-bench-")
+    env = dict(os.environ, SCRAPER_STATE_DIR=state_dir, YOUTUBE_API_KEY="bench")
+    args = [sys.executable, __file__, "--scenario", name, "--workers", str(workers),
+            "--parse-workers", str(parse_workers), "--parser", parser_backend()]
+    if trace_memory:
+        args.append("--trace-memory")
+    try:
+        output = subprocess.run(args, env=env, check=True, capture_output=True, text=True).stdout
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def e2e_benchmarks(workers: int, parse_workers: int) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    for name in SCENARIOS:
+        # Timing and memory come from separate runs: tracing slows every allocation
+        timed = _scenario_subprocess(name, workers, parse_workers, trace_memory=False)
+        traced = _scenario_subprocess(name, workers, parse_workers, trace_memory=True)
+        metrics[f"e2e.{name}.wall_s"] = timed["wall_s"]
+        metrics[f"e2e.{name}.peak_kb"] = traced["peak_kb"]
+        metrics[f"e2e.{name}.requests"] = timed["requests"]
+        metrics[f"e2e.{name}.items"] = timed["items"]
+    return metrics
+
+
+def _tolerance(name: str) -> float:
+    return TOLERANCES[name.rsplit(".", 1)[-1]]
+
+
+def compare(metrics: Dict[str, float], baselines: Dict[str, Any]) -> List[str]:
+    """Descriptions of every metric that regressed beyond its tolerance."""
+    regressions = []
+    for name, value in sorted(metrics.items()):
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        expected = baseline["value"]
+        tolerance = baseline.get("tolerance", _tolerance(name))
+        if name.endswith(HIGHER_IS_BETTER):
+            regressed = value < expected * (1 - tolerance)
+        else:
+            regressed = value > expected * (1 + tolerance)
+        if regressed:
+            regressions.append(f"{name}: {value} vs baseline {expected} (tolerance {tolerance:.0%})")
+    return regressions
+
+
+def load_baselines() -> Dict[str, Any]:
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())["metrics"]
+
+
+def save_baselines(metrics: Dict[str, float], previous: Dict[str, Any]) -> None:
+    merged = dict(previous)
+    for name, value in metrics.items():
+        entry = {"value": value}
+        if "tolerance" in previous.get(name, {}):
+            entry["tolerance"] = previous[name]["tolerance"]
+        merged[name] = entry
+    document = {"parser": parser_backend(), "python": sys.version.split()[0], "metrics": dict(sorted(merged.items()))}
+    BASELINES_PATH.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("--only", choices=("parse", "e2e"), help="run one benchmark group")
+    parser.add_argument("--workers", type=int, default=16, help="scrape_all worker threads")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="parse processes for scrape_all (baselines are recorded with its default)")
+    parser.add_argument("--parser", choices=BACKENDS, default=parser_backend(), help="HTML parser backend")
+    parser.add_argument("--update-baselines", action="store_true", help="write the measured numbers to baselines.json")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_parser(args.parser)
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.workers, args.parse_workers, args.trace_memory)))
+        return 0
+
+    metrics: Dict[str, float] = {}
+    if args.only in (None, "parse"):
+        metrics.update(parse_benchmarks())
+    if args.only in (None, "e2e"):
+        metrics.update(e2e_benchmarks(args.workers, args.parse_workers))
+
+    baselines = load_baselines()
+    for name, value in sorted(metrics.items()):
+        baseline = baselines.get(name, {}).get("value", "-")
+        print(f"{name:<36} {value:>12} {baseline:>12}")
+
+    if args.update_baselines:
+        save_baselines(metrics, baselines)
+        print(f"baselines written to {BASELINES_PATH}")
+        return 0
+    regressions = compare(metrics, baselines)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
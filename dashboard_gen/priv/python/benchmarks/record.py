@@ -0,0 +1,59 @@
+"""Re-record the benchmark fixtures from the live sites in scrape_config_urls.json.
+
+Every configured press release page, RSS feed and YouTube channel feed is
+fetched once and written to ``fixtures/``; ``fixtures/index.json`` maps the
+original URLs to the files. Entries for URLs that are not configured (such
+as adapter-only fixtures) are kept. Refresh baselines afterwards.
+"""
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scrapers"))
+
+from server import FIXTURES_DIR, fixture_urls
+
+from base import load_config, youtube_feed_url
+from http_client import get_session
+
+
+def configured_urls() -> List[str]:
+    urls: List[str] = []
+    for config in load_config().values():
+        for key in ("press_releases", "rss"):
+            value = config.get(key) or []
+            urls.extend([value] if isinstance(value, str) else value)
+        if config.get("youtube"):
+            urls.append(youtube_feed_url(config["youtube"]))
+    return urls
+
+
+def _file_name(url: str, content_type: str) -> str:
+    stem = re.sub(r"[^a-z0-9]+", "_", url.split("://", 1)[-1].lower()).strip("_")
+    return stem + (".xml" if "xml" in content_type else ".html")
+
+
+def record() -> None:
+    entries: Dict[str, Dict[str, str]] = {entry["url"]: entry for entry in fixture_urls()}
+    session = get_session()
+    for url in configured_urls():
+        try:
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+        except Exception as e:
+            logging.warning("could not record %s: %s", url, e)
+            continue
+        content_type = response.headers.get("Content-Type", "text/html")
+        name = _file_name(url, content_type)
+        (FIXTURES_DIR / name).write_bytes(response.content)
+        entries[url] = {"url": url, "file": name, "content_type": content_type}
+        logging.info("recorded %s (%d bytes)", url, len(response.content))
+    (FIXTURES_DIR / "index.json").write_text(json.dumps(list(entries.values()), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    record()
@@ -0,0 +1,179 @@
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scrapers"))
+
+from http_client import PooledAdapter
+
+FIXTURES_DIR = Path(__file__).with_name("fixtures")
+YOUTUBE_API_PATH = "www.googleapis.com/youtube/v3/videos"
+
+
+def fixture_key(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.netloc.lower() + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def load_fixtures(directory: Path = FIXTURES_DIR) -> Dict[str, Tuple[bytes, str]]:
+    """Recorded responses keyed by ``host/path?query``: (body, content type)."""
+    entries = json.loads((directory / "index.json").read_text())
+    return {
+        fixture_key(entry["url"]): ((directory / entry["file"]).read_bytes(), entry["content_type"])
+        for entry in entries
+    }
+
+
+def fixture_urls(directory: Path = FIXTURES_DIR) -> List[Dict[str, str]]:
+    return json.loads((directory / "index.json").read_text())
+
+
+@dataclass
+class Faults:
+    """Per-request fault injection for the stand-in server."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: str = "1"
+    seed: int = 0
+
+
+def _videos_response(query: str) -> bytes:
+    # Stand-in for the YouTube Data API videos.list endpoint
+    ids = parse_qs(query).get("id", [""])[0].split(",")
+    items = [
+        {
+            "id": video_id,
+            "statistics": {"viewCount": str(1000 + i), "likeCount": str(10 + i), "commentCount": str(i)},
+            "snippet": {"publishedAt": "2025-01-01T00:00:00Z"},
+            "contentDetails": {"duration": "PT3M"},
+        }
+        for i, video_id in enumerate(ids)
+        if video_id
+    ]
+    return json.dumps({"items": items}).encode()
+
+
+class FixtureServer:
+    """Local HTTP stand-in serving recorded responses at ``/<host>/<path>``.
+
+    Adds configurable latency, 500s and 429s (with Retry-After), answers
+    conditional requests with 304, and counts every request by host and status.
+    """
+
+    def __init__(self, fixtures: Dict[str, Tuple[bytes, str]] | None = None, faults: Faults | None = None):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.faults = faults or Faults()
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _roll(self) -> Tuple[float, float]:
+        with self._lock:
+            return self._random.random(), self._random.uniform(0, self.faults.jitter)
+
+    def _record(self, host: str, status: int) -> None:
+        with self._lock:
+            self.requests[host] += 1
+            self.statuses[status] += 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes = b"", headers: Dict[str, str] | None = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                key = self.path.lstrip("/")
+                host = key.split("/", 1)[0]
+                faults = server.faults
+                roll, jitter = server._roll()
+                time.sleep(faults.latency + jitter)
+
+                if roll < faults.throttle_rate:
+                    server._record(host, 429)
+                    return self._send(429, headers={"Retry-After": faults.retry_after})
+                if roll < faults.throttle_rate + faults.error_rate:
+                    server._record(host, 500)
+                    return self._send(500)
+
+                path, _, query = key.partition("?")
+                if path == YOUTUBE_API_PATH:
+                    body, content_type = _videos_response(query), "application/json"
+                elif key in server.fixtures:
+                    body, content_type = server.fixtures[key]
+                else:
+                    server._record(host, 404)
+                    return self._send(404)
+
+                etag = '"%08x"' % zlib.crc32(body)
+                if self.headers.get("If-None-Match") == etag:
+                    server._record(host, 304)
+                    return self._send(304, headers={"ETag": etag})
+                server._record(host, 200)
+                self._send(200, body, {"Content-Type": content_type, "ETag": etag})
+
+        return Handler
+
+
+class RewriteAdapter(PooledAdapter):
+    """Sends every request to the local FixtureServer instead of the real host."""
+
+    def __init__(self, port: int, **kwargs):
+        self.port = port
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        query = f"?{parts.query}" if parts.query else ""
+        request.url = f"http://127.0.0.1:{self.port}/{parts.netloc}{parts.path}{query}"
+        return super().send(request, **kwargs)
+
+
+def mount(session, port: int, **kwargs) -> None:
+    """Route a session's HTTP and HTTPS traffic to the stand-in server."""
+    adapter = RewriteAdapter(port, **kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
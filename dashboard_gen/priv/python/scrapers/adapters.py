@@ -0,0 +1,185 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import soupsieve
+
+from parsers import make_strainer, parse_html, parse_tree, use_xpath
+
+ADAPTERS_PATH = Path(__file__).with_name("site_adapters.json")
+GENERIC_ADAPTER = "generic"
+
+
+def _compile(selector: Optional[str]):
+    return soupsieve.compile(selector) if selector else None
+
+
+class Strategy:
+    """One precompiled item selector plus the per-item title/link/date selectors."""
+
+    def __init__(self, spec: Dict[str, Any], default_limit: int):
+        self.items = soupsieve.compile(spec["items"])
+        # Without a title selector the matched element is the title; without a
+        # link selector the title element carries the href
+        self.title = _compile(spec.get("title"))
+        self.link = _compile(spec.get("link"))
+        self.date = _compile(spec.get("date"))
+        self.limit = spec.get("limit", default_limit)
+
+
+class XPathStrategy:
+    """Strategy evaluated with precompiled XPath on a raw lxml tree."""
+
+    def __init__(self, spec: Dict[str, Any], default_limit: int):
+        from lxml import etree
+
+        compile_xpath = lambda expr: etree.XPath(expr) if expr else None
+        self.items = etree.XPath(spec["items"])
+        self.title = compile_xpath(spec.get("title"))
+        self.link = compile_xpath(spec.get("link"))
+        self.date = compile_xpath(spec.get("date"))
+        self.limit = spec.get("limit", default_limit)
+
+
+def _first(xpath, el):
+    if xpath is None:
+        return el
+    found = xpath(el)
+    return found[0] if found else None
+
+
+def _text(el) -> str:
+    # Same result as BeautifulSoup's get_text(strip=True)
+    return "".join(t.strip() for t in el.itertext())
+
+
+class SiteAdapter:
+    """Extracts press release items from a newsroom page for one site."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec["name"]
+        self.hosts = [host.lower() for host in spec.get("hosts", [])]
+        self.limit = spec.get("limit", 10)
+        self.first_match = spec.get("first_match", False)
+        self.min_title_length = spec.get("min_title_length", 1)
+        self.strategies = [Strategy(s, self.limit) for s in spec["strategies"]]
+        # Only the declared subtrees are built when parsing this site's pages
+        self.parse_only = make_strainer(spec.get("parse_only"))
+        self.xpath_strategies = [XPathStrategy(s, self.limit) for s in spec.get("xpath", [])]
+
+    def parse(self, body: bytes, page_url: str, company: str) -> List[Dict[str, Any]]:
+        """Parse a raw page with the configured backend and extract its items."""
+        if self.xpath_strategies and use_xpath():
+            return self.extract_tree(parse_tree(body), page_url, company)
+        return self.extract(parse_html(body, self.parse_only), page_url, company)
+
+    def _item(self, company: str, page_url: str, title: str, href: str, date: str) -> Dict[str, Any]:
+        return {
+            "source": "press_release",
+            "company": company,
+            "date": date,
+            "title": title,
+            "content": "",
+            "url": urljoin(page_url, href),
+        }
+
+    def extract_tree(self, tree, page_url: str, company: str) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for strategy in self.xpath_strategies:
+            matches = strategy.items(tree)
+            if strategy.limit:
+                matches = matches[:strategy.limit]
+            for item in matches:
+                title_el = _first(strategy.title, item)
+                link_el = _first(strategy.link, item) if strategy.link else title_el
+                if title_el is None or link_el is None:
+                    continue
+                title = _text(title_el)
+                href = link_el.get("href", "")
+                if not href or len(title) < self.min_title_length:
+                    continue
+                date_el = _first(strategy.date, item) if strategy.date else None
+                results.append(self._item(company, page_url, title, href, _text(date_el) if date_el is not None else ""))
+            if matches and self.first_match:
+                break
+        return results[:self.limit]
+
+    def extract(self, soup, page_url: str, company: str) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for strategy in self.strategies:
+            matches = strategy.items.select(soup, limit=strategy.limit)
+            for item in matches:
+                title_el = strategy.title.select_one(item) if strategy.title else item
+                link_el = strategy.link.select_one(item) if strategy.link else title_el
+                if not title_el or not link_el:
+                    continue
+                title = title_el.get_text(strip=True)
+                href = link_el.get("href", "")
+                if not href or len(title) < self.min_title_length:
+                    continue
+                date_el = strategy.date.select_one(item) if strategy.date else None
+                results.append(self._item(company, page_url, title, href, date_el.get_text(strip=True) if date_el else ""))
+            if matches and self.first_match:
+                break  # Use first successful selector
+        return results[:self.limit]
+
+
+class AdapterRegistry:
+    """Hostname-keyed adapters; subdomains resolve to their parent site's adapter."""
+
+    def __init__(self, specs: List[Dict[str, Any]]):
+        self._by_host: Dict[str, SiteAdapter] = {}
+        self._by_name: Dict[str, SiteAdapter] = {}
+        for spec in specs:
+            adapter = SiteAdapter(spec)
+            self._by_name[adapter.name] = adapter
+            for host in adapter.hosts:
+                self._by_host[host] = adapter
+        self.default = self._by_name[GENERIC_ADAPTER]
+
+    def get(self, name: str) -> Optional[SiteAdapter]:
+        return self._by_name.get(name)
+
+    def for_url(self, url: str) -> SiteAdapter:
+        host = (urlparse(url).hostname or "").lower()
+        labels = host.split(".")
+        # newsroom.fidelity.com -> fidelity.com -> com: one dict probe per label
+        for i in range(len(labels)):
+            adapter = self._by_host.get(".".join(labels[i:]))
+            if adapter:
+                return adapter
+        return self.default
+
+
+_registry: Optional[AdapterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def load_adapters(path: Path = ADAPTERS_PATH) -> AdapterRegistry:
+    with open(path) as f:
+        return AdapterRegistry(json.load(f))
+
+
+def get_registry() -> AdapterRegistry:
+    """Return the process-wide registry; selectors are compiled on first use only."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = load_adapters()
+    return _registry
+
+
+def reload_adapters() -> AdapterRegistry:
+    """Re-read site_adapters.json and recompile every selector."""
+    global _registry
+    registry = load_adapters()
+    with _registry_lock:
+        _registry = registry
+    return registry
+
+
+def adapter_for(url: str) -> SiteAdapter:
+    return get_registry().for_url(url)
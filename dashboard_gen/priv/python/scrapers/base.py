@@ -1,32 +1,66 @@
 import json
 import logging
-import re
 import sys
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from pathlib import Path
-from typing import List, Dict, Any
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 from urllib.parse import urljoin, urlparse, parse_qs
-import ssl
-import certifi
-import urllib3
 import os
-
-urllib3.disable_warnings()
-ssl_context = ssl.create_default_context(cafile=certifi.where())
-verify_ssl = False if os.getenv("SCRAPER_DEV_MODE") else certifi.where()
+import time
 
 import requests
-from bs4 import BeautifulSoup
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+from adapters import adapter_for
+from concurrency import fetch_slot
+from deadline import DeadlineExceeded, check_deadline, remaining
+from dedup import Deduplicator
+from discovery import (
+    CHANNEL,
+    FEED,
+    NOTHING,
+    SITEMAP,
+    YOUTUBE_FEED,
+    ChannelIdCollector,
+    candidate_feed_urls,
+    feed_links,
+    get_discovery,
+    news_children,
+    robots_url,
+    sitemap_urls,
+    under_page,
+)
+from http_cache import get_cache
+from http_client import get_session
+from metrics import FetchRecord, current_fetch, get_metrics
+from names import slugify
+from parse_stage import parse_page
+from parsers import FeedCollector, news_sitemap_entries, parse_html
+from ratelimit import (
+    HOST_FAILURE_STATUSES,
+    RETRYABLE_STATUSES,
+    CircuitOpenError,
+    Requeue,
+    RetryLater,
+    backoff_delay,
+    breaker,
+    current_requeue,
+    limiter,
+    parse_retry_after,
+)
+from youtube_metrics import get_metrics_service
+
+CHUNK_SIZE = 16 * 1024
+# Per-request socket timeout, shortened to whatever is left of the time budget
+FETCH_TIMEOUT = 15
+MAX_RESPONSE_BYTES = int(os.getenv("SCRAPER_MAX_RESPONSE_BYTES", str(5 * 1024 * 1024)))
 CONFIG_PATH = Path(__file__).with_name("scrape_config_urls.json")
+# Newest entries taken from a press feed or news sitemap
+FEED_ITEMS = 10
 
 logging.basicConfig(stream=sys.stderr, level=logging.INFO)
 
 
-def slugify(name: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
-
-
 def normalize_company_name(name: str) -> str:
     """Normalize company names to ensure consistency."""
     name = name.strip()
@@ -64,48 +98,32 @@ def extract_youtube_video_id(url: str) -> str:
     return ""
 
 
-def get_youtube_video_metrics(video_ids: List[str], api_key: str = None) -> Dict[str, Dict]:
-    """Fetch YouTube video metrics using YouTube Data API v3."""
-    if not video_ids or not api_key:
-        return {}
+def attach_youtube_metrics(items: List[Dict[str, Any]], api_key: str = None) -> List[Dict[str, Any]]:
+    """Look up engagement metrics for every YouTube item in one batched call and merge them in."""
+    service = get_metrics_service(api_key)
+    if not service:
+        return items
     
-    # Remove empty video IDs
-    video_ids = [vid for vid in video_ids if vid]
-    if not video_ids:
-        return {}
+    # Extract each video ID once, then fetch all of them together
+    by_id: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        if item.get("source") == "social_media" and "youtube.com" in item.get("url", ""):
+            video_id = extract_youtube_video_id(item["url"])
+            if video_id:
+                by_id.setdefault(video_id, []).append(item)
+    if not by_id:
+        return items
     
     try:
-        # YouTube Data API v3 endpoint
-        api_url = "https://www.googleapis.com/youtube/v3/videos"
-        params = {
-            "part": "statistics,snippet",
-            "id": ",".join(video_ids),
-            "key": api_key
-        }
-        
-        response = requests.get(api_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        metrics = {}
-        for item in data.get("items", []):
-            video_id = item["id"]
-            stats = item.get("statistics", {})
-            snippet = item.get("snippet", {})
-            
-            metrics[video_id] = {
-                "view_count": int(stats.get("viewCount", 0)),
-                "like_count": int(stats.get("likeCount", 0)),
-                "comment_count": int(stats.get("commentCount", 0)),
-                "duration": snippet.get("duration", ""),
-                "published_at": snippet.get("publishedAt", "")
-            }
-        
-        return metrics
-        
+        metrics = service.fetch(list(by_id))
     except Exception as e:
-        logging.warning("YouTube API request failed: %s", e)
-        return {}
+        logging.warning("YouTube metrics fetch failed: %s", e)
+        return items
+    for video_id, video_items in by_id.items():
+        if video_id in metrics:
+            for item in video_items:
+                item.update(metrics[video_id])
+    return items
 
 
 def load_config() -> Dict[str, Dict[str, Any]]:
@@ -118,197 +136,417 @@ def load_config() -> Dict[str, Dict[str, Any]]:
     return config
 
 
-def _fetch(url: str, retries: int = 3, delay: float = 1.0) -> BeautifulSoup | None:
-    import time
+def _read_stream(res: requests.Response, url: str, sink=None) -> Tuple[bytes, bool]:
+    """Read a streamed response, stopping once the sink is satisfied or the size cap is hit.
+
+    Returns the bytes read and whether that is the whole body (read to EOF).
+    """
+    chunks: List[bytes] = []
+    size = 0
+    started = time.perf_counter()
+    sink_seconds = 0.0
+    complete = False
+    for chunk in res.iter_content(CHUNK_SIZE):
+        # A slow trickle of bytes never trips the socket timeout, so check here too
+        check_deadline()
+        chunks.append(chunk)
+        size += len(chunk)
+        if sink is not None:
+            fed = time.perf_counter()
+            done = sink.feed(chunk)
+            sink_seconds += time.perf_counter() - fed
+            if done:
+                break
+        if size >= MAX_RESPONSE_BYTES:
+            logging.warning("response from %s exceeded %d bytes, truncating", url, MAX_RESPONSE_BYTES)
+            break
+    else:
+        complete = True
+    record = current_fetch()
+    if record is not None:
+        # Time spent parsing inside the sink is reported by the scraper, not as download
+        record.add("download_ms", time.perf_counter() - started - sink_seconds)
+        record.bytes += size
+    return b"".join(chunks), complete
+
+
+def _get_body(url: str, sink=None, requeue: Requeue | None = None) -> bytes:
+    """GET a URL through the response cache, revalidating stale entries.
+    
+    With a ``sink`` (an object with ``feed(chunk) -> bool``) the body is
+    streamed into it and reading stops as soon as it returns True. With a
+    ``requeue`` a long wait for the host raises RetryLater instead of
+    sleeping.
+    """
+    record = current_fetch()
+    cache = get_cache()
+    entry = cache.get(url) if cache else None
+    if entry and entry.is_fresh(cache.ttl):
+        cache.record("hit")
+        if record is not None:
+            record.outcome = "hit"
+        if sink is not None:
+            sink.feed(entry.body)
+        return entry.body
     
-    for attempt in range(retries):
+    host = urlparse(url).netloc.lower()
+    if not breaker.allow(host):
+        raise CircuitOpenError(f"circuit open for {host}")
+    # Wait for this host's token bucket (and any Retry-After pause or retry
+    # backoff) before taking a connection slot, so other hosts keep their
+    # full throughput. Short waits are slept; a long one under a requeue
+    # keeps its booked slot and hands the thread back until the slot is due.
+    queued = time.perf_counter()
+    wait = requeue.held_wait(url) if requeue is not None else None
+    if wait is None:
+        wait = limiter.reserve(host)
+    left = remaining()
+    if left is not None and wait >= left:
+        raise DeadlineExceeded(f"{host} is held back past the time budget")
+    if requeue is not None and wait >= requeue.min_wait:
+        requeue.hold(url, wait)
+        raise RetryLater(host, wait)
+    if wait > 0:
+        time.sleep(wait)
+    
+    # The pooled session carries realistic browser headers and keeps
+    # connections (and their TLS sessions) alive between fetches
+    headers = entry.conditional_headers() if entry else {}
+    with fetch_slot(url):
+        sent = time.perf_counter()
+        setup_before = record.setup_ms() if record else 0.0
+        res = get_session().get(url, headers=headers, timeout=remaining(FETCH_TIMEOUT), stream=True)
+        if record is not None:
+            record.add("wait_ms", sent - queued)
+            # Headers are in: what is not connection setup is server wait
+            setup_ms = record.setup_ms() - setup_before
+            record.add("ttfb_ms", max(0.0, time.perf_counter() - sent - setup_ms / 1000))
+            record.status = res.status_code
         try:
-            # Add more realistic headers to avoid bot detection
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Accept-Encoding": "gzip, deflate",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-            
-            res = requests.get(url, headers=headers, timeout=15, verify=verify_ssl)
+            if entry and res.status_code == 304:
+                cache.refresh(url, res.headers)
+                cache.record("revalidated")
+                if record is not None:
+                    record.outcome = "revalidated"
+                if sink is not None:
+                    sink.feed(entry.body)
+                return entry.body
             res.raise_for_status()
+            body, complete = _read_stream(res, url, sink)
+        finally:
+            res.close()
+    
+    if cache:
+        # A body cut short by a sink or the size cap is not the resource; a
+        # later hit or 304 replaying it would hand other readers a stub
+        if complete:
+            cache.store(url, body, res.headers)
+        cache.record("miss")
+    if record is not None:
+        record.outcome = "miss"
+    return body
+
+
+def _fetch_body(url: str, retries: int = 3, delay: float = 1.0, sink=None) -> bytes | None:
+    """Fetch a URL with retries; None when it failed.
+
+    Under a ``requeue_scope`` long waits raise RetryLater, and a fetch the
+    requeued work already finished returns the same answer without going
+    to the network again.
+    """
+    requeue = current_requeue()
+    if requeue is not None and url in requeue.fetched:
+        body, cut_short = requeue.fetched[url]
+        if body is None or sink is not None or not cut_short:
+            if sink is not None and body is not None:
+                sink.reset()
+                sink.feed(body)
+            return body
+    with get_metrics().fetch(url) as record:
+        try:
+            body = _fetch_with_retries(url, record, retries, delay, sink, requeue)
+        finally:
+            # A breaker trial that ended in a 404, a deadline or similar says
+            # nothing about the host; let the next request try instead
+            breaker.release(record.host)
+    if requeue is not None:
+        # A sink may have stopped the read early; only a sink can reuse that
+        requeue.fetched[url] = (body, sink is not None)
+    return body
+
+
+def _fetch_with_retries(url: str, record: FetchRecord, retries: int, delay: float, sink,
+                        requeue: Requeue | None = None) -> bytes | None:
+    host = record.host
+    # A requeued fetch carries on from the attempt it was waiting to make
+    start = requeue.attempts.pop(url, 0) if requeue is not None else 0
+    
+    for attempt in range(start, retries):
+        record.attempts = attempt + 1
+        record.outcome = "error"
+        retry_after = None
+        try:
+            if sink is not None:
+                sink.reset()
+            body = _get_body(url, sink, requeue)
+            breaker.record_success(host)
+            return body
+            
+        except RetryLater:
+            record.outcome = "requeued"
+            requeue.attempts[url] = attempt
+            raise
             
-            if url.endswith(".xml"):
-                return BeautifulSoup(res.text, "xml")
-            return BeautifulSoup(res.text, "html.parser")
+        except CircuitOpenError:
+            record.outcome = "skipped"
+            logging.warning("skipping %s: %s is cooling down after repeated failures", url, host)
+            return None
+            
+        except DeadlineExceeded:
+            record.outcome = "deadline"
+            raise
             
         except requests.exceptions.HTTPError as e:
             status = getattr(e.response, "status_code", None)
-            if status in (403, 404, 429):
-                if attempt < retries - 1:
-                    logging.info("HTTP %s for %s, retrying in %s seconds (attempt %d/%d)", 
-                               status, url, delay, attempt + 1, retries)
-                    time.sleep(delay * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    logging.warning("fetch %s returned %s after %d retries", url, status, retries)
-                    return None
-            else:
+            if status in HOST_FAILURE_STATUSES:
+                breaker.record_failure(host)
+            if status not in RETRYABLE_STATUSES:
                 logging.warning("fetch failed %s: HTTP %s", url, status)
                 return None
+            if attempt == retries - 1:
+                logging.warning("fetch %s returned %s after %d retries", url, status, retries)
+                return None
+            retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+            reason = f"HTTP {status}"
                 
         except requests.exceptions.Timeout:
-            if attempt < retries - 1:
-                logging.info("Timeout for %s, retrying in %s seconds (attempt %d/%d)", 
-                           url, delay, attempt + 1, retries)
-                time.sleep(delay)
-                continue
-            else:
+            # A timeout cut short by the budget says nothing about the host
+            check_deadline()
+            breaker.record_failure(host)
+            if attempt == retries - 1:
                 logging.warning("fetch %s timed out after %d retries", url, retries)
                 return None
+            reason = "Timeout"
                 
         except Exception as e:
-            if attempt < retries - 1:
-                logging.info("Error fetching %s: %s, retrying in %s seconds (attempt %d/%d)", 
-                           url, str(e), delay, attempt + 1, retries)
-                time.sleep(delay)
-                continue
-            else:
+            check_deadline()
+            breaker.record_failure(host)
+            if attempt == retries - 1:
                 logging.warning("fetch failed %s after %d retries: %s", url, retries, e)
                 return None
+            reason = f"Error: {e}"
+        
+        # The pause goes on the host's timeline, so it also holds back other
+        # requests to the struggling host; the next attempt waits out its
+        # turn in _get_body (or is requeued) before taking a connection slot
+        pause = backoff_delay(attempt, delay, retry_after)
+        limiter.pause(host, pause)
+        logging.info("%s for %s, retrying in %.1f seconds (attempt %d/%d)",
+                     reason, url, pause, attempt + 1, retries)
     
     return None
 
 
-def scrape_press_releases(urls, company: str) -> List[Dict[str, Any]]:
-    if isinstance(urls, str):
-        urls = [urls]
-    results: List[Dict[str, Any]] = []
+def _probe(url: str, sink=None) -> bytes | None:
+    """Fetch a URL once for discovery; most probes miss, so failures are not logged."""
+    return _probe_status(url, sink)[1]
+
+
+def _probe_status(url: str, sink=None) -> Tuple[int | None, bytes | None]:
+    """Like ``_probe``, also returning the HTTP status (None when no response came back)."""
+    with get_metrics().fetch(url) as record:
+        record.attempts = 1
+        host = record.host
+        try:
+            body = _get_body(url, sink)
+            breaker.record_success(host)
+            return record.status or 200, body
+        except DeadlineExceeded:
+            record.outcome = "deadline"
+            raise
+        except CircuitOpenError:
+            record.outcome = "skipped"
+            return None, None
+        except requests.exceptions.HTTPError as e:
+            status = getattr(e.response, "status_code", None)
+            if status in HOST_FAILURE_STATUSES:
+                breaker.record_failure(host)
+            record.outcome = "probe_miss"
+            logging.debug("probe %s missed: %s", url, e)
+            return status, None
+        except requests.exceptions.RequestException as e:
+            check_deadline()
+            breaker.record_failure(host)
+            record.outcome = "probe_miss"
+            logging.debug("probe %s missed: %s", url, e)
+            return None, None
+        except Exception as e:
+            record.outcome = "probe_miss"
+            logging.debug("probe %s missed: %s", url, e)
+            return None, None
+        finally:
+            breaker.release(host)
+
+
+def _is_feed(url: str) -> bool:
+    # Reads only up to the first entry; _get_body leaves such a cut-short
+    # body out of the cache, so _feed_items still sees the whole feed
+    feed = FeedCollector(1)
+    return _probe(url, sink=feed) is not None and any(e["title"] and e["link"] for e in feed.entries)
+
+
+def _find_news_sitemap(url: str, page_url: str) -> str | None:
+    """The sitemap at ``url`` (or a news child of it) if it has titled entries under ``page_url``."""
+    body = _probe(url)
+    if body is None:
+        return None
+    entries, children = news_sitemap_entries(body)
+    if any(under_page(e["link"], page_url) for e in entries):
+        return url
+    for child in news_children(children):
+        body = _probe(child)
+        if body is not None and any(under_page(e["link"], page_url) for e in news_sitemap_entries(body)[0]):
+            return child
+    return None
+
+
+def _probe_press_endpoint(page_url: str, body: bytes) -> Tuple[str, str | None]:
+    # Cheapest evidence first: the page's own feed links, then the sitemaps
+    # robots.txt lists; conventional feed paths are guessed last
+    advertised = feed_links(body, page_url)
+    for feed_url in advertised:
+        if _is_feed(feed_url):
+            return FEED, feed_url
+    for sitemap in sitemap_urls(_probe(robots_url(page_url)), page_url):
+        found = _find_news_sitemap(sitemap, page_url)
+        if found:
+            return SITEMAP, found
+    for feed_url in candidate_feed_urls(page_url):
+        if feed_url not in advertised and _is_feed(feed_url):
+            return FEED, feed_url
+    return NOTHING, None
+
+
+def discover_press_endpoint(page_url: str) -> Tuple[str, str | None, bytes | None]:
+    """The lightest listing of a press page: ``(feed|sitemap, url, page)`` or ``(none, None, page)``.
+
+    Probes the page's ``<link rel="alternate">`` feeds, the site's news
+    sitemaps and then the usual feed paths, and keeps the answer (including
+    "nothing") in the discovery store so each site is probed once per TTL.
+    ``page`` is the press page's body when discovery had to fetch it, so the
+    caller need not fetch it again.
+    """
+    store = get_discovery()
+    if store is None:
+        return NOTHING, None, None
+    known = store.get(page_url)
+    if known:
+        return known[0], known[1], None
+    body = _probe(page_url)
+    if body is None:
+        # Say nothing about a page that could not be fetched; try again next run
+        return NOTHING, None, None
+    kind, endpoint = _probe_press_endpoint(page_url, body)
+    store.put(page_url, kind, endpoint)
+    if kind != NOTHING:
+        logging.info("discovered %s %s for %s", kind, endpoint, page_url)
+    return kind, endpoint, body
+
+
+def _forget_endpoint(url: str) -> None:
+    store = get_discovery()
+    if store is not None:
+        store.forget(url)
+
+
+def _feed_items(url: str, company: str) -> List[Dict[str, Any]] | None:
+    # Streamed until the first FEED_ITEMS entries are parsed
+    feed = FeedCollector(FEED_ITEMS)
+    if _fetch_body(url, sink=feed) is None:
+        return None
+    get_metrics().parse(url, "feed", feed.elapsed, len(feed.entries))
+    items = []
+    for entry in feed.entries:
+        if not entry["title"]:
+            continue
+        items.append({
+            "source": "press_release",
+            "company": company,
+            "date": entry["date"],
+            "title": entry["title"],
+            "content": entry["content"],
+            "url": urljoin(url, entry["link"]),
+        })
+    return items
+
+
+def _sitemap_items(url: str, page_url: str, company: str) -> List[Dict[str, Any]] | None:
+    body = _fetch_body(url)
+    if body is None:
+        return None
+    started = time.perf_counter()
+    entries = [e for e in news_sitemap_entries(body)[0] if under_page(e["link"], page_url)]
+    entries.sort(key=lambda e: e["date"], reverse=True)
+    items = [{
+        "source": "press_release",
+        "company": company,
+        "date": entry["date"],
+        "title": entry["title"],
+        "content": entry["content"],
+        "url": entry["link"],
+    } for entry in entries[:FEED_ITEMS]]
+    get_metrics().parse(url, "sitemap", time.perf_counter() - started, len(items))
+    return items
+
+
+def scrape_press_releases(urls, company: str, feed: str | None = None) -> List[Dict[str, Any]]:
+    """Scrape press release pages, preferring a feed or news sitemap over the HTML.
+
+    A configured ``feed`` is read first and the pages are only scraped if it
+    yields nothing. Otherwise each page goes through feed discovery and its
+    site adapter runs only when no lighter endpoint exists or it failed.
+    """
+    if feed:
+        items = _feed_items(feed, company)
+        if items:
+            return items
+    urls = [urls] if isinstance(urls, str) else urls or []
+    # One entry per URL, in order: feed items, or a future from the parse stage
+    pages: List[List[Dict[str, Any]] | Future] = []
     
     for url in urls:
-        soup = _fetch(url)
-        if not soup:
-            continue
-            
         if url.endswith(".xml"):
-            # Handle RSS/XML feeds
-            for item in soup.select("item")[:10]:
-                title = item.findtext("title", "").strip()
-                link = item.findtext("link", "").strip()
-                date = item.findtext("pubDate", "").strip()
-                content = item.findtext("description", "").strip()
-                if not title:
-                    continue
-                results.append({
-                    "source": "press_release",
-                    "company": company,
-                    "date": date,
-                    "title": title,
-                    "content": content,
-                    "url": link,
-                })
-        else:
-            # Site-specific selectors based on URL patterns
-            if "blackrock.com" in url:
-                # BlackRock specific selectors
-                for item in soup.select("li.article-cntnr")[:10]:
-                    title_el = item.select_one("h2.title")
-                    link_el = item.select_one("a.article-wrapper-link")
-                    date_el = item.select_one(".attribution-text span")
-                    
-                    if title_el and link_el:
-                        title = title_el.get_text(strip=True)
-                        href = link_el.get("href", "")
-                        date = date_el.get_text(strip=True) if date_el else ""
-                        
-                        results.append({
-                            "source": "press_release",
-                            "company": company,
-                            "date": date,
-                            "title": title,
-                            "content": "",
-                            "url": urljoin(url, href),
-                        })
-                        
-            elif "vanguard.com" in url:
-                # Vanguard specific selectors
-                for item in soup.select("div.cmp-contentListEntry__gridLeftColumn")[:10]:
-                    title_el = item.select_one("a.cmp-contentListEntry__headlineLink")
-                    date_el = item.select_one("p.cmp-contentListEntry__date")
-                    
-                    if title_el:
-                        title = title_el.get_text(strip=True)
-                        href = title_el.get("href", "")
-                        date = date_el.get_text(strip=True) if date_el else ""
-                        
-                        results.append({
-                            "source": "press_release",
-                            "company": company,
-                            "date": date,
-                            "title": title,
-                            "content": "",
-                            "url": urljoin(url, href),
-                        })
-                        
-            elif "fidelity.com" in url:
-                # Fidelity specific selectors (multiple strategies)
-                found_items = []
-                
-                # Strategy 1: Main news items with data-guid
-                for item in soup.select("p a[data-guid]")[:5]:
-                    title = item.get_text(strip=True)
-                    href = item.get("href", "")
-                    if title and href:
-                        found_items.append({
-                            "source": "press_release",
-                            "company": company,
-                            "date": "",
-                            "title": title,
-                            "content": "",
-                            "url": urljoin(url, href),
-                        })
-                
-                # Strategy 2: Featured items in rotator
-                for item in soup.select("div.divh2 a")[:5]:
-                    title = item.get_text(strip=True)
-                    href = item.get("href", "")
-                    if title and href:
-                        found_items.append({
-                            "source": "press_release",
-                            "company": company,
-                            "date": "",
-                            "title": title,
-                            "content": "",
-                            "url": urljoin(url, href),
-                        })
-                
-                results.extend(found_items[:10])
-                
-            else:
-                # Fallback: generic selectors for other sites
-                selectors = [
-                    "article a",
-                    ".news-item a",
-                    ".press-release a",
-                    "a[href*='press']",
-                    "a[href*='news']"
-                ]
-                
-                for selector in selectors:
-                    items = soup.select(selector)[:10]
-                    if items:
-                        for item in items:
-                            title = item.get_text(strip=True)
-                            href = item.get("href", "")
-                            if title and href and len(title) > 10:
-                                results.append({
-                                    "source": "press_release",
-                                    "company": company,
-                                    "date": "",
-                                    "title": title,
-                                    "content": "",
-                                    "url": urljoin(url, href),
-                                })
-                        break  # Use first successful selector
-                        
+            items = _feed_items(url, company)
+            if items is not None:
+                pages.append(items)
+            continue
+        
+        kind, endpoint, body = discover_press_endpoint(url)
+        if kind in (FEED, SITEMAP):
+            items = _feed_items(endpoint, company) if kind == FEED else _sitemap_items(endpoint, url, company)
+            if items:
+                pages.append(items)
+                continue
+            logging.info("%s %s for %s returned nothing, scraping the page instead", kind, endpoint, url)
+            _forget_endpoint(url)
+        
+        # Discovery may already have fetched the page
+        body = body if body is not None else _fetch_body(url)
+        if body is None:
+            continue
+        # Site adapters are keyed by hostname, hold precompiled selectors
+        # and choose the parser backend and the subtrees worth building.
+        # They run on the parse stage so this thread moves on to the next fetch.
+        pages.append(parse_page(adapter_for(url).name, body, url, company))
+    
+    results: List[Dict[str, Any]] = []
+    for page in pages:
+        if isinstance(page, Future):
+            try:
+                page = page.result(timeout=remaining())
+            except FutureTimeout:
+                raise DeadlineExceeded("parse did not finish within the time budget") from None
+        results.extend(page)
     return results
 
 
@@ -334,46 +572,75 @@ def scrape_linkedin(url, company: str) -> List[Dict[str, Any]]:
     }]
 
 
+def youtube_feed_url(url: str) -> str:
+    """Atom feed URL for a channel URL (``/channel/<id>`` or ``/@handle``)."""
+    channel_handle = url.rstrip('/').split('/')[-1]
+    
+    # Try with @handle format
+    if channel_handle.startswith('@'):
+        return f"https://www.youtube.com/feeds/videos.xml?user={channel_handle[1:]}"
+    return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_handle}"
+
+
+def youtube_channel_feed(url: str) -> str:
+    """Atom feed URL for a channel, resolving ``@handle`` URLs to the channel id.
+
+    The id is read from the head of the channel page once and kept in the
+    discovery store; without it the feed URL is guessed from the handle.
+    """
+    store = get_discovery()
+    if "/channel/" in url or store is None:
+        return youtube_feed_url(url)
+    known = store.get(url)
+    if known:
+        return known[1] or youtube_feed_url(url)
+    page = ChannelIdCollector()
+    if _probe(url, sink=page) is None:
+        return youtube_feed_url(url)
+    if page.channel_id:
+        feed_url = YOUTUBE_FEED.format(page.channel_id)
+        store.put(url, CHANNEL, feed_url)
+        return feed_url
+    store.put(url, NOTHING, None)
+    return youtube_feed_url(url)
+
+
 def scrape_youtube(url, company: str) -> List[Dict[str, Any]]:
     if not url:
         return []
     
     # Try RSS feed first (more reliable)
-    channel_handle = url.split('/')[-1]
-    rss_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_handle}"
-    
-    # Try with @handle format
-    if channel_handle.startswith('@'):
-        rss_url = f"https://www.youtube.com/feeds/videos.xml?user={channel_handle[1:]}"
+    rss_url = youtube_channel_feed(url)
     
-    soup = _fetch(rss_url)
-    if soup and soup.find('entry'):
+    # Stream the Atom feed and stop reading once the first 5 entries are parsed
+    feed = FeedCollector(5)
+    if _fetch_body(rss_url, sink=feed) is not None and feed.entries:
+        get_metrics().parse(rss_url, "youtube_feed", feed.elapsed, len(feed.entries))
         results = []
-        for entry in soup.select('entry')[:5]:
-            title_el = entry.find('title')
-            link_el = entry.find('link')
-            date_el = entry.find('published')
-            
-            if title_el and link_el:
-                title = title_el.get_text(strip=True)
-                href = link_el.get('href', '')
-                date = date_el.get_text(strip=True)[:10] if date_el else ''  # YYYY-MM-DD format
-                
+        for entry in feed.entries:
+            title = entry["title"]
+            if title and entry["link"]:
                 results.append({
                     "source": "social_media",
                     "company": company,
-                    "date": date,
+                    "date": entry["date"][:10],  # YYYY-MM-DD format
                     "title": title[:100],  # Truncate for consistency
                     "content": title,
-                    "url": href,
+                    "url": entry["link"],
                 })
         return results
     
+    if rss_url != youtube_feed_url(url):
+        # The resolved channel feed failed; resolve the handle again next run
+        _forget_endpoint(url)
+    
     # Fallback to web scraping (less reliable)
     channel_url = url.rstrip('/') + '/videos'
-    soup = _fetch(channel_url)
-    if not soup:
+    body = _fetch_body(channel_url)
+    if body is None:
         return []
+    started = time.perf_counter()
+    soup = parse_html(body)
 
     results: List[Dict[str, Any]] = []
     for vid in soup.select('ytd-grid-video-renderer')[:5]:
@@ -394,11 +661,76 @@ def scrape_youtube(url, company: str) -> List[Dict[str, Any]]:
             "content": title,
             "url": urljoin('https://www.youtube.com', href),
         })
+    get_metrics().parse(channel_url, "youtube_html", time.perf_counter() - started, len(results))
+    return results
+
+
+SourceTask = Tuple[str, Callable[[], List[Dict[str, Any]]]]
+
+SOURCES = ("press_releases", "twitter", "linkedin", "youtube")
+# Config keys a source reads its URLs from
+SOURCE_CONFIG_KEYS = {
+    "press_releases": ("press_releases", "rss"),
+    "twitter": ("twitter",),
+    "linkedin": ("linkedin",),
+    "youtube": ("youtube",),
+}
+# Sources with no real scraper (API or login required); they return the same
+# nothing or placeholder however often they run
+STUB_SOURCES = {"twitter", "linkedin"}
+
+
+def is_live_source(config: Dict[str, Any], source: str) -> bool:
+    """Whether a company's source is configured and actually scraped."""
+    return source not in STUB_SOURCES and any(config.get(key) for key in SOURCE_CONFIG_KEYS[source])
+
+
+def source_tasks(config: Dict[str, Any], sources: Iterable[str] | None = None) -> List[SourceTask]:
+    """Build the independent per-source scrape calls for one company config.
+
+    ``sources`` restricts the calls to the given source names (see SOURCES).
+    """
+    company = normalize_company_name(config["company"])
+    tasks = [
+        ("press_releases", partial(scrape_press_releases, config.get("press_releases"), company, config.get("rss"))),
+        ("twitter", partial(scrape_twitter, config.get("twitter"), company)),
+        ("linkedin", partial(scrape_linkedin, config.get("linkedin"), company)),
+        ("youtube", partial(scrape_youtube, config.get("youtube"), company)),
+    ]
+    if sources is None:
+        return tasks
+    wanted = set(sources)
+    return [(source, task) for source, task in tasks if source in wanted]
+
+
+def run_source(source: str, company: str, task: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Run one source scrape, isolating its failure from the other sources."""
+    try:
+        return task()
+    except Exception as e:
+        logging.warning("%s scrape failed for %s: %s", source, company, e)
+        return []
+
+
+def normalize_items(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize company names in all results."""
+    for item in results:
+        item["company"] = normalize_company_name(item["company"])
     return results
 
 
-def scrape_company(slug: str) -> List[Dict[str, Any]]:
-    config = load_config().get(slug)
+def finalize_company(results: List[Dict[str, Any]], company: str) -> List[Dict[str, Any]]:
+    """Normalize company names and attach YouTube metrics to a company's items."""
+    normalize_items(results)
+    
+    # Fetch YouTube engagement metrics if API key is available
+    return attach_youtube_metrics(results)
+
+
+def scrape_company(slug: str, config: Dict[str, Dict[str, Any]] | None = None,
+                   sources: Iterable[str] | None = None) -> List[Dict[str, Any]]:
+    """Scrape one company; pass the already loaded ``config`` to avoid re-reading it."""
+    config = (config if config is not None else load_config()).get(slug)
     if not config:
         logging.warning("No config for %s", slug)
         return []
@@ -406,52 +738,9 @@ def scrape_company(slug: str) -> List[Dict[str, Any]]:
     # Normalize company name for consistency
     company = normalize_company_name(config["company"])
     results: List[Dict[str, Any]] = []
+    dedup = Deduplicator()
     
-    try:
-        results.extend(scrape_press_releases(config.get("press_releases") or config.get("rss"), company))
-    except Exception as e:
-        logging.warning("press release scrape failed for %s: %s", company, e)
-    try:
-        results.extend(scrape_twitter(config.get("twitter"), company))
-    except Exception as e:
-        logging.warning("twitter scrape failed for %s: %s", company, e)
-    try:
-        results.extend(scrape_linkedin(config.get("linkedin"), company))
-    except Exception as e:
-        logging.warning("linkedin scrape failed for %s: %s", company, e)
-    try:
-        results.extend(scrape_youtube(config.get("youtube"), company))
-    except Exception as e:
-        logging.warning("youtube scrape failed for %s: %s", company, e)
-    
-    # Normalize company names in all results
-    for item in results:
-        item["company"] = normalize_company_name(item["company"])
-    
-    # Fetch YouTube engagement metrics if API key is available
-    youtube_api_key = os.getenv("YOUTUBE_API_KEY")
-    if youtube_api_key:
-        # Collect all YouTube video IDs
-        video_ids = []
-        for item in results:
-            if item.get("source") == "social_media" and "youtube.com" in item.get("url", ""):
-                video_id = extract_youtube_video_id(item["url"])
-                if video_id:
-                    video_ids.append(video_id)
-        
-        # Fetch metrics for all videos in one API call
-        if video_ids:
-            try:
-                metrics = get_youtube_video_metrics(video_ids, youtube_api_key)
-                
-                # Add metrics to corresponding items
-                for item in results:
-                    if item.get("source") == "social_media" and "youtube.com" in item.get("url", ""):
-                        video_id = extract_youtube_video_id(item["url"])
-                        if video_id in metrics:
-                            item.update(metrics[video_id])
-                            
-            except Exception as e:
-                logging.warning("YouTube metrics fetch failed for %s: %s", company, e)
+    for source, task in source_tasks(config, sources):
+        results.extend(dedup.filter(run_source(source, company, task)))
     
-    return results
+    return finalize_company(results, company)
@@ -1,30 +1,60 @@
 import argparse
 import json
+import logging
 import sys
-import time
+from pathlib import Path
+from typing import Any, Dict, List
 
+sys.path.append(str(Path(__file__).resolve().parent))
 
-def scrape(company: str):
-    # This is a stub that would normally fetch and parse competitor websites.
-    # It respects robots.txt and would throttle requests if enabled.
-    time.sleep(1)
-    return [
-        {
-            "company": company.title(),
-            "title": "New Fund Launch",
-            "content": "Mock content about new fund launch.",
-            "date": "2024-05-01",
-            "source": "website",
-            "url": f"https://example.com/{company}/blog/post1",
-        }
-    ]
+from base import load_config, normalize_company_name, slugify
+from crawler import DEFAULT_CRAWL_WORKERS, DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES, Crawler, RobotsCache
+from dedup import Deduplicator
+
+# Config keys listing a company's blog and insight sections (a URL or a list)
+SECTION_KEYS = ("blog", "insights")
+
+
+def section_urls(config: Dict[str, Any]) -> List[str]:
+    urls: List[str] = []
+    for key in SECTION_KEYS:
+        value = config.get(key) or []
+        urls.extend([value] if isinstance(value, str) else value)
+    return urls
+
+
+def scrape(company: str, max_pages: int = DEFAULT_MAX_PAGES, max_depth: int = DEFAULT_MAX_DEPTH,
+           workers: int = DEFAULT_CRAWL_WORKERS, config: Dict[str, Dict[str, Any]] | None = None,
+           robots: RobotsCache | None = None) -> List[Dict[str, Any]]:
+    """Crawl a company's configured blog and insight sections into ``website`` items."""
+    entry = (config if config is not None else load_config()).get(slugify(company))
+    if not entry:
+        logging.warning("No config for %s", company)
+        return []
+    seeds = section_urls(entry)
+    if not seeds:
+        logging.warning("No blog or insights sections configured for %s", company)
+        return []
+
+    name = normalize_company_name(entry["company"])
+    crawler = Crawler(name, seeds, max_pages, max_depth, workers, robots)
+    items = Deduplicator().filter(crawler.crawl())
+    logging.info("Crawled %s: %s", name, ", ".join(f"{key}={value}" for key, value in crawler.stats.items()))
+    return items
 
 
 def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--company", default="blackrock")
+    parser = argparse.ArgumentParser(description="Crawl competitor blog and insight sections")
+    parser.add_argument("--company", default="blackrock",
+                        help="company slug or name from scrape_config_urls.json")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help="pages fetched per company, seeds included")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH,
+                        help="links followed away from a section page")
+    parser.add_argument("--workers", type=int, default=DEFAULT_CRAWL_WORKERS,
+                        help="pages fetched in parallel")
     args = parser.parse_args()
-    data = scrape(args.company)
+    data = scrape(args.company, args.max_pages, args.max_depth, args.workers)
     print(json.dumps(data))
 
 
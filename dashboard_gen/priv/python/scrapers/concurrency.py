@@ -0,0 +1,60 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict
+from urllib.parse import urlparse
+
+from deadline import DeadlineExceeded, remaining
+
+DEFAULT_MAX_CONNECTIONS = 8
+DEFAULT_PER_HOST = 2
+
+
+class FetchLimiter:
+    """Caps in-flight HTTP requests globally and per host.
+
+    Waiting for a slot counts against the caller's time budget.
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, per_host: int = DEFAULT_PER_HOST):
+        self.configure(max_connections, per_host)
+
+    def configure(self, max_connections: int, per_host: int) -> None:
+        self.max_connections = max(1, max_connections)
+        self.per_host = max(1, per_host)
+        self._global = threading.BoundedSemaphore(self.max_connections)
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    @contextmanager
+    def slot(self, url: str):
+        # Take the host slot first so a busy host never pins a global slot
+        host_sem = self._host_semaphore(urlparse(url).netloc.lower())
+        if not host_sem.acquire(timeout=remaining()):
+            raise DeadlineExceeded(f"no connection slot for {url} within the time budget")
+        try:
+            if not self._global.acquire(timeout=remaining()):
+                raise DeadlineExceeded(f"no connection slot for {url} within the time budget")
+            try:
+                yield
+            finally:
+                self._global.release()
+        finally:
+            host_sem.release()
+
+
+_limiter = FetchLimiter()
+
+
+def configure_limits(max_connections: int = DEFAULT_MAX_CONNECTIONS, per_host: int = DEFAULT_PER_HOST) -> None:
+    _limiter.configure(max_connections, per_host)
+
+
+def fetch_slot(url: str):
+    return _limiter.slot(url)
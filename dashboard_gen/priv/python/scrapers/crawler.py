@@ -0,0 +1,303 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+from base import _fetch_body, _probe_status
+from deadline import DeadlineExceeded, budget_scope, current_budget
+from dedup import canonical_url, url_key
+from metrics import get_metrics, metrics_scope
+from parsers import parse_html
+from ratelimit import limiter
+
+DEFAULT_MAX_PAGES = 50
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_CRAWL_WORKERS = 4
+# Queued URLs kept per page of budget; links found past this are dropped
+FRONTIER_PER_PAGE = 20
+# Robots rules matched for the crawler (the session sends a browser User-Agent)
+ROBOTS_AGENT = "*"
+# robots.txt statuses that mean "no rules"; any other failure means "keep out"
+ROBOTS_MISSING = {404, 410}
+
+_SKIP_EXTENSIONS = re.compile(
+    r"\.(?:pdf|jpe?g|png|gif|svg|webp|ico|zip|gz|mp3|mp4|mov|avi|xlsx?|docx?|pptx?|csv|css|js|json|xml|rss)$", re.I
+)
+_DATED_PATH = re.compile(r"/20\d\d(?:/|-)")
+_LISTING_PATH = re.compile(r"/(?:page|tag|tags|category|categories|author|authors|topic|topics)(?:/|$)", re.I)
+_JSON_LD_ARTICLE = re.compile(r'"@type"\s*:\s*"(?:Article|NewsArticle|BlogPosting|Report)"')
+_JSON_LD_PUBLISHED = re.compile(r'"datePublished"\s*:\s*"([^"]+)"')
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set of strings.
+
+    Sized for ``capacity`` keys at ``error_rate`` false positives (about 10
+    bits per key at 1%), however long the URLs are. A false positive only
+    means the crawler skips a URL it never visited.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; returns False when it was (probably) already there."""
+        added = False
+        for p in self._positions(key):
+            if not self._bits[p >> 3] & (1 << (p & 7)):
+                self._bits[p >> 3] |= 1 << (p & 7)
+                added = True
+        return added
+
+
+class RobotsCache:
+    """Parsed robots.txt per host, fetched once and shared by every crawl.
+
+    A host's Crawl-delay (or Request-rate) slows the shared rate limiter for
+    that host, so every request to it is spaced accordingly. Only a missing
+    robots.txt (404 or 410) allows everything; one behind 401/403, a server
+    error or an unreachable host disallows the whole host for this crawl.
+    """
+
+    def __init__(self, agent: str = ROBOTS_AGENT):
+        self.agent = agent
+        self._parsers: Dict[str, RobotFileParser] = {}
+        self._lock = threading.Lock()
+
+    def _parser(self, url: str) -> RobotFileParser:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            parser = self._parsers.get(origin)
+        if parser is not None:
+            return parser
+
+        status, body = _probe_status(f"{origin}/robots.txt")
+        parser = RobotFileParser()
+        parser.parse(body.decode("utf-8", "replace").splitlines() if body else [])
+        if body is None and status not in ROBOTS_MISSING:
+            parser.disallow_all = True
+            logging.warning("robots.txt for %s unavailable (%s), not crawling it", origin, status or "no response")
+        delay = parser.crawl_delay(self.agent)
+        rate = parser.request_rate(self.agent)
+        if delay:
+            limiter.slow_down(parsed.netloc.lower(), 1 / float(delay))
+        elif rate and rate.requests:
+            limiter.slow_down(parsed.netloc.lower(), rate.requests / rate.seconds)
+        with self._lock:
+            return self._parsers.setdefault(origin, parser)
+
+    def allowed(self, url: str) -> bool:
+        return self._parser(url).can_fetch(self.agent, url)
+
+
+def _priority(url: str, depth: int) -> int:
+    """Lower runs first: shallow pages, and at equal depth the ones that look like articles."""
+    path = urlparse(url).path
+    score = 0
+    if _DATED_PATH.search(path):
+        score += 4
+    if path.rstrip("/").rsplit("/", 1)[-1].count("-") >= 3:
+        score += 3
+    if _LISTING_PATH.search(path) or "page=" in urlparse(url).query:
+        score -= 2
+    return depth * 10 - score
+
+
+class Frontier:
+    """Priority queue of URLs to visit, each URL admitted once.
+
+    Holds at most ``capacity`` queued URLs; links found once it is full are
+    dropped, which keeps memory flat however large the site is.
+    """
+
+    def __init__(self, capacity: int, seen: Optional[BloomFilter] = None):
+        self.capacity = capacity
+        self.seen = seen or BloomFilter()
+        self.dropped = 0
+        self._heap: List[Tuple[int, int, str, int]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, depth: int) -> bool:
+        if not self.seen.add(url_key(url)):
+            return False
+        if len(self._heap) >= self.capacity:
+            self.dropped += 1
+            return False
+        heapq.heappush(self._heap, (_priority(url, depth), next(self._order), url, depth))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+
+def _meta(soup, *names: str) -> str:
+    for name in names:
+        tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+        if tag and tag.get("content"):
+            return tag["content"].strip()
+    return ""
+
+
+def page_item(soup, url: str, company: str) -> Optional[Dict[str, Any]]:
+    """The page as an item if it is an article (og:type, JSON-LD or a lone ``<article>``), else None."""
+    json_ld = " ".join(script.get_text() for script in soup.find_all("script", type="application/ld+json"))
+    published = _meta(soup, "article:published_time", "datePublished", "publish-date", "date")
+    if not published:
+        match = _JSON_LD_PUBLISHED.search(json_ld)
+        published = match.group(1) if match else ""
+    h1 = soup.find("h1")
+    is_article = (
+        _meta(soup, "og:type").lower() == "article"
+        or _JSON_LD_ARTICLE.search(json_ld) is not None
+        or (h1 is not None and len(soup.find_all("article", limit=2)) == 1)
+    )
+    if not is_article:
+        return None
+
+    title = _meta(soup, "og:title") or (h1.get_text(" ", strip=True) if h1 else "")
+    if not title and soup.title:
+        title = soup.title.get_text(strip=True)
+    if not title:
+        return None
+    if not published:
+        time_el = soup.find("time", attrs={"datetime": True})
+        published = time_el["datetime"] if time_el else ""
+    canonical = soup.find("link", rel="canonical", href=True)
+    return {
+        "source": "website",
+        "company": company,
+        "date": published,
+        "title": title,
+        "content": _meta(soup, "og:description", "description"),
+        "url": urljoin(url, canonical["href"]) if canonical else url,
+    }
+
+
+def page_links(soup, url: str) -> List[str]:
+    links = []
+    for a in soup.find_all("a", href=True):
+        link = urldefrag(urljoin(url, a["href"].strip()))[0]
+        if link.startswith(("http://", "https://")) and not _SKIP_EXTENSIONS.search(urlparse(link).path):
+            links.append(canonical_url(link))
+    return links
+
+
+class Crawler:
+    """Bounded crawl of a company's blog and insight sections.
+
+    Starts from the ``seeds`` and follows links that stay on a seed's host
+    and under its path, up to ``max_depth`` links away, visiting at most
+    ``max_pages`` pages with ``workers`` fetches in flight. Fetches go through
+    the shared session, rate limiter, circuit breaker and HTTP cache, and
+    honour robots.txt. Article pages become ``website`` items.
+    """
+
+    def __init__(self, company: str, seeds: List[str], max_pages: int = DEFAULT_MAX_PAGES,
+                 max_depth: int = DEFAULT_MAX_DEPTH, workers: int = DEFAULT_CRAWL_WORKERS,
+                 robots: Optional[RobotsCache] = None):
+        self.company = company
+        self.seeds = [canonical_url(seed) for seed in seeds]
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.workers = max(1, workers)
+        self.robots = robots or RobotsCache()
+        # Every link seen is remembered, far more than get queued or visited
+        self.frontier = Frontier(max(1, max_pages) * FRONTIER_PER_PAGE,
+                                 BloomFilter(max(1, max_pages) * FRONTIER_PER_PAGE * 10))
+        self.stats = {"pages": 0, "items": 0, "disallowed": 0, "failed": 0, "frontier_dropped": 0}
+        self._scopes = [(urlparse(seed).netloc.lower(), urlparse(seed).path.rstrip("/")) for seed in self.seeds]
+
+    def in_scope(self, url: str) -> bool:
+        parsed = urlparse(url)
+        host, path = parsed.netloc.lower(), parsed.path.rstrip("/")
+        return any(host == h and (path == p or path.startswith(p + "/")) for h, p in self._scopes)
+
+    def _visit(self, url: str) -> Optional[Tuple[Optional[Dict[str, Any]], List[str]]]:
+        body = _fetch_body(url, retries=2)
+        if body is None:
+            return None
+        started = time.perf_counter()
+        soup = parse_html(body)
+        item = page_item(soup, url, self.company)
+        links = page_links(soup, url)
+        get_metrics().parse(url, "crawler", time.perf_counter() - started, 1 if item else 0)
+        return item, links
+
+    def crawl(self) -> List[Dict[str, Any]]:
+        for seed in self.seeds:
+            self.frontier.push(seed, 0)
+        # Items are kept in visiting order, whichever fetch finishes first
+        items: List[Tuple[int, Dict[str, Any]]] = []
+        # Visits run on pool threads under the caller's time budget and metrics
+        budget = current_budget()
+        collector = get_metrics()
+
+        def visit(url: str):
+            with budget_scope(budget), metrics_scope(collector):
+                return self._visit(url)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight: Dict[Any, Tuple[int, int]] = {}
+            out_of_time = False
+            while True:
+                while self.frontier and len(in_flight) < self.workers and self.stats["pages"] < self.max_pages \
+                        and not out_of_time:
+                    url, depth = self.frontier.pop()
+                    if not self.robots.allowed(url):
+                        self.stats["disallowed"] += 1
+                        continue
+                    in_flight[pool.submit(visit, url)] = (depth, self.stats["pages"])
+                    self.stats["pages"] += 1
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth, order = in_flight.pop(future)
+                    try:
+                        page = future.result()
+                    except DeadlineExceeded:
+                        out_of_time = True
+                        continue
+                    except Exception as e:
+                        logging.warning("crawl of a %s page failed: %s", self.company, e)
+                        page = None
+                    if page is None:
+                        self.stats["failed"] += 1
+                        continue
+                    item, links = page
+                    if item is not None and depth > 0:
+                        items.append((order, item))
+                    if depth < self.max_depth:
+                        for link in links:
+                            if self.in_scope(link):
+                                self.frontier.push(link, depth + 1)
+
+        self.stats["items"] = len(items)
+        self.stats["frontier_dropped"] = self.frontier.dropped
+        if out_of_time:
+            logging.warning("crawl of %s ran out of time after %d pages", self.company, self.stats["pages"])
+        return [item for _, item in sorted(items, key=lambda pair: pair[0])]
@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Share of the run deadline kept back for the cross-company YouTube metrics
+# batch and for writing the results
+TAIL_RESERVE = 0.1
+
+
+class DeadlineExceeded(Exception):
+    """The work's time budget ran out; raised wherever it next checks."""
+
+
+class Budget:
+    """A point in (monotonic) time that a piece of work must finish by."""
+
+    def __init__(self, seconds: float | None = None, expires: float | None = None):
+        if expires is None and seconds is not None:
+            expires = time.monotonic() + seconds
+        self.expires = expires
+
+    def remaining(self) -> float:
+        if self.expires is None:
+            return math.inf
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def child(self, seconds: float | None) -> "Budget":
+        """A budget of ``seconds`` from now that never outlives this one."""
+        if seconds is None:
+            return Budget(expires=self.expires)
+        expires = time.monotonic() + seconds
+        return Budget(expires=expires if self.expires is None else min(expires, self.expires))
+
+
+_local = threading.local()
+
+
+def current_budget() -> Optional[Budget]:
+    """The budget of the work running on this thread, if it has one."""
+    return getattr(_local, "budget", None)
+
+
+@contextmanager
+def budget_scope(budget: Budget | None) -> Iterator[Budget | None]:
+    """Make ``budget`` the current one on this thread, so fetches below it honour it."""
+    previous = current_budget()
+    _local.budget = budget
+    try:
+        yield budget
+    finally:
+        _local.budget = previous
+
+
+def check_deadline() -> None:
+    budget = current_budget()
+    if budget is not None and budget.expired():
+        raise DeadlineExceeded("time budget exhausted")
+
+
+def remaining(default: float | None = None) -> float | None:
+    """Seconds left in the current budget, capped at ``default``; raises once none are left.
+
+    Used for socket timeouts and blocking waits: without a budget it returns
+    ``default`` unchanged (None meaning "wait forever").
+    """
+    budget = current_budget()
+    if budget is None or budget.expires is None:
+        return default
+    left = budget.remaining()
+    if left <= 0:
+        raise DeadlineExceeded("time budget exhausted")
+    return left if default is None else min(default, left)
+
+
+class RunDeadline:
+    """Deadline of a whole scrape run, split into per-source budgets.
+
+    The last TAIL_RESERVE of the run is kept for the cross-company work that
+    follows the sources; the sources share the rest. Each source gets
+    ``per_source`` seconds from when it starts, never past the window. By
+    default that is an equal share of what is left of the window per wave of
+    sources still to start, so time the fast sources leave over goes to the
+    later ones. Sources that time out or never got to start are collected in
+    ``skipped``.
+    """
+
+    def __init__(self, seconds: float, per_source: float | None = None):
+        self.seconds = seconds
+        self.run = Budget(seconds)
+        self.sources = Budget(seconds * (1 - TAIL_RESERVE))
+        self.per_source = per_source
+        self.skipped: List[Dict[str, Any]] = []
+        self._pending = 0
+        self._workers = 1
+        self._lock = threading.Lock()
+
+    def plan(self, tasks: int, workers: int) -> None:
+        """Announce ``tasks`` sources about to run ``workers`` at a time."""
+        with self._lock:
+            self._pending += tasks
+            self._workers = max(1, workers)
+
+    def source_budget(self) -> Budget:
+        """The budget of a source starting now."""
+        if self.per_source is not None:
+            return self.sources.child(self.per_source)
+        with self._lock:
+            waves = max(1, math.ceil(self._pending / self._workers))
+            self._pending = max(0, self._pending - 1)
+        return self.sources.child(self.sources.remaining() / waves)
+
+    def skip(self, company: str, source: str, reason: str, started: float | None = None) -> Dict[str, Any]:
+        """Record a source that ran out of time ("timeout") or never started ("deadline")."""
+        record: Dict[str, Any] = {"type": "source_skipped", "company": company, "source": source, "reason": reason}
+        if started is not None:
+            record["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+        with self._lock:
+            self.skipped.append(record)
+        return record
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Max Hamming distance between title SimHashes that still counts as the same story
+DEFAULT_NEAR_DUP_DISTANCE = int(os.getenv("SCRAPER_NEAR_DUP_DISTANCE", "3"))
+# Shorter titles ("Video 1", "Q2 results") differ by too few tokens to compare safely
+MIN_NEAR_DUP_TOKENS = 4
+SIMHASH_BITS = 64
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "mkt_tok", "ref", "ref_src", "cmpid", "si",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _is_tracking(param: str) -> bool:
+    name = param.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url: str, base: Optional[str] = None) -> str:
+    """Normalize a URL so every spelling of the same page compares equal.
+
+    Resolves against ``base`` when relative, lowercases scheme and host, drops
+    default ports, fragments and tracking parameters, and sorts the remaining
+    query.
+    """
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_key(url: str) -> str:
+    """Canonical URL that also treats ``/path`` and ``/path/`` as the same page."""
+    parts = urlsplit(canonical_url(url))
+    return urlunsplit(parts._replace(path=parts.path.rstrip("/") or "/"))
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+def content_key(item: Dict[str, Any]) -> str:
+    """Hash of an item's normalized title and content, ignoring URL and date."""
+    payload = _normalize_text(item.get("title", "")) + "\x1f" + _normalize_text(item.get("content", ""))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> Tuple[int, int]:
+    """64-bit SimHash of a text's words and word pairs, with its token count."""
+    tokens = _TOKEN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    fingerprint = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+    return fingerprint, len(tokens)
+
+
+def _bands(distance: int) -> List[Tuple[int, int]]:
+    # Pigeonhole: two fingerprints within `distance` bits agree exactly on at
+    # least one of `distance + 1` bands, so only same-band titles are compared
+    count = min(distance + 1, SIMHASH_BITS)
+    width = SIMHASH_BITS // count
+    return [(i * width, SIMHASH_BITS if i == count - 1 else (i + 1) * width) for i in range(count)]
+
+
+class SimHashIndex:
+    """Near-duplicate lookup over SimHash fingerprints, bucketed by bit bands."""
+
+    def __init__(self, distance: int = DEFAULT_NEAR_DUP_DISTANCE):
+        self.distance = distance
+        self._bands = _bands(distance)
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def _keys(self, fingerprint: int):
+        for i, (lo, hi) in enumerate(self._bands):
+            yield i, fingerprint >> lo & ((1 << (hi - lo)) - 1)
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        for key in self._keys(fingerprint):
+            for other in self._buckets.get(key, ()):
+                if bin(fingerprint ^ other).count("1") <= self.distance:
+                    return other
+        return None
+
+    def add(self, fingerprint: int) -> None:
+        for key in self._keys(fingerprint):
+            self._buckets.setdefault(key, []).append(fingerprint)
+
+
+class Deduplicator:
+    """Drops repeated items before they are emitted.
+
+    Within one company/source an item is dropped when its canonical URL, its
+    normalized title+content hash, or (with ``distance >= 0``) a SimHash of its
+    title within ``distance`` bits matches an item already kept. Scoping to a
+    source keeps the outcome independent of which source finishes first.
+    The canonical URL is only the comparison key; kept items keep the URL
+    they were scraped with, since some sites need parameters like ``ref``.
+    """
+
+    def __init__(self, distance: int = DEFAULT_NEAR_DUP_DISTANCE):
+        self.distance = distance
+        self.dropped: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        urls = set()
+        contents = set()
+        titles = SimHashIndex(self.distance) if self.distance >= 0 else None
+        kept: List[Dict[str, Any]] = []
+        dropped: Counter = Counter()
+        for item in items:
+            key = None
+            if item.get("url"):
+                key = url_key(item["url"])
+                if key in urls:
+                    dropped["url"] += 1
+                    continue
+            digest = content_key(item)
+            if digest in contents:
+                dropped["content"] += 1
+                continue
+            fingerprint, tokens = simhash(item.get("title", ""))
+            near = titles is not None and tokens >= MIN_NEAR_DUP_TOKENS
+            if near and titles.find(fingerprint) is not None:
+                dropped["near_duplicate"] += 1
+                continue
+            if key:
+                urls.add(key)
+            contents.add(digest)
+            if near:
+                titles.add(fingerprint)
+            kept.append(item)
+        with self._lock:
+            self.dropped.update(dropped)
+        return kept
+
+    def total_dropped(self) -> int:
+        with self._lock:
+            return sum(self.dropped.values())
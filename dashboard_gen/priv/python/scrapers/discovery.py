@@ -0,0 +1,200 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import SoupStrainer
+
+from parsers import parse_html
+from state import STATE_DIR
+
+DISCOVERY_PATH = STATE_DIR / "discovery.sqlite3"
+
+# Discovered endpoints (and the absence of one) are re-probed after this long
+DEFAULT_DISCOVERY_TTL = float(os.getenv("SCRAPER_DISCOVERY_TTL", str(7 * 24 * 3600)))
+
+# Endpoint kinds kept in the store
+FEED = "feed"
+SITEMAP = "sitemap"
+CHANNEL = "channel"
+NOTHING = "none"
+
+FEED_TYPES = {"application/rss+xml", "application/atom+xml", "application/rdf+xml"}
+# Guessed below the press page, then at the site root, only once the page's
+# own links and the site's sitemaps turned up nothing; most of them 404
+COMMON_FEED_PATHS = ("feed", "rss", "rss.xml")
+# Sitemap indexes are followed into at most this many news-looking children
+MAX_CHILD_SITEMAPS = 3
+
+YOUTUBE_FEED = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+# Where a channel page states its own id, most specific first; all of them sit
+# in the first few kilobytes of the page
+_CHANNEL_ID = re.compile(
+    rb'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'
+    rb'|feeds/videos\.xml\?channel_id=(UC[\w-]{22})'
+    rb'|"externalId":"(UC[\w-]{22})"'
+    rb'|<meta itemprop="(?:channelId|identifier)" content="(UC[\w-]{22})"'
+)
+_CHANNEL_ID_TAIL = 256
+
+
+def feed_links(body: bytes, page_url: str) -> List[str]:
+    """Absolute URLs of the RSS/Atom feeds a page advertises with ``<link rel="alternate">``."""
+    links = []
+    for link in parse_html(body, SoupStrainer("link")).find_all("link"):
+        rel = link.get("rel") or []
+        rel = rel.split() if isinstance(rel, str) else rel
+        if "alternate" in rel and (link.get("type") or "").split(";")[0].strip().lower() in FEED_TYPES and link.get("href"):
+            links.append(urljoin(page_url, link["href"]))
+    return list(dict.fromkeys(links))
+
+
+def candidate_feed_urls(page_url: str) -> List[str]:
+    """Conventional feed locations for a page: below its path, then at the site root."""
+    parsed = urlparse(page_url)
+    root = f"{parsed.scheme}://{parsed.netloc}/"
+    bases = [page_url.rstrip("/") + "/", root] if parsed.path.strip("/") else [root]
+    return list(dict.fromkeys(urljoin(base, path) for base in bases for path in COMMON_FEED_PATHS))
+
+
+def robots_url(page_url: str) -> str:
+    parsed = urlparse(page_url)
+    return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
+
+def sitemap_urls(robots: bytes | None, page_url: str) -> List[str]:
+    """Sitemaps listed in robots.txt, plus the conventional ``/sitemap.xml``."""
+    urls = []
+    for line in (robots or b"").decode("utf-8", "replace").splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            urls.append(value.strip())
+    urls.append(urljoin(page_url, "/sitemap.xml"))
+    return list(dict.fromkeys(urls))
+
+
+def news_children(children: List[str]) -> List[str]:
+    """Child sitemaps of an index that look like they hold news or press items."""
+    return [url for url in children if re.search(r"news|press", url, re.I)][:MAX_CHILD_SITEMAPS]
+
+
+def under_page(link: str, page_url: str) -> bool:
+    """Whether a sitemap URL belongs to the section of the site the press page lists.
+
+    Paths are compared by whole segments, so ``/news`` covers ``/news/a`` but
+    not ``/newsletter-signup``.
+    """
+    page, target = urlparse(page_url), urlparse(link)
+    if target.netloc.lower() != page.netloc.lower():
+        return False
+    section = page.path.rstrip("/")
+    return not section or target.path == section or target.path.startswith(section + "/")
+
+
+class ChannelIdCollector:
+    """Streaming sink that stops reading a YouTube channel page once its channel id is seen."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.channel_id: Optional[str] = None
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        window = self._tail + chunk
+        match = _CHANNEL_ID.search(window)
+        if match:
+            self.channel_id = next(group for group in match.groups() if group).decode("ascii")
+            return True
+        self._tail = window[-_CHANNEL_ID_TAIL:]
+        return False
+
+
+class DiscoveryStore:
+    """SQLite-backed record of the lightest endpoint found for each configured URL.
+
+    Maps a press page to its feed or news sitemap, and a YouTube channel URL
+    to its channel-id feed. A page where nothing was found is stored as
+    ``none`` so it is not probed again until the entry expires.
+    """
+
+    def __init__(self, path=DISCOVERY_PATH, ttl: float = DEFAULT_DISCOVERY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS endpoints (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                endpoint TEXT,
+                checked_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    def get(self, url: str) -> Optional[Tuple[str, Optional[str]]]:
+        """The stored ``(kind, endpoint)`` for a URL, or None when unknown or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT kind, endpoint, checked_at FROM endpoints WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or time.time() - row[2] >= self.ttl:
+            return None
+        return row[0], row[1]
+
+    def put(self, url: str, kind: str, endpoint: Optional[str]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO endpoints VALUES (?, ?, ?, ?)", (url, kind, endpoint, time.time())
+            )
+            self._db.commit()
+
+    def forget(self, url: str) -> None:
+        """Drop an endpoint that stopped working so the next run probes again."""
+        with self._lock:
+            self._db.execute("DELETE FROM endpoints WHERE url = ?", (url,))
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_store: Optional[DiscoveryStore] = None
+_enabled = not os.getenv("SCRAPER_NO_DISCOVERY")
+_settings = {"ttl": DEFAULT_DISCOVERY_TTL}
+_store_lock = threading.Lock()
+
+
+def configure_discovery(enabled: bool = True, ttl: float = DEFAULT_DISCOVERY_TTL) -> None:
+    global _store, _enabled
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+        _enabled = enabled
+        _settings.update(ttl=ttl)
+
+
+def get_discovery() -> Optional[DiscoveryStore]:
+    """Return the process-wide discovery store, or None when discovery is disabled."""
+    global _store, _enabled
+    if not _enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = DiscoveryStore(**_settings)
+                except sqlite3.Error as e:
+                    logging.warning("Feed discovery store unavailable at %s: %s", DISCOVERY_PATH, e)
+                    _enabled = False
+                    return None
+    return _store
@@ -0,0 +1,152 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from state import STATE_DIR
+
+CACHE_PATH = STATE_DIR / "http_cache.sqlite3"
+
+DEFAULT_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "900"))
+DEFAULT_MAX_BYTES = int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    etag: str
+    last_modified: str
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """SQLite-backed response cache with validator revalidation and LRU eviction."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.outcomes: Counter = Counter()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return CacheEntry(url, row[0], row[1], row[2], row[3])
+
+    def store(self, url: str, body: bytes, headers) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, headers.get("ETag", ""), headers.get("Last-Modified", ""), now, now, len(body)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, url: str, headers) -> None:
+        """Mark a 304-revalidated entry as fresh again, picking up new validators."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """UPDATE responses
+                   SET stored_at = ?, accessed_at = ?,
+                       etag = COALESCE(NULLIF(?, ''), etag),
+                       last_modified = COALESCE(NULLIF(?, ''), last_modified)
+                   WHERE url = ?""",
+                (now, now, headers.get("ETag", ""), headers.get("Last-Modified", ""), url),
+            )
+            self._db.commit()
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: "hit", "revalidated" (304) or "miss"."""
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            logging.debug("evicted %s from HTTP cache", url)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache: Optional[HttpCache] = None
+_enabled = not os.getenv("SCRAPER_NO_CACHE")
+_settings = {"ttl": DEFAULT_TTL, "max_bytes": DEFAULT_MAX_BYTES}
+_cache_lock = threading.Lock()
+
+
+def configure_cache(enabled: bool = True, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    global _cache, _enabled
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+        _enabled = enabled
+        _settings.update(ttl=ttl, max_bytes=max_bytes)
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Return the process-wide response cache, or None when caching is bypassed."""
+    global _cache, _enabled
+    if not _enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = HttpCache(**_settings)
+                except sqlite3.Error as e:
+                    logging.warning("HTTP cache unavailable at %s: %s", CACHE_PATH, e)
+                    _enabled = False
+                    return None
+    return _cache
@@ -0,0 +1,218 @@
+import os
+import ssl
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict
+
+import certifi
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import current_fetch
+
+urllib3.disable_warnings()
+ssl_context = ssl.create_default_context(cafile=certifi.where())
+verify_ssl = not os.getenv("SCRAPER_DEV_MODE")
+
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("SCRAPER_POOL_CONNECTIONS", "32"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("SCRAPER_POOL_MAXSIZE", "4"))
+# urllib3 1.x/2.x resolve, then apply socket options, then connect; on any
+# other major version DNS time is reported as part of connect time
+_SPLITS_DNS = urllib3.__version__.split(".")[0] in ("1", "2")
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+class ConnectionStats:
+    """Thread-safe counters for requests sent and connections opened per host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.connections: Counter = Counter()
+
+    def record_request(self, host: str) -> None:
+        with self._lock:
+            self.requests[host] += 1
+
+    def record_connection(self, host: str) -> None:
+        with self._lock:
+            self.connections[host] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {
+                host: {
+                    "requests": count,
+                    "new_connections": self.connections[host],
+                    "reused": max(0, count - self.connections[host]),
+                }
+                for host, count in self.requests.items()
+            }
+        total_requests = sum(h["requests"] for h in hosts.values())
+        total_connections = sum(h["new_connections"] for h in hosts.values())
+        return {
+            "requests": total_requests,
+            "new_connections": total_connections,
+            "reused": max(0, total_requests - total_connections),
+            "hosts": hosts,
+        }
+
+
+_stats = ConnectionStats()
+
+
+class _MarkResolved(list):
+    """Socket options that note when urllib3 first applies them.
+
+    urllib3 sets socket options on each resolved address right before
+    connecting to it, so the first read marks the end of name resolution.
+    """
+
+    def __init__(self, options, marks: list):
+        super().__init__(options or [])
+        self._marks = marks
+
+    def __iter__(self):
+        self._marks.append(time.perf_counter())
+        return super().__iter__()
+
+
+class _TimedConnectionMixin:
+    """Splits connection setup of the current fetch into DNS, TCP connect and TLS time."""
+
+    def _new_conn(self):
+        record = current_fetch()
+        if record is None:
+            sock = super()._new_conn()
+            _stats.record_connection(self.host)
+            return sock
+        options = self.socket_options
+        marks: list = []
+        if _SPLITS_DNS:
+            self.socket_options = _MarkResolved(options, marks)
+        started = time.perf_counter()
+        try:
+            sock = super()._new_conn()
+        finally:
+            self.socket_options = options
+            finished = time.perf_counter()
+            # No mark means resolution itself failed
+            resolved = marks[0] if marks else finished if _SPLITS_DNS else started
+            record.add("dns_ms", resolved - started)
+            record.add("connect_ms", finished - resolved)
+        record.new_connections += 1
+        _stats.record_connection(self.host)
+        return sock
+
+    def connect(self):
+        record = current_fetch()
+        if record is None:
+            return super().connect()
+        started = time.perf_counter()
+        setup_before = record.dns_ms + record.connect_ms
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            socket_ms = record.dns_ms + record.connect_ms - setup_before
+            record.add("tls_ms", max(0.0, time.perf_counter() - started - socket_ms / 1000))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin:
+    def urlopen(self, method, url, *args, **kwargs):
+        _stats.record_request(self.host)
+        return super().urlopen(method, url, *args, **kwargs)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that shares one TLS context across every pooled connection."""
+
+    def __init__(self, *args, ssl_context: ssl.SSLContext | None = None, **kwargs):
+        self._ssl_context = ssl_context
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._ssl_context is not None:
+            pool_kwargs["ssl_context"] = self._ssl_context
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if self._ssl_context is not None and verify:
+            # The shared context already holds the CA bundle; passing the path
+            # again would make urllib3 reload it for every new connection.
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(BROWSER_HEADERS)
+    session.verify = verify_ssl
+    adapter = PooledAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        ssl_context=ssl_context if verify_ssl else None,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure_client(pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """(Re)build the process-wide session with the given pool sizes."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = _build_session(pool_connections, pool_maxsize)
+        return _session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE)
+    return _session
+
+
+def connection_stats() -> Dict[str, Any]:
+    """Requests sent, connections opened and connections reused, overall and per host."""
+    return _stats.snapshot()
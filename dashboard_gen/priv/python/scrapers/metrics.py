@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+# wait_ms is time spent queued for the host's rate limit and a connection slot
+PHASES = ("wait_ms", "dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+
+
+@dataclass
+class FetchRecord:
+    """One logical fetch (all of its retries); phase times are summed over attempts."""
+
+    url: str
+    host: str
+    outcome: str = "error"
+    status: Optional[int] = None
+    attempts: int = 0
+    bytes: int = 0
+    new_connections: int = 0
+    wait_ms: float = 0.0
+    dns_ms: float = 0.0
+    connect_ms: float = 0.0
+    tls_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    download_ms: float = 0.0
+    total_ms: float = 0.0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def setup_ms(self) -> float:
+        return self.dns_ms + self.connect_ms + self.tls_ms
+
+    def add(self, phase: str, seconds: float) -> None:
+        setattr(self, phase, getattr(self, phase) + seconds * 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["started"]
+        for key in PHASES + ("total_ms",):
+            data[key] = round(data[key], 2)
+        return data
+
+
+@dataclass
+class ParseRecord:
+    url: str
+    adapter: str
+    parse_ms: float
+    items: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"url": self.url, "adapter": self.adapter, "parse_ms": round(self.parse_ms, 2), "items": self.items}
+
+
+_local = threading.local()
+
+
+def current_fetch() -> Optional[FetchRecord]:
+    """The fetch being made on this thread, for the connection layer to annotate."""
+    return getattr(_local, "fetch", None)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+
+class Metrics:
+    """Collects per-fetch and per-parse records from every scrape thread.
+
+    A collector keeps every record it is given, so a long-lived process
+    scopes one per request (``metrics_scope``) and keeps only ``totals``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fetches: List[FetchRecord] = []
+        self.parses: List[ParseRecord] = []
+
+    @contextmanager
+    def fetch(self, url: str) -> Iterator[FetchRecord]:
+        record = FetchRecord(url=url, host=urlparse(url).netloc.lower())
+        previous = current_fetch()
+        _local.fetch = record
+        try:
+            yield record
+        finally:
+            _local.fetch = previous
+            record.total_ms = (time.perf_counter() - record.started) * 1000
+            with self._lock:
+                self.fetches.append(record)
+
+    def parse(self, url: str, adapter: str, seconds: float, items: int) -> None:
+        with self._lock:
+            self.parses.append(ParseRecord(url, adapter, seconds * 1000, items))
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, per-host fetch statistics and per-adapter parse statistics."""
+        with self._lock:
+            fetches = list(self.fetches)
+            parses = list(self.parses)
+
+        hosts: Dict[str, Dict[str, Any]] = {}
+        by_host: Dict[str, List[FetchRecord]] = defaultdict(list)
+        for record in fetches:
+            by_host[record.host].append(record)
+        for host, records in sorted(by_host.items()):
+            totals = [r.total_ms for r in records]
+            hosts[host] = {
+                "fetches": len(records),
+                "retries": sum(max(0, r.attempts - 1) for r in records),
+                "errors": sum(r.outcome in ("error", "skipped") for r in records),
+                "bytes": sum(r.bytes for r in records),
+                "p50_ms": _percentile(totals, 0.5),
+                "p95_ms": _percentile(totals, 0.95),
+                **{phase: round(sum(getattr(r, phase) for r in records), 2) for phase in PHASES},
+            }
+
+        adapters: Dict[str, Dict[str, Any]] = {}
+        for record in parses:
+            stats = adapters.setdefault(record.adapter, {"parses": 0, "parse_ms": 0.0, "items": 0})
+            stats["parses"] += 1
+            stats["parse_ms"] = round(stats["parse_ms"] + record.parse_ms, 2)
+            stats["items"] += record.items
+
+        outcomes: Dict[str, int] = defaultdict(int)
+        for record in fetches:
+            outcomes[record.outcome] += 1
+        return {
+            "fetches": len(fetches),
+            "bytes": sum(r.bytes for r in fetches),
+            "retries": sum(max(0, r.attempts - 1) for r in fetches),
+            "outcomes": dict(sorted(outcomes.items())),
+            "hosts": hosts,
+            "adapters": dict(sorted(adapters.items())),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary plus every individual fetch and parse record."""
+        with self._lock:
+            fetches = [r.to_dict() for r in self.fetches]
+            parses = [r.to_dict() for r in self.parses]
+        return {"summary": self.summary(), "fetches": fetches, "parses": parses}
+
+    def write(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.snapshot()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.fetches = []
+            self.parses = []
+
+
+def add_totals(totals: Dict[str, Any], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a summary's counters into ``totals``; per-host and per-adapter detail is dropped."""
+    for key in ("fetches", "bytes", "retries"):
+        totals[key] = totals.get(key, 0) + summary[key]
+    outcomes = totals.setdefault("outcomes", {})
+    for outcome, count in summary["outcomes"].items():
+        outcomes[outcome] = outcomes.get(outcome, 0) + count
+    totals["parses"] = totals.get("parses", 0) + sum(a["parses"] for a in summary["adapters"].values())
+    return totals
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """The collector of the work running on this thread, or the process-wide one."""
+    return getattr(_local, "metrics", None) or _metrics
+
+
+@contextmanager
+def metrics_scope(metrics: Metrics | None) -> Iterator[Metrics | None]:
+    """Record this thread's fetches and parses into ``metrics`` (None: the process-wide collector)."""
+    previous = getattr(_local, "metrics", None)
+    _local.metrics = metrics
+    try:
+        yield metrics
+    finally:
+        _local.metrics = previous
+
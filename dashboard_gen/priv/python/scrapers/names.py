@@ -0,0 +1,6 @@
+import re
+
+
+def slugify(name: str) -> str:
+    """Config key and file-name form of a company name ("BlackRock, Inc." -> "blackrock_inc")."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
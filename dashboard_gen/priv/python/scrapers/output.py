@@ -0,0 +1,38 @@
+import json
+import sys
+import threading
+from typing import Any, Callable, Dict, TextIO
+
+Event = Dict[str, Any]
+Emit = Callable[[Event], None]
+
+
+def discard(event: Event) -> None:
+    pass
+
+
+class NdjsonWriter:
+    """Writes one JSON record per line and flushes it immediately.
+
+    Safe to call from several scrape threads at once; lines never interleave.
+    """
+
+    def __init__(self, stream: TextIO = None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        line = json.dumps(event)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def tee(*emits: Emit) -> Emit:
+    """An Emit that passes every record to each of ``emits`` in turn."""
+
+    def emit(event: Event) -> None:
+        for target in emits:
+            target(event)
+
+    return emit
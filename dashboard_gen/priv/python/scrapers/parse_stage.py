@@ -0,0 +1,161 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from adapters import get_registry
+from deadline import DeadlineExceeded, remaining
+from metrics import get_metrics
+from parsers import configure_parser, parser_backend
+
+# Parse processes for one-shot scrape_all runs; 0 parses in the calling fetch
+# thread. Spawning a pool costs more than a typical run spends parsing, so only
+# the long-lived worker, which pays for it once, starts processes by default.
+# Library callers (tests, benchmarks) parse inline until they call
+# configure_parse_stage.
+DEFAULT_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "0"))
+WORKER_PARSE_WORKERS = int(os.getenv("SCRAPER_WORKER_PARSE_WORKERS", "2"))
+# Bodies allowed to wait for or sit in a parse process per worker
+IN_FLIGHT_PER_WORKER = 2
+
+
+def _init_worker(backend: str) -> None:
+    configure_parser(backend)
+
+
+def _parse_in_worker(adapter: str, body: bytes, page_url: str, company: str) -> Tuple[List[Dict[str, Any]], float]:
+    started = time.perf_counter()
+    items = get_registry().get(adapter).parse(body, page_url, company)
+    return items, time.perf_counter() - started
+
+
+class StageRetired(Exception):
+    """The stage was replaced (e.g. by an adapter reload); submit to the current one."""
+
+
+class ParseStage:
+    """CPU stage that runs site adapters on fetched bytes in worker processes.
+
+    ``submit`` blocks the fetching thread while ``max_in_flight`` bodies are
+    already queued or parsing, so a slow parse holds back new fetches instead
+    of piling up response bodies in memory. Workers are spawned rather than
+    forked because the fetch stage is multi-threaded.
+    """
+
+    def __init__(self, workers: int, max_in_flight: int | None = None):
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * IN_FLIGHT_PER_WORKER
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._retired = False
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(parser_backend(),),
+        )
+
+    def submit(self, adapter: str, body: bytes, page_url: str, company: str) -> Future:
+        if not self._slots.acquire(timeout=remaining()):
+            raise DeadlineExceeded(f"no parse slot for {page_url} within the time budget")
+        try:
+            with self._lock:
+                if self._retired:
+                    raise StageRetired()
+                future = self._pool.submit(_parse_in_worker, adapter, body, page_url, company)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def retire(self) -> None:
+        """Take no new parses; the ones already queued finish and then the processes exit."""
+        with self._lock:
+            self._retired = True
+            self._pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._retired = True
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_settings = {"workers": 0, "max_in_flight": None}
+_stage: ParseStage | None = None
+_stage_lock = threading.Lock()
+
+
+def configure_parse_stage(workers: int = DEFAULT_PARSE_WORKERS, max_in_flight: int | None = None) -> None:
+    """Set the parse process count (0 = parse inline); the pool starts on first use."""
+    shutdown_parse_stage()
+    with _stage_lock:
+        _settings["workers"] = max(0, workers)
+        _settings["max_in_flight"] = max_in_flight
+
+
+def _get_stage() -> ParseStage | None:
+    global _stage
+    with _stage_lock:
+        if _stage is None and _settings["workers"] > 0:
+            _stage = ParseStage(_settings["workers"], _settings["max_in_flight"])
+        return _stage
+
+
+def shutdown_parse_stage() -> None:
+    """Stop the worker processes, dropping queued parses; for when nothing is scraping any more."""
+    global _stage
+    with _stage_lock:
+        if _stage is not None:
+            _stage.shutdown()
+            _stage = None
+
+
+def reload_parse_stage() -> None:
+    """Start later parses on fresh processes (e.g. after an adapter reload).
+
+    The old pool is retired rather than shut down: parses other requests
+    already queued on it finish with the adapters they started with.
+    """
+    global _stage
+    with _stage_lock:
+        old, _stage = _stage, None
+    if old is not None:
+        old.retire()
+
+
+def parse_page(adapter: str, body: bytes, page_url: str, company: str) -> Future:
+    """Run a site adapter on a fetched page, returning a future of its items."""
+    while True:
+        stage = _get_stage()
+        if stage is None:
+            parsed: Future = Future()
+            try:
+                parsed.set_result(_parse_in_worker(adapter, body, page_url, company))
+            except Exception as e:
+                parsed.set_exception(e)
+            break
+        try:
+            parsed = stage.submit(adapter, body, page_url, company)
+            break
+        except StageRetired:
+            # Reloaded between picking the stage and submitting; use the new one
+            continue
+
+    items: Future = Future()
+    # The callback may run on a pool thread; record into the caller's collector
+    collector = get_metrics()
+
+    def _record(done: Future) -> None:
+        try:
+            result, seconds = done.result()
+        except Exception as e:
+            items.set_exception(e)
+            return
+        collector.parse(page_url, adapter, seconds, len(result))
+        items.set_result(result)
+
+    parsed.add_done_callback(_record)
+    return items
@@ -0,0 +1,83 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, List
+
+CPROFILE = "cprofile"
+PYINSTRUMENT = "pyinstrument"
+PROFILERS = (CPROFILE, PYINSTRUMENT)
+TOP_FUNCTIONS = 30
+
+
+class Profiler:
+    """Profiles company scrape work on whichever pool thread runs it.
+
+    cProfile and pyinstrument only see the thread they were started on, so
+    every wrapped call gets its own profile and ``dump`` merges them.
+    """
+
+    def __init__(self, kind: str = CPROFILE):
+        if kind not in PROFILERS:
+            raise ValueError(f"unknown profiler {kind!r}, expected one of {', '.join(PROFILERS)}")
+        if kind == PYINSTRUMENT:
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ValueError("pyinstrument is not installed (pip install pyinstrument)") from None
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._profiles: List[Any] = []
+
+    def wrap(self, fn: Callable) -> Callable:
+        @wraps(fn)
+        def profiled(*args, **kwargs):
+            if self.kind == CPROFILE:
+                profile = cProfile.Profile()
+                try:
+                    return profile.runcall(fn, *args, **kwargs)
+                finally:
+                    self._add(profile)
+
+            from pyinstrument import Profiler as PyinstrumentProfiler
+
+            profiler = PyinstrumentProfiler(async_mode="disabled")
+            profiler.start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(profiler.stop())
+
+        return profiled
+
+    def _add(self, profile: Any) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def dump(self, path: Path) -> None:
+        """Write the merged profile to ``path`` and a short summary to stderr."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return
+        if self.kind == CPROFILE:
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(str(path))
+            summary = io.StringIO()
+            stats.stream = summary
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            sys.stderr.write(summary.getvalue())
+            return
+
+        from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer
+        from pyinstrument.session import Session
+
+        session = profiles[0]
+        for other in profiles[1:]:
+            session = Session.combine(session, other)
+        renderer = HTMLRenderer() if str(path).endswith(".html") else ConsoleRenderer(unicode=False, color=False)
+        Path(path).write_text(renderer.render(session))
+        sys.stderr.write(ConsoleRenderer(unicode=False, color=False).render(session))
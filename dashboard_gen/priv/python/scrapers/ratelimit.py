@@ -0,0 +1,217 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+DEFAULT_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "2"))
+DEFAULT_HOST_BURST = float(os.getenv("SCRAPER_HOST_BURST", "4"))
+DEFAULT_BREAKER_THRESHOLD = int(os.getenv("SCRAPER_BREAKER_THRESHOLD", "5"))
+DEFAULT_BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", "300"))
+MAX_BACKOFF = 60.0
+# Under a requeue_scope, waits this long or longer (token bucket, Retry-After,
+# retry backoff) give the thread back instead of sleeping on it; shorter ones
+# cost less than running the work again
+DEFAULT_REQUEUE_MIN_WAIT = float(os.getenv("SCRAPER_REQUEUE_MIN_WAIT", "1"))
+
+# Statuses worth retrying later; 403/404 will not change on a retry
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Statuses that say the host (not the URL) is refusing or failing
+HOST_FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of contacting a host whose circuit breaker is open."""
+
+
+class RetryLater(Exception):
+    """A fetch must wait ``delay`` seconds; run the work again then instead of sleeping."""
+
+    def __init__(self, host: str, delay: float):
+        super().__init__(f"{host} is held back for {delay:.1f}s")
+        self.host = host
+        self.delay = delay
+
+
+class Requeue:
+    """What a piece of work that may be run again keeps between its runs.
+
+    A fetch that would wait at least ``min_wait`` books its slot on the
+    host's timeline (``hold``) and raises RetryLater; when the work runs
+    again the fetch takes that slot (``held_wait``) and carries on from the
+    retry attempt it had reached (``attempts``). Fetches that already
+    finished are answered from ``fetched`` instead of being repeated.
+    """
+
+    def __init__(self, min_wait: float = DEFAULT_REQUEUE_MIN_WAIT):
+        self.min_wait = min_wait
+        self.attempts: Dict[str, int] = {}
+        # url -> (body or None when it failed, whether a sink may have cut the body short)
+        self.fetched: Dict[str, Tuple[Optional[bytes], bool]] = {}
+        self._slots: Dict[str, float] = {}
+
+    def hold(self, url: str, wait: float) -> None:
+        self._slots[url] = time.monotonic() + wait
+
+    def held_wait(self, url: str) -> Optional[float]:
+        """Seconds until the slot booked for ``url``, or None when it has none."""
+        slot = self._slots.pop(url, None)
+        return None if slot is None else max(0.0, slot - time.monotonic())
+
+
+_local = threading.local()
+
+
+def current_requeue() -> Optional[Requeue]:
+    return getattr(_local, "requeue", None)
+
+
+@contextmanager
+def requeue_scope(requeue: Optional[Requeue]) -> Iterator[Optional[Requeue]]:
+    """Let fetches on this thread raise RetryLater instead of sleeping through long waits."""
+    previous = current_requeue()
+    _local.requeue = requeue
+    try:
+        yield requeue
+    finally:
+        _local.requeue = previous
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (now or time.time()))
+
+
+def backoff_delay(attempt: int, base: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(MAX_BACKOFF, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, MAX_BACKOFF))
+    return delay
+
+
+class HostRateLimiter:
+    """Token bucket per host plus host-wide pauses set by 429/Retry-After.
+
+    ``reserve`` never sleeps: it books the caller's slot on the host's
+    timeline and returns how long until that slot, so a throttled host's
+    requests queue up behind each other while other hosts run at full rate.
+    """
+
+    def __init__(self, rate: float = DEFAULT_HOST_RATE, burst: float = DEFAULT_HOST_BURST):
+        self.configure(rate, burst)
+
+    def configure(self, rate: float, burst: float) -> None:
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1.0)
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._host_rates: Dict[str, float] = {}
+
+    def reserve(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            rate = self._host_rates.get(host, self.rate)
+            # A host with its own (slower) rate gets no burst either
+            burst = 1.0 if host in self._host_rates else self.burst
+            tokens = self._tokens.get(host, burst)
+            elapsed = now - self._updated.get(host, now)
+            tokens = min(burst, tokens + elapsed * rate) - 1
+            self._tokens[host] = tokens
+            self._updated[host] = now
+            wait = -tokens / rate if tokens < 0 else 0.0
+            return max(wait, self._paused_until.get(host, 0.0) - now)
+
+    def slow_down(self, host: str, rate: float) -> None:
+        """Cap one host below the default rate, e.g. for a robots.txt Crawl-delay."""
+        with self._lock:
+            if rate < self._host_rates.get(host, self.rate):
+                self._host_rates[host] = max(rate, 0.001)
+
+    def pause(self, host: str, seconds: float) -> None:
+        """Hold every request to ``host`` for ``seconds`` (e.g. after a 429)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[host] = max(until, self._paused_until.get(host, 0.0))
+
+
+class CircuitBreaker:
+    """Stops calling a host after repeated failures until a cool-down passes.
+
+    After the cool-down one trial request is let through (half-open); its
+    success closes the circuit, its failure re-opens it. A trial that ends
+    with neither (a 404, a deadline) is handed back with ``release`` so the
+    next request can try again. The trial belongs to the thread that took it.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD, cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.configure(threshold, cooldown)
+
+    def configure(self, threshold: int, cooldown: float) -> None:
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, int] = {}
+
+    def allow(self, host: str) -> bool:
+        with self._lock:
+            opened = self._opened_at.get(host)
+            if opened is None:
+                return True
+            if time.monotonic() - opened < self.cooldown or host in self._trial:
+                return False
+            self._trial[host] = threading.get_ident()
+            return True
+
+    def release(self, host: str) -> None:
+        """Give back this thread's trial for ``host`` if no verdict was recorded for it."""
+        with self._lock:
+            if self._trial.get(host) == threading.get_ident():
+                del self._trial[host]
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._trial.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold or self._trial.pop(host, None) is not None:
+                self._opened_at[host] = time.monotonic()
+
+    def open_hosts(self) -> Dict[str, float]:
+        """Hosts whose circuit is open, with the seconds left in their cool-down."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: round(max(0.0, self.cooldown - (now - opened)), 1)
+                for host, opened in self._opened_at.items()
+            }
+
+
+limiter = HostRateLimiter()
+breaker = CircuitBreaker()
+
+
+def configure_rate_limits(rate: float = DEFAULT_HOST_RATE, burst: float = DEFAULT_HOST_BURST,
+                          threshold: int = DEFAULT_BREAKER_THRESHOLD, cooldown: float = DEFAULT_BREAKER_COOLDOWN) -> None:
+    limiter.configure(rate, burst)
+    breaker.configure(threshold, cooldown)
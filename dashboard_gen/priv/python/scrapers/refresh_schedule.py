@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from dedup import url_key
+from state import state_path
+
+SCHEDULE_NAME = "refresh_schedule.sqlite3"
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+DEFAULT_MIN_INTERVAL = float(os.getenv("SCRAPER_MIN_INTERVAL", str(15 * MINUTE)))
+DEFAULT_MAX_INTERVAL = float(os.getenv("SCRAPER_MAX_INTERVAL", str(24 * HOUR)))
+INITIAL_INTERVAL = HOUR
+# Weight of the newest observed publish gap in the moving average
+EWMA_ALPHA = 0.3
+# Unchanged checks stretch the estimate by this factor
+BACKOFF = 1.5
+# Check twice per expected publish gap so new items wait half a gap at most
+CHECKS_PER_INTERVAL = 2
+
+
+def isoformat(ts: float | None) -> str | None:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+def items_signature(items: List[Dict[str, Any]]) -> str:
+    """Order-independent fingerprint of which items a source currently lists."""
+    keys = sorted(url_key(item["url"]) if item.get("url") else item.get("title", "") for item in items)
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+class RefreshSchedule:
+    """Learns how often each company/source publishes and when it is next due.
+
+    After every scrape, ``record`` compares the source's item list with the
+    previous one. A change folds the gap since the last change into an
+    exponentially weighted publish interval; no change stretches the
+    estimate. The source is next due after half the interval, clamped to
+    ``[min_interval, max_interval]``. A scrape that found nothing counts as
+    "no change" and backs off the same way, without replacing the listing a
+    later change is compared with. Failed scrapes are retried after
+    ``min_interval`` without touching the estimate. Sources never seen are
+    always due.
+    """
+
+    def __init__(self, path: Path | None = None, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL):
+        self.path = Path(path) if path else state_path(SCHEDULE_NAME)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS sources (
+                company TEXT NOT NULL,
+                source TEXT NOT NULL,
+                interval REAL NOT NULL,
+                signature TEXT,
+                last_checked REAL NOT NULL,
+                last_changed REAL,
+                next_due REAL NOT NULL,
+                checks INTEGER NOT NULL,
+                changes INTEGER NOT NULL,
+                failures INTEGER NOT NULL,
+                PRIMARY KEY (company, source)
+            )"""
+        )
+        self._db.commit()
+
+    def _clamp(self, seconds: float) -> float:
+        return min(self.max_interval, max(self.min_interval, seconds))
+
+    def next_due(self, company: str, source: str) -> float | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT next_due FROM sources WHERE company = ? AND source = ?", (company, source)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_due(self, company: str, source: str, now: float | None = None) -> bool:
+        due = self.next_due(company, source)
+        return due is None or due <= (now or time.time())
+
+    def record(self, company: str, source: str, items: List[Dict[str, Any]], failed: bool = False,
+               now: float | None = None) -> float:
+        """Update the estimate from one scrape and return the source's next due time."""
+        now = now or time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT interval, signature, last_changed, checks, changes, failures FROM sources "
+                "WHERE company = ? AND source = ?",
+                (company, source),
+            ).fetchone()
+            interval, signature, last_changed, checks, changes, failures = row or (INITIAL_INTERVAL, None, None, 0, 0, 0)
+
+            if failed:
+                next_due = now + self.min_interval
+                failures += 1
+            else:
+                current = items_signature(items) if items else None
+                if current is None:
+                    # Quiet (or empty on first sight): check less and less often
+                    if row is not None:
+                        interval *= BACKOFF
+                elif signature is not None and current != signature:
+                    if last_changed:
+                        interval = EWMA_ALPHA * (now - last_changed) + (1 - EWMA_ALPHA) * interval
+                    last_changed = now
+                    changes += 1
+                elif signature is not None:
+                    interval *= BACKOFF
+                elif last_changed is None:
+                    # First sighting: the current items count as published now
+                    last_changed = now
+                signature = current or signature
+                interval = self._clamp(interval / CHECKS_PER_INTERVAL) * CHECKS_PER_INTERVAL
+                next_due = now + interval / CHECKS_PER_INTERVAL
+            checks += 1
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (company, source, interval, signature, now, last_changed, next_due, checks, changes, failures),
+            )
+            self._db.commit()
+        return next_due
+
+    def forget(self, company: str, source: str) -> None:
+        """Stop tracking a source (e.g. one no longer configured)."""
+        with self._lock:
+            self._db.execute("DELETE FROM sources WHERE company = ? AND source = ?", (company, source))
+            self._db.commit()
+
+    def state(self, now: float | None = None) -> List[Dict[str, Any]]:
+        """Every tracked source with its learned interval and due time."""
+        now = now or time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT company, source, interval, last_checked, last_changed, next_due, checks, changes, failures "
+                "FROM sources ORDER BY next_due"
+            ).fetchall()
+        return [
+            {
+                "company": company,
+                "source": source,
+                "publish_interval_s": round(interval),
+                "last_checked": isoformat(last_checked),
+                "last_changed": isoformat(last_changed),
+                "next_due": isoformat(next_due),
+                "due": next_due <= now,
+                "checks": checks,
+                "changes": changes,
+                "failures": failures,
+            }
+            for company, source, interval, last_checked, last_changed, next_due, checks, changes, failures in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
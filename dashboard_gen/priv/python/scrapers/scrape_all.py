@@ -1,40 +1,487 @@
+import argparse
 import json
 import sys
 import logging
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
 
 sys.path.append(str(Path(__file__).resolve().parent))
 
-from base import load_config, scrape_company
+from base import (
+    SOURCES,
+    attach_youtube_metrics,
+    is_live_source,
+    load_config,
+    normalize_company_name,
+    normalize_items,
+    slugify,
+    source_tasks,
+)
+from concurrency import DEFAULT_MAX_CONNECTIONS, DEFAULT_PER_HOST, configure_limits
+from deadline import Budget, DeadlineExceeded, RunDeadline, budget_scope
+from dedup import DEFAULT_NEAR_DUP_DISTANCE, Deduplicator
+from discovery import DEFAULT_DISCOVERY_TTL, configure_discovery
+from http_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, configure_cache, get_cache
+from http_client import DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, configure_client, connection_stats
+from metrics import get_metrics, metrics_scope
+from output import Emit, NdjsonWriter, discard, tee
+from parse_stage import DEFAULT_PARSE_WORKERS, configure_parse_stage, shutdown_parse_stage
+from parsers import BACKENDS, configure_parser, parser_backend
+from profiling import PROFILERS, Profiler
+from refresh_schedule import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, RefreshSchedule, isoformat
+from ratelimit import (
+    DEFAULT_BREAKER_COOLDOWN,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_HOST_BURST,
+    DEFAULT_HOST_RATE,
+    Requeue,
+    RetryLater,
+    breaker,
+    configure_rate_limits,
+    requeue_scope,
+)
+from seen_index import SeenIndex
+from sink import PartitionedSink
+from youtube_metrics import get_metrics_service
 
-COMPANY_SLUGS = [
-    "blackrock",
-    "j_p_morgan_asset_management", 
-    "goldman_sachs_private_wealth",
-    "fidelity_investments",
-]
+DEFAULT_WORKERS = 16
 
+# Sources whose items wait for one cross-company YouTube metrics lookup (when
+# there is an API key to look them up with)
+BATCHED_METRICS_SOURCES = {"youtube"}
 
-def scrape_all():
+# Outcome of one company/source scrape
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+Shard = Tuple[int, int]
+
+
+def shard_of(slug: str, count: int) -> int:
+    """Stable shard index of a company; unchanged when other companies are added."""
+    return zlib.crc32(slug.encode("utf-8")) % count
+
+
+def select_companies(config: Dict[str, Dict[str, Any]], companies: List[str] | None = None,
+                     shard: Shard | None = None) -> List[str]:
+    """Slugs to scrape, in config order.
+
+    ``companies`` takes slugs or company names; unknown ones are logged and
+    skipped. ``shard`` ``(i, n)`` keeps only the companies whose stable hash
+    falls in shard ``i`` of ``n``, so n processes split the list without overlap.
+    """
+    slugs = list(config)
+    if companies:
+        wanted = {slugify(company) for company in companies}
+        for slug in sorted(wanted - set(config)):
+            logging.warning("No config found for %s", slug)
+        slugs = [slug for slug in slugs if slug in wanted]
+    if shard:
+        index, count = shard
+        slugs = [slug for slug in slugs if shard_of(slug, count) == index]
+    return slugs
+
+
+class SourceRun:
+    """What one company/source scrape keeps when it is requeued and run again."""
+
+    def __init__(self):
+        self.started: float | None = None
+        self.budget: Budget | None = None
+        self.requeue = Requeue()
+
+
+def submit_requeueable(pool: ThreadPoolExecutor, fn: Callable[[], Any]) -> Future:
+    """Run ``fn`` on ``pool``, and again after the delay of every RetryLater it raises.
+
+    While the delay runs down no pool thread is held, so other sources use
+    it. The returned future resolves with ``fn``'s final result.
+    """
+    result: Future = Future()
+
+    def attempt():
+        try:
+            result.set_result(fn())
+        except RetryLater as e:
+            timer = threading.Timer(e.delay, pool.submit, (attempt,))
+            timer.daemon = True
+            timer.start()
+        except BaseException as e:
+            result.set_exception(e)
+
+    pool.submit(attempt)
+    return result
+
+
+def scrape_source(company: str, source: str, task, index: SeenIndex | None, emit: Emit,
+                  finish: bool = True, dedup: Deduplicator | None = None,
+                  schedule: RefreshSchedule | None = None,
+                  deadline: RunDeadline | None = None,
+                  run: SourceRun | None = None) -> Tuple[List[Dict[str, Any]], float, str]:
+    """Run one company/source scrape, reporting its progress through ``emit``.
+
+    Returns the items, the start time and the status (OK, FAILED when the
+    scrape raised, SKIPPED when it ran out of its time budget or never got to
+    start). With ``finish=False`` the items are returned unannotated and
+    unemitted so the caller can batch the YouTube metrics lookup before
+    ``finish_source``. With a ``run`` a fetch facing a long wait raises
+    RetryLater out of here instead of sleeping; calling again with the same
+    ``run`` carries on under the same budget (see ``submit_requeueable``).
+    """
+    if run is not None and run.started is not None:
+        started, budget = run.started, run.budget
+    else:
+        started = time.monotonic()
+        if deadline is not None and deadline.sources.expired():
+            emit(deadline.skip(company, source, "deadline"))
+            return [], started, SKIPPED
+        emit({"type": "source_start", "company": company, "source": source})
+        budget = deadline.source_budget() if deadline else None
+        if run is not None:
+            run.started, run.budget = started, budget
+    status = OK
+    try:
+        with budget_scope(budget), requeue_scope(run.requeue if run else None):
+            items = task()
+    except RetryLater:
+        raise
+    except Exception as e:
+        if isinstance(e, DeadlineExceeded) and deadline is not None:
+            logging.warning("%s scrape for %s ran out of time, skipping it", source, company)
+            emit(deadline.skip(company, source, "timeout", started))
+            if schedule is not None:
+                schedule.record(company, source, [], failed=True)
+            return [], started, SKIPPED
+        # With no run deadline, a budget the task set for itself ran out: report it as a failure
+        logging.warning("%s scrape failed for %s: %s", source, company, e)
+        emit({"type": "source_error", "company": company, "source": source, "error": str(e)})
+        items = []
+        status = FAILED
+    normalize_items(items)
+    if not finish:
+        return items, started, status
+    items = finish_source(company, source, attach_youtube_metrics(items), index, emit, started, dedup,
+                          schedule, status == FAILED)
+    return items, started, status
+
+
+def finish_source(company: str, source: str, items: List[Dict[str, Any]], index: SeenIndex | None,
+                  emit: Emit, started: float, dedup: Deduplicator | None = None,
+                  schedule: RefreshSchedule | None = None, failed: bool = False) -> List[Dict[str, Any]]:
+    if dedup is not None:
+        items = dedup.filter(items)
+    if schedule is not None:
+        # Learn from everything the source lists, not just the items new to the index
+        schedule.record(company, source, items, failed)
+    if index is not None:
+        items = index.filter_new(company, source, items)
+    for item in items:
+        emit({"type": "item", "company": company, "source": source, "data": item})
+    emit({
+        "type": "source_finish",
+        "company": company,
+        "source": source,
+        "items": len(items),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    })
+    return items
+
+
+def scrape_all(workers: int = DEFAULT_WORKERS, index: SeenIndex | None = None, emit: Emit | None = None,
+               slugs: List[str] | None = None, dedup: Deduplicator | None = None,
+               profiler: Profiler | None = None, config: Dict[str, Dict[str, Any]] | None = None,
+               sources: List[str] | None = None, schedule: RefreshSchedule | None = None,
+               due_only: bool = False, deadline: RunDeadline | None = None, sink: Emit | None = None):
+    """Scrape every company and source concurrently, keeping the sequential output order.
+
+    With a SeenIndex only items that are new or changed since the last run are
+    returned. With ``emit`` every item and per-source start/finish/error record
+    is streamed as soon as it is ready and nothing is accumulated. ``slugs``
+    narrows the run to the given companies (default: every configured one)
+    and ``sources`` to the given source names; ``config`` saves re-reading
+    the config file when the caller already loaded it. A Deduplicator drops repeated
+    items of each company/source before they are indexed or emitted. A
+    Profiler wraps every company's source scrapes on their pool threads. A
+    RefreshSchedule learns each configured source's publish rate from the
+    results (stub sources like twitter are left out of it); with
+    ``due_only`` sources it does not expect to have changed yet are skipped
+    and reported as ``source_skipped`` records. A RunDeadline gives every
+    source a time budget that bounds its fetches, retries and parses; sources
+    that exhaust it are cancelled and reported as skipped, and the run returns
+    what the others found. A ``sink`` (e.g. a PartitionedSink) receives the
+    same records as ``emit`` without changing what is returned.
+
+    A source whose next fetch must wait a while for its host (rate limit,
+    Retry-After, retry backoff) gives its pool thread back and is run again
+    once the wait is over; fetches it already finished are not repeated.
+
+    With a YouTube API key, YouTube sources are held back until every
+    company's feed is in, so their video metrics are fetched in one
+    cross-company batch; without one they stream like the other sources.
+    """
     results = []
-    config = load_config()
-    
-    for slug in COMPANY_SLUGS:
+    config = config if config is not None else load_config()
+    plan = []
+    keep = emit is None
+    emit = emit or discard
+    if sink is not None:
+        emit = tee(emit, sink)
+
+    for slug in config if slugs is None else slugs:
         if slug in config:
-            try:
-                items = scrape_company(slug)
-                if items:
-                    results.extend(items)
-            except Exception as e:
-                logging.warning("scraper for %s failed: %s", slug, e)
+            company = normalize_company_name(config[slug]["company"])
+            tasks = []
+            for source, task in source_tasks(config[slug], sources):
+                # Stub and unconfigured sources say nothing about publish rates
+                # and would otherwise look due forever
+                tracked = schedule if schedule is not None and is_live_source(config[slug], source) else None
+                if schedule is not None and tracked is None:
+                    schedule.forget(company, source)
+                if due_only and tracked is not None and not tracked.is_due(company, source):
+                    emit({"type": "source_skipped", "company": company, "source": source, "reason": "not_due",
+                          "next_due": isoformat(tracked.next_due(company, source))})
+                    continue
+                tasks.append((source, profiler.wrap(task) if profiler else task, tracked))
+            plan.append((slug, company, tasks))
         else:
             logging.warning("No config found for %s", slug)
-    
+    if deadline is not None:
+        deadline.plan(sum(len(tasks) for _, _, tasks in plan), workers)
+
+    # Source threads record into the caller's metrics collector
+    collector = get_metrics()
+
+    def run_scoped(*args):
+        with metrics_scope(collector):
+            return scrape_source(*args)
+
+    # Without an API key there is no metrics batch to wait for
+    held_back = BATCHED_METRICS_SOURCES if get_metrics_service() is not None else set()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        submitted = [
+            (slug, company, [
+                (source, tracked, submit_requeueable(pool, partial(
+                    run_scoped, company, source, task, index, emit, source not in held_back,
+                    dedup, tracked, deadline, SourceRun())))
+                for source, task, tracked in tasks
+            ])
+            for slug, company, tasks in plan
+        ]
+
+        outcomes = []
+        for slug, company, futures in submitted:
+            for source, tracked, future in futures:
+                try:
+                    items, started, status = future.result()
+                except Exception as e:
+                    logging.warning("scraper for %s failed: %s", slug, e)
+                    continue
+                if status != SKIPPED:
+                    outcomes.append((company, source, tracked, items, started, status))
+
+    batched = [o for o in outcomes if o[1] in held_back]
+    # The metrics batch spends the time the sources left over
+    with budget_scope(deadline.run if deadline else None):
+        attach_youtube_metrics([item for _, _, _, items, _, _ in batched for item in items])
+    for company, source, tracked, items, started, status in outcomes:
+        if source in held_back:
+            items = finish_source(company, source, items, index, emit, started, dedup, tracked, status == FAILED)
+        if keep:
+            results.extend(items)
+
     return results
 
 
-def main():
-    print(json.dumps(scrape_all()))
+def _csv(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _sources(value: str) -> List[str]:
+    sources = _csv(value)
+    unknown = [source for source in sources if source not in SOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown source(s) {', '.join(unknown)}; choose from {', '.join(SOURCES)}")
+    return sources
+
+
+def _shard(value: str) -> Shard:
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like i/N, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return index, count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape all configured competitors")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="scrape tasks run in parallel (1 = sequential)")
+    parser.add_argument("--companies", type=_csv, action="extend",
+                        help="comma-separated company slugs to scrape (repeatable; default all)")
+    parser.add_argument("--company", dest="companies", action="append",
+                        help="one company slug or name to scrape, commas and all (repeatable)")
+    parser.add_argument("--sources", type=_sources, action="extend",
+                        help=f"comma-separated source types to scrape ({', '.join(SOURCES)}; default all)")
+    parser.add_argument("--shard", type=_shard,
+                        help="run only shard i of N (0-based, e.g. 0/3), split by a stable hash of the company")
+    parser.add_argument("--deadline", type=float,
+                        help="seconds the whole run may take; sources still running then are cancelled and "
+                             "reported as skipped")
+    parser.add_argument("--source-budget", type=float,
+                        help="seconds one company/source may take under --deadline "
+                             "(default: an equal share of the deadline)")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help="global cap on in-flight HTTP requests")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="cap on in-flight HTTP requests to one host")
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE,
+                        help="sustained requests per second allowed to one host")
+    parser.add_argument("--host-burst", type=float, default=DEFAULT_HOST_BURST,
+                        help="requests one host may receive back to back")
+    parser.add_argument("--breaker-threshold", type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help="consecutive failures before a host is skipped")
+    parser.add_argument("--breaker-cooldown", type=float, default=DEFAULT_BREAKER_COOLDOWN,
+                        help="seconds a failing host is skipped before one trial request")
+    parser.add_argument("--pool-connections", type=int, default=DEFAULT_POOL_CONNECTIONS,
+                        help="number of per-host connection pools kept alive")
+    parser.add_argument("--pool-maxsize", type=int, default=DEFAULT_POOL_MAXSIZE,
+                        help="keep-alive connections kept per host")
+    parser.add_argument("--parser", choices=BACKENDS, default=parser_backend(),
+                        help="HTML parser backend (lxml-xpath enables XPath site adapters)")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="processes running the site adapters (0 = parse in the fetching thread)")
+    parser.add_argument("--max-pending-parses", type=int,
+                        help="fetched pages allowed to wait for a parse process before fetches pause")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the on-disk HTTP response cache")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help="seconds a cached response is served without revalidation")
+    parser.add_argument("--cache-max-bytes", type=int, default=DEFAULT_MAX_BYTES,
+                        help="size bound of the HTTP cache before LRU eviction")
+    parser.add_argument("--no-discovery", action="store_true",
+                        help="scrape configured pages without looking for their feeds or news sitemaps")
+    parser.add_argument("--discovery-ttl", type=float, default=DEFAULT_DISCOVERY_TTL,
+                        help="seconds a discovered feed (or the lack of one) is trusted before re-probing")
+    parser.add_argument("--incremental", action="store_true",
+                        help="emit only new or changed items plus per-source high-water marks")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="emit repeated URLs, identical content and near-duplicate titles as scraped")
+    parser.add_argument("--near-dup-distance", type=int, default=DEFAULT_NEAR_DUP_DISTANCE,
+                        help="max SimHash bit difference for two titles to count as one story (-1 disables)")
+    parser.add_argument("--due-only", action="store_true",
+                        help="scrape only sources the refresh schedule expects to have new items")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="seconds between checks of the most active source")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="longest a quiet source goes unchecked, in seconds")
+    parser.add_argument("--schedule-state", action="store_true",
+                        help="print every source's learned publish interval and next due time, then exit")
+    parser.add_argument("--sink", type=Path,
+                        help="also append items to company/source/day JSONL partitions under this directory "
+                             "(pair with --incremental so each item is stored once); query them with sink.py")
+    parser.add_argument("--stats-file", type=Path,
+                        help="write per-fetch and per-parse timing metrics as JSON to this file")
+    parser.add_argument("--profile", choices=PROFILERS,
+                        help="profile every company scrape with cProfile or pyinstrument")
+    parser.add_argument("--profile-out", type=Path, default=Path("scrape_all.prof"),
+                        help="where to write the merged profile (.html renders pyinstrument as HTML)")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json",
+                        help="json prints one array at exit (an object with the items and skipped sources "
+                             "under --incremental or --deadline); ndjson streams one record per line")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    deadline = RunDeadline(args.deadline, args.source_budget) if args.deadline else None
+    schedule = RefreshSchedule(min_interval=args.min_interval, max_interval=args.max_interval)
+    if args.schedule_state:
+        print(json.dumps(schedule.state()))
+        schedule.close()
+        return
+    profiler = Profiler(args.profile) if args.profile else None
+    configure_limits(args.max_connections, args.per_host)
+    configure_rate_limits(args.host_rate, args.host_burst, args.breaker_threshold, args.breaker_cooldown)
+    configure_client(args.pool_connections, args.pool_maxsize)
+    configure_cache(not args.no_cache, args.cache_ttl, args.cache_max_bytes)
+    configure_discovery(not args.no_discovery, args.discovery_ttl)
+    configure_parser(args.parser)
+    configure_parse_stage(args.parse_workers, args.max_pending_parses)
+    index = SeenIndex() if args.incremental else None
+    started = time.monotonic()
+    writer = NdjsonWriter() if args.format == "ndjson" else None
+    dedup = None if args.no_dedup else Deduplicator(args.near_dup_distance)
+    sink = PartitionedSink(args.sink) if args.sink else None
+    config = load_config()
+    slugs = select_companies(config, args.companies, args.shard)
+    results = scrape_all(args.workers, index, writer, slugs=slugs, dedup=dedup, profiler=profiler,
+                         config=config, sources=args.sources, schedule=schedule, due_only=args.due_only,
+                         deadline=deadline, sink=sink)
+    shutdown_parse_stage()
+    schedule.close()
+    if profiler is not None:
+        profiler.dump(args.profile_out)
+    metrics = get_metrics()
+    if args.stats_file:
+        metrics.write(args.stats_file)
+    stats = connection_stats()
+    logging.info("HTTP pool: %d requests, %d new connections, %d reused",
+                 stats["requests"], stats["new_connections"], stats["reused"])
+    if dedup is not None:
+        logging.info("Dedup: dropped %d items (%s)", dedup.total_dropped(),
+                     ", ".join(f"{reason}={count}" for reason, count in sorted(dedup.dropped.items())) or "none")
+    skipped = deadline.skipped if deadline else []
+    if skipped:
+        logging.warning("Deadline of %.0fs: skipped %s", deadline.seconds,
+                        ", ".join(f"{s['company']}/{s['source']} ({s['reason']})" for s in skipped))
+    open_hosts = breaker.open_hosts()
+    if open_hosts:
+        logging.warning("Circuit open for: %s", ", ".join(sorted(open_hosts)))
+    cache = get_cache()
+    if cache:
+        logging.info("HTTP cache: %d hits, %d revalidated, %d misses",
+                     cache.outcomes["hit"], cache.outcomes["revalidated"], cache.outcomes["miss"])
+    if index is not None:
+        # Watermarks include this run's items; they are committed once written out
+        index.prepare()
+    if writer is not None:
+        for watermark in index.watermarks() if index else []:
+            writer({"type": "watermark", **watermark})
+        writer({"type": "metrics", **metrics.snapshot()})
+        finish = {"type": "run_finish", "elapsed_ms": round((time.monotonic() - started) * 1000, 1)}
+        if dedup is not None:
+            finish["dropped_duplicates"] = dict(dedup.dropped)
+        if deadline is not None:
+            finish["skipped_sources"] = len(skipped)
+        writer(finish)
+    elif index is None and deadline is None:
+        print(json.dumps(results))
+    else:
+        # A run under a deadline may be partial; say which sources are missing
+        envelope: Dict[str, Any] = {"items": results}
+        if index is not None:
+            envelope["watermarks"] = index.watermarks()
+        envelope.update(metrics=metrics.summary(), skipped=skipped, partial=bool(skipped))
+        print(json.dumps(envelope))
+        sys.stdout.flush()
+    if sink is not None:
+        sink.commit()
+        logging.info("Sink: stored %d items under %s", sink.written, args.sink)
+    if index is None:
+        return
+    # Only remember items once the delta has actually been written out
+    index.commit()
+    index.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from dedup import url_key
+from state import state_path
+
+INDEX_NAME = "seen_items.sqlite3"
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    # Only what the item says counts: engagement metrics and dates that sites
+    # re-render ("2 hours ago", a re-formatted timestamp) must not make it "changed"
+    payload = "\x1f".join(str(item.get(field, "")) for field in ("title", "content", "url"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+class SeenIndex:
+    """Per company/source index of canonical URLs and content hashes.
+
+    ``filter_new`` only decides what is new and keeps the pending writes in
+    memory. ``prepare`` writes them (and the watermarks) in a transaction
+    that ``commit`` ends; call ``commit`` only after the delta has been
+    delivered so a crashed run re-emits instead of losing items, and
+    ``rollback`` when it was not. Each run or worker request uses its own
+    SeenIndex, so one never commits another's half-finished writes, and the
+    database is only locked between ``prepare`` and ``commit``.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else state_path(INDEX_NAME)
+        self._lock = threading.Lock()
+        # Other runs hold the write lock only while they commit
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                company TEXT NOT NULL,
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                UNIQUE (company, source, key)
+            );
+            CREATE TABLE IF NOT EXISTS watermarks (
+                company TEXT NOT NULL,
+                source TEXT NOT NULL,
+                high_water_mark INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                new_items INTEGER NOT NULL,
+                PRIMARY KEY (company, source)
+            );
+            """
+        )
+        self._db.commit()
+        self._touched: Dict[tuple, int] = {}
+        # (company, source, key) -> (content hash, new or changed, seen at)
+        self._pending: Dict[tuple, Tuple[str, bool, float]] = {}
+        self._prepared = False
+
+    def filter_new(self, company: str, source: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return only items that are new or whose content changed since the last run."""
+        now = time.time()
+        fresh: List[Dict[str, Any]] = []
+        with self._lock:
+            if self._prepared:
+                raise RuntimeError("SeenIndex already prepared; commit or roll back first")
+            for item in items:
+                digest = content_hash(item)
+                key = url_key(item["url"]) if item.get("url") else "hash:" + digest
+                pending = self._pending.get((company, source, key))
+                if pending is not None:
+                    stored = pending[0]
+                else:
+                    row = self._db.execute(
+                        "SELECT content_hash FROM items WHERE company = ? AND source = ? AND key = ?",
+                        (company, source, key),
+                    ).fetchone()
+                    stored = row[0] if row else None
+                if stored != digest:
+                    self._pending[(company, source, key)] = (digest, True, now)
+                    fresh.append(item)
+                elif pending is None:
+                    self._pending[(company, source, key)] = (digest, False, now)
+            self._touched[(company, source)] = len(fresh)
+        return fresh
+
+    def _prepare(self) -> None:
+        if self._prepared:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        for (company, source, key), (digest, changed, seen_at) in self._pending.items():
+            if changed:
+                # Re-sequence changed items so they land above the old watermark
+                self._db.execute(
+                    "DELETE FROM items WHERE company = ? AND source = ? AND key = ?", (company, source, key)
+                )
+                self._db.execute(
+                    "INSERT INTO items (company, source, key, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                    (company, source, key, digest, seen_at, seen_at),
+                )
+            else:
+                self._db.execute(
+                    "UPDATE items SET last_seen = ? WHERE company = ? AND source = ? AND key = ?",
+                    (seen_at, company, source, key),
+                )
+        now = time.time()
+        for (company, source), new_items in self._touched.items():
+            high = self._db.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM items WHERE company = ? AND source = ?", (company, source)
+            ).fetchone()[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+                (company, source, high, now, new_items),
+            )
+        self._pending = {}
+        self._prepared = True
+
+    def prepare(self) -> None:
+        """Write this run's items and watermarks without committing them yet."""
+        with self._lock:
+            self._prepare()
+
+    def watermarks(self) -> List[Dict[str, Any]]:
+        """High-water marks for the sources seen in this run (up to date after ``prepare``)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT company, source, high_water_mark, updated_at, new_items FROM watermarks ORDER BY company, source"
+            ).fetchall()
+        return [
+            {
+                "company": company,
+                "source": source,
+                "high_water_mark": high,
+                "updated_at": _iso(updated_at),
+                "new_items": new_items,
+            }
+            for company, source, high, updated_at, new_items in rows
+            if (company, source) in self._touched
+        ]
+
+    def commit(self) -> None:
+        with self._lock:
+            self._prepare()
+            self._db.commit()
+            self._prepared = False
+
+    def rollback(self) -> None:
+        """Forget this run's items, e.g. when they could not be delivered."""
+        with self._lock:
+            self._db.rollback()
+            self._pending = {}
+            self._touched = {}
+            self._prepared = False
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
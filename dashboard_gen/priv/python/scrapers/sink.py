@@ -0,0 +1,276 @@
+"""Append-only result store partitioned by company, source and day.
+
+Items land in ``<root>/<company>/<source>/<YYYY-MM-DD>.jsonl``, one JSON
+object per line, keyed by the item's own publish date (or the day it was
+scraped when the date is missing or unparseable). ``<root>/manifest.json``
+lists every partition with its item count, byte size and the time range of
+its items, so readers open only the partitions they need::
+
+    python sink.py DIR query --company blackrock --since 2025-01-01 --limit 20
+    python sink.py DIR manifest
+    python sink.py DIR rebuild
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from names import slugify
+from output import Event
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Date spellings seen in scraped items besides ISO 8601 and RFC 822
+_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%m/%d/%Y")
+
+
+def item_timestamp(value: str | None) -> Optional[datetime]:
+    """Parse an item's date string into an aware datetime (UTC when no zone is given)."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    parsed = None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            for fmt in _DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(value, fmt)
+                    break
+                except ValueError:
+                    continue
+    if parsed is None:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _iso(ts: datetime) -> str:
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, a single writer is assumed
+    fcntl = None
+
+
+@contextmanager
+def _manifest_lock(root: Path) -> Iterator[None]:
+    """Serialise manifest updates between processes writing to the same root (e.g. shards)."""
+    if fcntl is None:
+        yield
+        return
+    with open(root / ".manifest.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_manifest(root: Path) -> Dict[str, Any]:
+    path = Path(root) / MANIFEST_NAME
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "updated_at": None, "partitions": {}}
+    return json.loads(path.read_text())
+
+
+def _write_manifest(root: Path, manifest: Dict[str, Any]) -> None:
+    manifest["updated_at"] = _iso(datetime.now(timezone.utc))
+    tmp = root / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp, root / MANIFEST_NAME)
+
+
+def _merge(entry: Dict[str, Any] | None, update: Dict[str, Any]) -> Dict[str, Any]:
+    if entry is None:
+        return dict(update)
+    merged = dict(entry)
+    merged["items"] += update["items"]
+    merged["bytes"] += update["bytes"]
+    for key, pick in (("first_item", min), ("last_item", max), ("first_written", min), ("last_written", max)):
+        merged[key] = pick(entry[key], update[key])
+    return merged
+
+
+class PartitionedSink:
+    """Emit target that appends every ``item`` event to its partition file.
+
+    Other events are ignored. Partition statistics are gathered in memory
+    and folded into the manifest by ``commit``, which the caller runs once
+    the items are safely written (``rebuild_manifest`` recovers from a run
+    that died in between). Safe to call from several scrape threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._files: Dict[str, TextIO] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self.written = 0
+
+    def __call__(self, event: Event) -> None:
+        if event.get("type") == "item":
+            self.write(event["company"], event["source"], event["data"])
+
+    def write(self, company: str, source: str, item: Dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc)
+        published = item_timestamp(item.get("date"))
+        stamp = published or now
+        key = f"{slugify(company)}/{source}/{stamp.astimezone(timezone.utc).date().isoformat()}"
+        line = json.dumps({**item, "scraped_at": _iso(now)}) + "\n"
+        update = {
+            "company": slugify(company),
+            "source": source,
+            "date": key.rsplit("/", 1)[1],
+            "path": f"{key}.jsonl",
+            "items": 1,
+            "bytes": len(line.encode("utf-8")),
+            "first_item": _iso(stamp),
+            "last_item": _iso(stamp),
+            "first_written": _iso(now),
+            "last_written": _iso(now),
+        }
+        with self._lock:
+            handle = self._files.get(key)
+            if handle is None:
+                path = self.root / update["path"]
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handle = self._files[key] = open(path, "a", encoding="utf-8")
+            handle.write(line)
+            self._pending[key] = _merge(self._pending.get(key), update)
+            self.written += 1
+
+    def commit(self) -> None:
+        """Flush the partition files and fold this batch's statistics into the manifest."""
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files = {}
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with _manifest_lock(self.root):
+            manifest = load_manifest(self.root)
+            for key, update in pending.items():
+                manifest["partitions"][key] = _merge(manifest["partitions"].get(key), update)
+            _write_manifest(self.root, manifest)
+
+    close = commit
+
+
+def rebuild_manifest(root: Path) -> Dict[str, Any]:
+    """Recompute the manifest by scanning every partition file."""
+    root = Path(root)
+    partitions: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(root.glob("*/*/*.jsonl")):
+        company, source, date = path.parent.parent.name, path.parent.name, path.stem
+        key = f"{company}/{source}/{date}"
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                written = item.get("scraped_at", "")
+                stamp = item_timestamp(item.get("date"))
+                stamp = _iso(stamp) if stamp else written
+                partitions[key] = _merge(partitions.get(key), {
+                    "company": company, "source": source, "date": date, "path": f"{key}.jsonl",
+                    "items": 1, "bytes": len(line.encode("utf-8")),
+                    "first_item": stamp, "last_item": stamp, "first_written": written, "last_written": written,
+                })
+    with _manifest_lock(root):
+        manifest = {"version": MANIFEST_VERSION, "partitions": partitions}
+        _write_manifest(root, manifest)
+    return manifest
+
+
+def select_partitions(manifest: Dict[str, Any], company: str | None = None, source: str | None = None,
+                      since: str | None = None, until: str | None = None) -> List[Dict[str, Any]]:
+    """Manifest entries matching the filters, newest day first; dates are YYYY-MM-DD and inclusive."""
+    wanted = slugify(company) if company else None
+    chosen = [
+        entry for entry in manifest["partitions"].values()
+        if (wanted is None or entry["company"] == wanted)
+        and (source is None or entry["source"] == source)
+        and (since is None or entry["date"] >= since)
+        and (until is None or entry["date"] <= until)
+    ]
+    return sorted(chosen, key=lambda entry: (entry["date"], entry["company"], entry["source"]), reverse=True)
+
+
+def read_items(root: Path, company: str | None = None, source: str | None = None, since: str | None = None,
+               until: str | None = None, limit: int | None = None) -> Iterator[Dict[str, Any]]:
+    """Stream items from only the partitions that match, newest day first."""
+    root = Path(root)
+    count = 0
+    for entry in select_partitions(load_manifest(root), company, source, since, until):
+        path = root / entry["path"]
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield json.loads(line)
+
+
+def summary(manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per company/source totals: partitions, items, bytes and the time range covered."""
+    totals: Dict[tuple, Dict[str, Any]] = {}
+    for entry in manifest["partitions"].values():
+        key = (entry["company"], entry["source"])
+        total = totals.get(key)
+        if total is None:
+            totals[key] = {**{k: entry[k] for k in ("company", "source", "items", "bytes", "first_item", "last_item")},
+                           "partitions": 1}
+            continue
+        total["partitions"] += 1
+        total["items"] += entry["items"]
+        total["bytes"] += entry["bytes"]
+        total["first_item"] = min(total["first_item"], entry["first_item"])
+        total["last_item"] = max(total["last_item"], entry["last_item"])
+    return [totals[key] for key in sorted(totals)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the partitioned scraper result store")
+    parser.add_argument("root", type=Path, help="directory given to scrape_all --sink")
+    commands = parser.add_subparsers(dest="command", required=True)
+    query = commands.add_parser("query", help="print matching items as JSON lines, newest day first")
+    query.add_argument("--company", help="company slug or name")
+    query.add_argument("--source", help="source name (press_releases, youtube, ...)")
+    query.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    query.add_argument("--until", help="last day to include (YYYY-MM-DD)")
+    query.add_argument("--limit", type=int, help="stop after this many items")
+    commands.add_parser("manifest", help="print item counts and time ranges per company and source")
+    commands.add_parser("rebuild", help="recompute the manifest from the partition files")
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        for item in read_items(args.root, args.company, args.source, args.since, args.until, args.limit):
+            print(json.dumps(item))
+    elif args.command == "manifest":
+        print(json.dumps(summary(load_manifest(args.root)), indent=1))
+    else:
+        manifest = rebuild_manifest(args.root)
+        print(f"rebuilt manifest with {len(manifest['partitions'])} partitions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
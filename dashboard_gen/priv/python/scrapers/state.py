@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+# Persistent scraper state (HTTP cache, indexes, schedules) lives here unless
+# SCRAPER_STATE_DIR points somewhere else
+STATE_DIR = Path(os.getenv("SCRAPER_STATE_DIR") or Path(__file__).with_name(".cache"))
+
+
+def state_path(name: str) -> Path:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    return STATE_DIR / name
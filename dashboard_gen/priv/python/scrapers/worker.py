@@ -0,0 +1,266 @@
+"""Long-lived scraper worker speaking line-delimited JSON on stdin/stdout.
+
+Each stdin line is a request such as::
+
+    {"id": "42", "op": "scrape_all"}
+    {"id": "43", "op": "scrape_company", "company": "blackrock", "incremental": true}
+    {"id": "44", "op": "scrape_all", "sources": ["press_releases"]}
+    {"id": "45", "op": "scrape_all", "incremental": true, "due_only": true, "deadline": 120}
+    {"id": "46", "op": "schedule"}
+    {"id": "47", "op": "reload_config"}
+    {"id": "48", "op": "health"}
+
+Responses are NDJSON records tagged with the request id: the same
+source_start/item/source_error/source_skipped/source_finish records as
+``scrape_all --format ndjson``, then one ``done`` (or ``error``) record.
+A request with a malformed field gets an ``error`` record and never runs.
+Several requests run at once; the pooled session, HTTP cache and compiled
+adapters stay warm between them. The worker exits after stdin closes and
+in-flight requests finish, so it can be owned by an Erlang port. Started
+with ``--sink DIR`` it also stores every item in the partitioned result
+store (see sink.py), updating its manifest after each request.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from adapters import reload_adapters
+from base import SOURCES, load_config, slugify
+from deadline import RunDeadline
+from dedup import Deduplicator
+from http_cache import get_cache
+from http_client import connection_stats
+from metrics import Metrics, add_totals, metrics_scope
+from output import NdjsonWriter
+from parse_stage import WORKER_PARSE_WORKERS, configure_parse_stage, reload_parse_stage, shutdown_parse_stage
+from refresh_schedule import RefreshSchedule
+from scrape_all import DEFAULT_WORKERS, scrape_all
+from seen_index import SeenIndex
+from sink import PartitionedSink
+
+DEFAULT_MAX_REQUESTS = 4
+
+
+def _check(request: Dict[str, Any], field: str, kinds: tuple, what: str) -> None:
+    value = request.get(field)
+    # bool is an int subclass, so true is not accepted as a number (nor 1 as a flag)
+    if value is not None and (isinstance(value, bool) != (bool in kinds) or not isinstance(value, kinds)):
+        raise ValueError(f"{field} must be {what}, got {json.dumps(value)}")
+
+
+def validate_request(request: Dict[str, Any]) -> None:
+    """Reject a scrape request whose fields have the wrong type or value (raises ValueError)."""
+    _check(request, "company", (str,), "a string")
+    _check(request, "sources", (list,), "a list of source names")
+    _check(request, "incremental", (bool,), "true or false")
+    _check(request, "due_only", (bool,), "true or false")
+    for field in ("deadline", "source_budget"):
+        _check(request, field, (int, float), "a number of seconds")
+        if request.get(field) is not None and request[field] <= 0:
+            raise ValueError(f"{field} must be positive, got {request[field]}")
+    if request.get("op") == "scrape_company" and not request.get("company"):
+        raise ValueError("scrape_company needs a company")
+    sources = request.get("sources")
+    if sources is not None:
+        if not all(isinstance(source, str) for source in sources):
+            raise ValueError("sources must be a list of source names")
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"unknown source(s) {', '.join(sorted(unknown))}")
+
+
+class ScraperWorker:
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_requests: int = DEFAULT_MAX_REQUESTS, stream=None,
+                 sink: Path | None = None):
+        self.workers = workers
+        # Shared by concurrent requests so each partition file has one writer
+        self.sink = PartitionedSink(sink) if sink else None
+        self.writer = NdjsonWriter(stream)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, max_requests))
+        self.started = time.monotonic()
+        self.active = 0
+        self.served = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._schedule: RefreshSchedule | None = None
+        # Health keeps counters across requests and the last request's summary, not records
+        self.totals: Dict[str, Any] = {}
+        self.last_metrics: Dict[str, Any] | None = None
+
+    def schedule(self) -> RefreshSchedule:
+        with self._lock:
+            if self._schedule is None:
+                self._schedule = RefreshSchedule()
+            return self._schedule
+
+    def handle_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self.writer({"id": None, "type": "error", "error": f"invalid request: {e}"})
+            return
+
+        op = request.get("op")
+        if op == "health":
+            # Answered inline so health checks never queue behind scrapes
+            self.writer({"id": request.get("id"), "type": "health", **self.health()})
+        elif op == "schedule":
+            self.writer({"id": request.get("id"), "type": "schedule", "sources": self.schedule().state()})
+        elif op in ("scrape_all", "scrape_company", "reload_config"):
+            try:
+                validate_request(request)
+            except ValueError as e:
+                self.writer({"id": request.get("id"), "type": "error", "error": f"invalid request: {e}"})
+                return
+            with self._lock:
+                self.active += 1
+            self.pool.submit(self._run, request)
+        else:
+            self.writer({"id": request.get("id"), "type": "error", "error": f"unknown op {op!r}"})
+
+    def _run(self, request: Dict[str, Any]) -> None:
+        request_id = request.get("id")
+        emit = lambda event: self.writer({"id": request_id, **event})
+        started = time.monotonic()
+        try:
+            done = self._dispatch(request, emit)
+            done["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+            emit({"type": "done", **done})
+            outcome = "served"
+        except Exception as e:
+            logging.exception("worker request %s failed", request_id)
+            emit({"type": "error", "error": str(e)})
+            outcome = "failed"
+        with self._lock:
+            self.active -= 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _dispatch(self, request: Dict[str, Any], emit) -> Dict[str, Any]:
+        op = request["op"]
+        if op == "reload_config":
+            reload_adapters()
+            # Parse processes hold their own adapter registry; new parses go
+            # to fresh ones while other requests' queued parses drain
+            reload_parse_stage()
+            return {"companies": sorted(load_config())}
+
+        # The deadline covers the request from the moment it is picked up
+        deadline = RunDeadline(request["deadline"], request.get("source_budget")) if request.get("deadline") else None
+        config = load_config()
+        slugs = None
+        if op == "scrape_company":
+            slug = slugify(request["company"])
+            if slug not in config:
+                raise ValueError(f"no config for company {request['company']!r}")
+            slugs = [slug]
+
+        # Each request has its own index connection, so its writes are
+        # committed only with its own delivery and dropped when it fails
+        index = SeenIndex() if request.get("incremental") else None
+        try:
+            done = self._scrape(request, emit, config, slugs, index, deadline)
+            if index is not None:
+                index.commit()
+                done["watermarks"] = index.watermarks()
+        except BaseException:
+            if index is not None:
+                index.rollback()
+            raise
+        finally:
+            if index is not None:
+                index.close()
+        return done
+
+    def _scrape(self, request: Dict[str, Any], emit, config: Dict[str, Any], slugs: List[str] | None,
+                index: SeenIndex | None, deadline: RunDeadline | None) -> Dict[str, Any]:
+        counts = {"items": 0}
+
+        def counting_emit(event):
+            if event["type"] == "item":
+                counts["items"] += 1
+            emit(event)
+
+        dedup = Deduplicator()
+        # Each request collects its own fetch and parse records, dropped once it is done
+        metrics = Metrics()
+        with metrics_scope(metrics):
+            scrape_all(self.workers, index, counting_emit, slugs=slugs, dedup=dedup, config=config,
+                       sources=request.get("sources"), schedule=self.schedule(),
+                       due_only=bool(request.get("due_only")), deadline=deadline, sink=self.sink)
+        summary = metrics.summary()
+        with self._lock:
+            add_totals(self.totals, summary)
+            self.last_metrics = summary
+        if self.sink is not None:
+            self.sink.commit()
+        done: Dict[str, Any] = dict(counts)
+        done["dropped_duplicates"] = dict(dedup.dropped)
+        done["metrics"] = summary
+        if deadline is not None:
+            done["skipped"] = deadline.skipped
+        return done
+
+    def health(self) -> Dict[str, Any]:
+        cache = get_cache()
+        with self._lock:
+            status = {
+                "status": "ok",
+                "pid": os.getpid(),
+                "uptime_s": round(time.monotonic() - self.started, 1),
+                "active_requests": self.active,
+                "served": self.served,
+                "failed": self.failed,
+                "metrics": {
+                    "totals": {**self.totals, "outcomes": dict(self.totals.get("outcomes", {}))},
+                    "last_request": self.last_metrics,
+                },
+            }
+        stats = connection_stats()
+        status["connections"] = {key: stats[key] for key in ("requests", "new_connections", "reused")}
+        status["cache"] = dict(cache.outcomes) if cache else None
+        return status
+
+    def serve(self, stdin=None) -> None:
+        self.writer({"id": None, "type": "ready", "pid": os.getpid()})
+        for line in stdin or sys.stdin:
+            self.handle_line(line)
+        # stdin closed: let in-flight requests finish, then exit
+        self.pool.shutdown(wait=True)
+        shutdown_parse_stage()
+        if self._schedule is not None:
+            self._schedule.close()
+        if self.sink is not None:
+            self.sink.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistent scraper worker (JSON lines on stdin/stdout)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="scrape tasks run in parallel within one request")
+    parser.add_argument("--max-requests", type=int, default=DEFAULT_MAX_REQUESTS,
+                        help="requests served concurrently")
+    parser.add_argument("--parse-workers", type=int, default=WORKER_PARSE_WORKERS,
+                        help="processes running the site adapters (0 = parse in the fetching thread)")
+    parser.add_argument("--sink", type=Path,
+                        help="also append items to company/source/day JSONL partitions under this directory")
+    args = parser.parse_args(argv)
+    configure_parse_stage(args.parse_workers)
+    ScraperWorker(args.workers, args.max_requests, sink=args.sink).serve()
+
+
+if __name__ == "__main__":
+    main()
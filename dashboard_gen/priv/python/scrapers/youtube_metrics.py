@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from concurrency import fetch_slot
+from deadline import budget_scope, current_budget, remaining
+from http_client import get_session
+from metrics import get_metrics, metrics_scope
+from state import state_path
+
+API_URL = os.getenv("YOUTUBE_API_URL", "https://www.googleapis.com/youtube/v3/videos")
+MAX_IDS_PER_CALL = 50  # Hard limit of the Data API videos.list endpoint
+DEFAULT_PARALLEL = 4
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+# (max video age, stats TTL): new videos gain views quickly, old ones barely move
+TTL_BY_AGE = [
+    (2 * DAY, HOUR),
+    (30 * DAY, 12 * HOUR),
+    (365 * DAY, 3 * DAY),
+]
+MAX_TTL = 14 * DAY
+
+
+def ttl_for(published_at: str, now: float | None = None) -> float:
+    """Cache lifetime for a video's statistics based on how old the video is."""
+    if not published_at:
+        return HOUR
+    try:
+        published = datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return HOUR
+    age = (now or time.time()) - published
+    for max_age, ttl in TTL_BY_AGE:
+        if age < max_age:
+            return ttl
+    return MAX_TTL
+
+
+def _parse_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    stats = item.get("statistics", {})
+    snippet = item.get("snippet", {})
+    details = item.get("contentDetails", {})
+    return {
+        "view_count": int(stats.get("viewCount", 0)),
+        "like_count": int(stats.get("likeCount", 0)),
+        "comment_count": int(stats.get("commentCount", 0)),
+        "duration": details.get("duration", snippet.get("duration", "")),
+        "published_at": snippet.get("publishedAt", ""),
+    }
+
+
+class YouTubeMetricsService:
+    """Batched, cached lookups of YouTube video statistics.
+
+    IDs are de-duplicated, served from a SQLite cache whose TTL depends on
+    video age, and the rest are fetched in chunks of 50 in parallel.
+    """
+
+    def __init__(self, api_key: str, api_url: str = API_URL, cache_path: Path | None = None,
+                 parallel: int = DEFAULT_PARALLEL):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.parallel = max(1, parallel)
+        self.api_calls = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(cache_path or state_path("youtube_metrics.sqlite3")), check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS video_stats (
+                video_id TEXT PRIMARY KEY,
+                metrics TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    def _cached(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for start in range(0, len(video_ids), 500):
+                chunk = video_ids[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT video_id, metrics FROM video_stats WHERE expires_at > ? AND video_id IN ({','.join('?' * len(chunk))})",
+                    [now, *chunk],
+                ).fetchall()
+                found.update((video_id, json.loads(metrics)) for video_id, metrics in rows)
+        return found
+
+    def _store(self, metrics: Dict[str, Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO video_stats VALUES (?, ?, ?, ?)",
+                [
+                    (video_id, json.dumps(m), now, now + ttl_for(m.get("published_at", ""), now))
+                    for video_id, m in metrics.items()
+                ],
+            )
+            self._db.commit()
+
+    def _fetch_chunk(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        params = {
+            "part": "statistics,snippet,contentDetails",
+            "id": ",".join(video_ids),
+            "key": self.api_key,
+        }
+        with get_metrics().fetch(self.api_url) as record:
+            record.attempts = 1
+            try:
+                with fetch_slot(self.api_url):
+                    response = get_session().get(self.api_url, params=params, timeout=remaining(10))
+                record.status = response.status_code
+                record.bytes = len(response.content)
+                response.raise_for_status()
+                data = response.json()
+            except Exception as e:
+                logging.warning("YouTube API request failed: %s", e)
+                return {}
+            record.outcome = "miss"
+        with self._lock:
+            self.api_calls += 1
+        return {item["id"]: _parse_item(item) for item in data.get("items", [])}
+
+    def fetch(self, video_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return metrics for every resolvable ID, calling the API only for stale or unknown ones."""
+        unique = list(dict.fromkeys(vid for vid in video_ids if vid))
+        if not unique:
+            return {}
+        metrics = self._cached(unique)
+        with self._lock:
+            self.cache_hits += len(metrics)
+        missing = [vid for vid in unique if vid not in metrics]
+        chunks = [missing[i:i + MAX_IDS_PER_CALL] for i in range(0, len(missing), MAX_IDS_PER_CALL)]
+        if chunks:
+            # Chunks run on their own threads, under the caller's time budget and metrics
+            budget = current_budget()
+            collector = get_metrics()
+
+            def fetch_chunk(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+                with budget_scope(budget), metrics_scope(collector):
+                    return self._fetch_chunk(chunk)
+
+            with ThreadPoolExecutor(max_workers=min(self.parallel, len(chunks))) as pool:
+                for fetched in pool.map(fetch_chunk, chunks):
+                    self._store(fetched)
+                    metrics.update(fetched)
+        return metrics
+
+
+_services: Dict[str, YouTubeMetricsService] = {}
+_services_lock = threading.Lock()
+
+
+def get_metrics_service(api_key: Optional[str] = None) -> Optional[YouTubeMetricsService]:
+    """Process-wide service for the given (or YOUTUBE_API_KEY) key, or None without a key."""
+    api_key = api_key or os.getenv("YOUTUBE_API_KEY")
+    if not api_key:
+        return None
+    with _services_lock:
+        service = _services.get(api_key)
+        if service is None:
+            service = _services[api_key] = YouTubeMetricsService(api_key)
+        return service
@@ -0,0 +1,121 @@
+"""Shared fixtures for the scraper unit tests.
+
+Every test session gets its own state directory, so the HTTP cache,
+seen-items index, schedule and discovery store never touch the real ones.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+os.environ["SCRAPER_STATE_DIR"] = tempfile.mkdtemp(prefix="scraper-tests-")
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scrapers"))
+
+import pytest
+
+# path -> (status, headers, body) or a callable of the request path (with query) returning one
+Route = Tuple[int, Dict[str, str], bytes]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.hits.append(self.path)
+        server.request_headers.append(dict(self.headers))
+        route = server.routes.get(self.path.split("?")[0], (404, {}, b""))
+        if callable(route):
+            route = route(self.path)
+        status, headers, body = route
+        delay = server.delays.get(self.path.split("?")[0])
+        if delay:
+            time.sleep(delay)
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class LocalSite:
+    """A tiny HTTP server whose responses are set per path by the test."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.routes = {}
+        self.server.delays = {}
+        self.server.hits = []
+        self.server.request_headers = []
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def hits(self):
+        return self.server.hits
+
+    @property
+    def request_headers(self):
+        """Headers of each request, in the order of ``hits``."""
+        return self.server.request_headers
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}{path}"
+
+    def route(self, path: str, body: bytes | Callable[[str], Route] = b"", status: int = 200,
+              content_type: str = "text/html", delay: float = 0.0) -> str:
+        self.server.routes[path] = body if callable(body) else (status, {"Content-Type": content_type}, body)
+        if delay:
+            self.server.delays[path] = delay
+        return self.url(path)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site():
+    local = LocalSite()
+    yield local
+    local.close()
+
+
+@pytest.fixture
+def fetch_env():
+    """Fetch stack with no cache, no discovery and fast, forgiving limits; restored afterwards."""
+    from discovery import configure_discovery
+    from http_cache import configure_cache
+    from ratelimit import configure_rate_limits
+
+    configure_cache(False)
+    configure_discovery(False)
+    configure_rate_limits(rate=1000, burst=1000)
+    yield
+    configure_cache(False)
+    configure_discovery(False)
+    configure_rate_limits()
+
+
+@pytest.fixture
+def cache(fetch_env, tmp_path):
+    """``fetch_env`` with a fresh, empty HTTP cache of this test's own."""
+    import http_cache
+
+    http_cache.configure_cache(True)
+    http_cache._cache = http_cache.HttpCache(tmp_path / "http_cache.sqlite3")
+    yield http_cache._cache
+    http_cache.configure_cache(False)
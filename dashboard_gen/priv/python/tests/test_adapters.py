@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from soupsieve import SoupSieve
+
+from adapters import AdapterRegistry, adapter_for, get_registry, load_adapters
+
+BLACKROCK = b"""<html><body><nav><a href="/press">All press releases</a></nav><ul>""" + b"".join(
+    b'<li class="article-cntnr"><a class="article-wrapper-link" href="/news/%d">'
+    b'<h2 class="title">BlackRock announcement %d</h2></a>'
+    b'<div class="attribution-text"><span>Jan %d, 2025</span></div></li>' % (i, i, i + 1)
+    for i in range(12)
+) + b"</ul></body></html>"
+
+
+@pytest.mark.parametrize("url, name", [
+    ("https://www.blackrock.com/corporate/newsroom", "blackrock"),
+    ("https://newsroom.fidelity.com/press", "fidelity"),
+    ("https://corporate.vanguard.com/content/news", "vanguard"),
+    ("https://example.com/news", "generic"),
+    ("not a url", "generic"),
+])
+def test_hosts_and_their_subdomains_resolve_to_one_adapter(url, name):
+    assert adapter_for(url).name == name
+
+
+def test_selectors_are_compiled_once_when_loaded():
+    registry = get_registry()
+    assert registry is get_registry()
+    for name in ("blackrock", "vanguard", "fidelity", "generic"):
+        for strategy in registry.get(name).strategies:
+            assert isinstance(strategy.items, SoupSieve)
+
+
+def test_site_adapter_extracts_items_up_to_its_limit():
+    items = adapter_for("https://www.blackrock.com/").parse(BLACKROCK, "https://www.blackrock.com/newsroom", "BlackRock")
+    assert len(items) == 10
+    assert items[0] == {
+        "source": "press_release", "company": "BlackRock", "date": "Jan 1, 2025",
+        "title": "BlackRock announcement 0", "content": "", "url": "https://www.blackrock.com/news/0",
+    }
+
+
+def test_generic_adapter_stops_at_the_first_strategy_that_matches():
+    page = (b'<article><a href="/a">An article headline</a></article>'
+            b'<a href="/press/1">Press release link</a><article><a href="/b">Short</a></article>')
+    items = get_registry().default.parse(page, "https://example.com/", "Example")
+    # Titles under min_title_length are dropped and later strategies never run
+    assert [item["url"] for item in items] == ["https://example.com/a"]
+
+
+def test_registries_load_from_any_spec_file(tmp_path):
+    path = tmp_path / "adapters.json"
+    path.write_text(json.dumps([
+        {"name": "generic", "strategies": [{"items": "a"}]},
+        {"name": "acme", "hosts": ["Acme.com"], "limit": 1, "strategies": [{"items": "h3 a"}]},
+    ]))
+    registry = load_adapters(path)
+    assert isinstance(registry, AdapterRegistry)
+    adapter = registry.for_url("https://news.acme.com/")
+    assert adapter.name == "acme"
+    page = b'<h3><a href="/1">One</a></h3><h3><a href="/2">Two</a></h3>'
+    assert [item["title"] for item in adapter.parse(page, "https://acme.com/", "Acme")] == ["One"]
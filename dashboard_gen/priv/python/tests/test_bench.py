@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench import compare
+from server import FIXTURES_DIR, Faults, FixtureServer, fixture_urls, mount
+
+
+def test_every_recorded_fixture_is_on_disk():
+    entries = fixture_urls()
+    assert entries
+    assert all((FIXTURES_DIR / entry["file"]).is_file() for entry in entries)
+
+
+def test_regressions_respect_direction_and_tolerance():
+    baselines = {
+        "e2e.clean.wall_s": {"value": 1.0},
+        "parse.generic.mb_per_s": {"value": 10.0},
+        "e2e.clean.requests": {"value": 40, "tolerance": 0.1},
+    }
+    assert compare({"e2e.clean.wall_s": 1.4, "parse.generic.mb_per_s": 7.5, "e2e.clean.requests": 44}, baselines) == []
+    regressed = compare({"e2e.clean.wall_s": 1.6, "parse.generic.mb_per_s": 6.5, "e2e.clean.requests": 45,
+                         "e2e.new.items": 3}, baselines)
+    assert [line.split(":")[0] for line in regressed] == [
+        "e2e.clean.requests", "e2e.clean.wall_s", "parse.generic.mb_per_s",
+    ]
+
+
+def test_stand_in_serves_fixtures_and_revalidates():
+    url = fixture_urls()[0]["url"]
+    server = FixtureServer().start()
+    try:
+        session = requests.Session()
+        mount(session, server.port)
+        first = session.get(url, timeout=5)
+        assert first.status_code == 200
+        assert first.content == (FIXTURES_DIR / fixture_urls()[0]["file"]).read_bytes()
+        again = session.get(url, headers={"If-None-Match": first.headers["ETag"]}, timeout=5)
+        assert again.status_code == 304
+        assert session.get("https://unknown.example/", timeout=5).status_code == 404
+    finally:
+        server.stop()
+
+
+def test_injected_faults_are_reproducible():
+    def statuses():
+        server = FixtureServer(faults=Faults(error_rate=0.3, throttle_rate=0.3, seed=3)).start()
+        try:
+            session = requests.Session()
+            mount(session, server.port)
+            return [session.get(fixture_urls()[0]["url"], timeout=5).status_code for _ in range(20)]
+        finally:
+            server.stop()
+
+    first = statuses()
+    assert first == statuses()
+    assert {200, 429, 500} <= set(first)
@@ -0,0 +1,29 @@
+from scrape_all import parse_args, select_companies
+
+CONFIG = {
+    "blackrock_inc": {"company": "BlackRock, Inc."},
+    "vanguard": {"company": "Vanguard"},
+    "fidelity": {"company": "Fidelity"},
+}
+
+
+def test_names_with_commas_are_selected_with_the_company_flag():
+    args = parse_args(["--company", "BlackRock, Inc.", "--companies", "fidelity,vanguard"])
+    assert args.companies == ["BlackRock, Inc.", "fidelity", "vanguard"]
+    assert select_companies(CONFIG, args.companies) == ["blackrock_inc", "vanguard", "fidelity"]
+
+
+def test_unknown_companies_are_skipped(caplog):
+    assert select_companies(CONFIG, ["Vanguard", "nobody"]) == ["vanguard"]
+    assert "nobody" in caplog.text
+    assert select_companies(CONFIG) == list(CONFIG)
+
+
+def test_shards_split_the_companies_without_overlap():
+    slugs = [f"company_{i}" for i in range(50)]
+    config = {slug: {"company": slug} for slug in slugs}
+    shards = [select_companies(config, shard=(i, 3)) for i in range(3)]
+    assert sorted(sum(shards, [])) == sorted(slugs)
+    assert all(shards)
+    # Adding a company does not move the others
+    assert select_companies({**config, "newco": {"company": "NewCo"}}, shard=(0, 3))[:len(shards[0])] == shards[0]
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from concurrency import FetchLimiter
+from deadline import Budget, DeadlineExceeded, budget_scope
+from scrape_all import scrape_all
+
+
+def _peak_in_flight(limiter, urls):
+    lock = threading.Lock()
+    in_flight = {"all": 0}
+    peaks = {"all": 0}
+
+    def fetch(url):
+        host = url.split("/")[2]
+        with limiter.slot(url):
+            with lock:
+                for key in ("all", host):
+                    in_flight[key] = in_flight.get(key, 0) + 1
+                    peaks[key] = max(peaks.get(key, 0), in_flight[key])
+            time.sleep(0.02)
+            with lock:
+                for key in ("all", host):
+                    in_flight[key] -= 1
+
+    threads = [threading.Thread(target=fetch, args=(url,)) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return peaks
+
+
+def test_slots_cap_requests_globally_and_per_host():
+    urls = [f"http://host{i % 4}.test/{i}" for i in range(16)]
+    peaks = _peak_in_flight(FetchLimiter(max_connections=3, per_host=1), urls)
+    assert peaks["all"] == 3
+    assert all(peaks[f"host{i}.test"] == 1 for i in range(4))
+
+
+def test_waiting_for_a_slot_counts_against_the_budget():
+    limiter = FetchLimiter(max_connections=1, per_host=1)
+    with limiter.slot("http://a.test/"):
+        started = time.monotonic()
+        with budget_scope(Budget(0.1)), pytest.raises(DeadlineExceeded):
+            with limiter.slot("http://a.test/"):
+                pass
+        assert time.monotonic() - started < 1
+
+
+def test_results_keep_config_order_whatever_finishes_first(site, fetch_env):
+    def press(number):
+        return b"<html><body>" + b"".join(
+            b'<article><a href="/press/%d/%d">Press release headline number %d</a></article>' % (number, i, i)
+            for i in range(2)
+        ) + b"</body></html>"
+
+    config = {
+        f"company_{n}": {"company": f"Company {n}",
+                         "press_releases": site.route(f"/press{n}", press(n), delay=0.2 if n == 0 else 0)}
+        for n in range(4)
+    }
+    events = []
+    items = scrape_all(4, config=config, sources=["press_releases"])
+    scrape_all(4, emit=events.append, config=config, sources=["press_releases"])
+    assert [item["company"] for item in items] == [f"Company {n}" for n in range(4) for _ in range(2)]
+    # Streamed records come as sources finish, so the slow first company did not hold the others up
+    finishes = [e["company"] for e in events if e["type"] == "source_finish"]
+    assert finishes[-1] == "Company 0"
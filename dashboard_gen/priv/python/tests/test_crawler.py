@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from crawler import BloomFilter, Crawler, Frontier, RobotsCache
+from ratelimit import breaker, configure_rate_limits
+
+
+def article(path: str) -> bytes:
+    return (f'<html><head><meta property="og:type" content="article"><meta property="og:title" content="T {path}">'
+            f'<meta property="article:published_time" content="2024-01-01"></head>'
+            f'<body><h1>x</h1><a href="/blog">back</a></body></html>').encode()
+
+
+@pytest.fixture
+def blog(site, fetch_env):
+    links = "".join(f'<a href="/blog/2024/post-number-one-{i}">p</a>' for i in range(3))
+    site.route("/blog", f'<html><h1>Blog</h1>{links}<a href="/blog/private/x">x</a><a href="/careers">c</a></html>'.encode())
+    for i in range(3):
+        site.route(f"/blog/2024/post-number-one-{i}", article(f"/blog/2024/post-number-one-{i}"))
+    site.route("/blog/private/x", article("/blog/private/x"))
+    site.route("/careers", article("/careers"))
+    return site
+
+
+def test_bloom_filter_remembers_what_was_added():
+    seen = BloomFilter(capacity=100)
+    assert seen.add("https://a.com/1")
+    assert not seen.add("https://a.com/1")
+    assert "https://a.com/1" in seen and "https://a.com/2" not in seen
+
+
+def test_frontier_admits_each_url_once_and_drops_past_capacity():
+    frontier = Frontier(capacity=2)
+    assert frontier.push("https://a.com/blog/page/2", 1)
+    assert not frontier.push("https://a.com/blog/page/2", 1)
+    assert frontier.push("https://a.com/blog/2024/a-long-dated-post", 1)
+    assert not frontier.push("https://a.com/blog/other", 1)
+    assert frontier.dropped == 1
+    # Dated article-looking pages are visited before listing pages
+    assert frontier.pop()[0] == "https://a.com/blog/2024/a-long-dated-post"
+
+
+def test_crawl_stays_in_scope_and_honours_robots(blog):
+    blog.route("/robots.txt", b"User-agent: *\nDisallow: /blog/private\n", content_type="text/plain")
+    crawler = Crawler("Acme", [blog.url("/blog")], max_pages=10, max_depth=2, workers=2)
+    items = crawler.crawl()
+    assert sorted(i["url"] for i in items) == [blog.url(f"/blog/2024/post-number-one-{i}") for i in range(3)]
+    assert crawler.stats["disallowed"] == 1
+    assert "/careers" not in blog.hits
+
+
+def test_missing_robots_allows_everything(blog):
+    crawler = Crawler("Acme", [blog.url("/blog")], max_pages=10, max_depth=1, workers=2)
+    assert len(crawler.crawl()) == 4
+
+
+@pytest.mark.parametrize("status", [401, 403, 500])
+def test_forbidden_or_failing_robots_disallows_the_host(blog, status):
+    blog.route("/robots.txt", status=status)
+    crawler = Crawler("Acme", [blog.url("/blog")], max_pages=10, max_depth=2, workers=2)
+    assert crawler.crawl() == []
+    assert blog.hits == ["/robots.txt"]
+
+
+def test_crawl_delay_slows_the_host(site, fetch_env):
+    site.route("/robots.txt", b"User-agent: *\nCrawl-delay: 2\n", content_type="text/plain")
+    robots = RobotsCache()
+    assert robots.allowed(site.url("/blog"))
+    from ratelimit import limiter
+    assert limiter.reserve(site.host) == 0
+    assert limiter.reserve(site.host) == pytest.approx(2, abs=0.1)
+
+
+def test_robots_probe_clears_a_breaker_trial(site, fetch_env):
+    configure_rate_limits(rate=1000, burst=1000, threshold=1, cooldown=0.01)
+    breaker.record_failure(site.host)
+    time.sleep(0.02)
+    assert RobotsCache().allowed(site.url("/blog"))
+    assert breaker.allow(site.host)
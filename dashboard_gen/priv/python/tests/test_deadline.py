@@ -0,0 +1,93 @@
+import math
+import threading
+import time
+
+import pytest
+
+from deadline import Budget, DeadlineExceeded, RunDeadline, TAIL_RESERVE, budget_scope, current_budget, remaining
+from scrape_all import FAILED, SKIPPED, scrape_all, scrape_source
+
+
+def test_child_budgets_never_outlive_their_parent():
+    parent = Budget(1)
+    assert parent.child(60).expires == parent.expires
+    assert parent.child(0.5).remaining() <= 0.5
+    assert parent.child(None).expires == parent.expires
+    assert Budget().child(2).remaining() <= 2
+    assert Budget().remaining() == math.inf and not Budget().expired()
+
+
+def test_remaining_caps_timeouts_and_raises_once_spent():
+    assert remaining(5) == 5 and remaining() is None
+    with budget_scope(Budget(2)):
+        assert remaining(10) <= 2
+        assert remaining(1) == 1
+    with budget_scope(Budget(expires=time.monotonic() - 1)):
+        with pytest.raises(DeadlineExceeded):
+            remaining(5)
+
+
+def test_budget_scope_is_per_thread_and_restored():
+    outer, inner = Budget(10), Budget(1)
+    seen = []
+    with budget_scope(outer):
+        with budget_scope(inner):
+            thread = threading.Thread(target=lambda: seen.append(current_budget()))
+            thread.start()
+            thread.join()
+            assert current_budget() is inner
+        assert current_budget() is outer
+    assert current_budget() is None and seen == [None]
+
+
+def test_sources_share_the_window_by_waves():
+    deadline = RunDeadline(10)
+    deadline.plan(4, 2)
+    window = 10 * (1 - TAIL_RESERVE)
+    first, second, third = (deadline.source_budget().remaining() for _ in range(3))
+    assert window / 2 - 0.1 < first <= window / 2
+    assert window / 2 - 0.1 < second <= window / 2
+    # The last wave gets whatever is left of the window
+    assert window - 0.1 < third <= window
+
+
+def test_a_fixed_source_budget_is_still_bounded_by_the_window():
+    assert RunDeadline(10, per_source=2).source_budget().remaining() <= 2
+    assert RunDeadline(1, per_source=30).source_budget().remaining() <= 1 - TAIL_RESERVE
+
+
+def _slow_task():
+    while True:
+        remaining(1)
+        time.sleep(0.01)
+
+
+def test_a_source_out_of_time_is_skipped():
+    deadline = RunDeadline(10, per_source=0.05)
+    events = []
+    items, _, status = scrape_source("Acme", "press_releases", _slow_task, None, events.append, deadline=deadline)
+    assert (items, status) == ([], SKIPPED)
+    assert [e["reason"] for e in events if e["type"] == "source_skipped"] == ["timeout"]
+    assert deadline.skipped[0]["source"] == "press_releases"
+
+
+def test_a_task_budget_without_a_run_deadline_is_a_plain_failure():
+    def task():
+        with budget_scope(Budget(0.05)):
+            _slow_task()
+
+    events = []
+    items, _, status = scrape_source("Acme", "press_releases", task, None, events.append)
+    assert (items, status) == ([], FAILED)
+    assert [e["type"] for e in events] == ["source_start", "source_error", "source_finish"]
+
+
+def test_sources_left_when_the_window_closes_are_not_started(monkeypatch, fetch_env):
+    monkeypatch.setattr("scrape_all.source_tasks", lambda config, sources=None: [
+        ("press_releases", _slow_task), ("youtube", list),
+    ])
+    deadline = RunDeadline(0.2, per_source=1)
+    events = []
+    assert scrape_all(1, emit=events.append, config={"acme": {"company": "Acme"}}, deadline=deadline) == []
+    assert [(e["source"], e["reason"]) for e in deadline.skipped] == [("press_releases", "timeout"),
+                                                                       ("youtube", "deadline")]
@@ -0,0 +1,36 @@
+from dedup import Deduplicator, canonical_url, simhash, url_key
+
+
+def item(url, title, content=""):
+    return {"url": url, "title": title, "content": content, "date": ""}
+
+
+def test_canonical_url_normalizes_spellings():
+    assert canonical_url("HTTPS://Example.com:443/a?b=2&utm_source=x&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("/news/1", base="https://example.com/press") == "https://example.com/news/1"
+    assert url_key("https://example.com/a/") == url_key("https://example.com/a")
+
+
+def test_kept_items_keep_their_original_url():
+    url = "https://am.jpmorgan.com/us/en/insights/story?ref=home&si=7&utm_campaign=x"
+    kept = Deduplicator().filter([item(url, "Market outlook")])
+    assert kept[0]["url"] == url
+
+
+def test_drops_url_content_and_near_duplicates():
+    dedup = Deduplicator(distance=10)
+    kept = dedup.filter([
+        item("https://example.com/a?utm_source=mail", "BlackRock launches new bond ETF for retail investors"),
+        item("https://example.com/a", "Same page, other spelling"),
+        item("https://example.com/b", "BlackRock launches new bond ETF for retail investors"),
+        item("https://example.com/c", "BlackRock launches new bond ETF for retail investors today"),
+        item("https://example.com/d", "An unrelated announcement on fund fees"),
+    ])
+    assert [i["url"] for i in kept] == ["https://example.com/a?utm_source=mail", "https://example.com/d"]
+    assert dict(dedup.dropped) == {"url": 1, "content": 1, "near_duplicate": 1}
+
+
+def test_short_titles_are_not_compared_for_near_duplicates():
+    kept = Deduplicator(distance=3).filter([item("https://e.com/1", "Video 1"), item("https://e.com/2", "Video 2")])
+    assert len(kept) == 2
+    assert simhash("Video 1")[1] == 2
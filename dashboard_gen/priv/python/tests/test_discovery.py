@@ -0,0 +1,108 @@
+import pytest
+
+from base import discover_press_endpoint, scrape_press_releases
+from discovery import (
+    FEED,
+    NOTHING,
+    SITEMAP,
+    ChannelIdCollector,
+    configure_discovery,
+    feed_links,
+    get_discovery,
+    news_children,
+    sitemap_urls,
+    under_page,
+)
+
+PAGE = b"<html><body>" + b"".join(
+    b'<article><a href="/news/%d">Press release headline number %d</a></article>' % (i, i) for i in range(3)
+) + b"</body></html>"
+RSS = (b'<?xml version="1.0"?><rss><channel><item><title>Feed item</title>'
+       b'<link>https://example.com/news/1</link><pubDate>Mon, 06 Jan 2025 00:00:00 GMT</pubDate></item>'
+       b'</channel></rss>')
+
+
+def news_sitemap(*links):
+    urls = "".join(
+        f'<url><loc>{link}</loc><news:news><news:publication_date>2025-01-0{i + 1}</news:publication_date>'
+        f'<news:title>Story {i}</news:title></news:news></url>' for i, link in enumerate(links)
+    )
+    return (f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            f'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">{urls}</urlset>').encode()
+
+
+@pytest.fixture
+def discovery(fetch_env):
+    configure_discovery(True)
+    yield get_discovery()
+    configure_discovery(False)
+
+
+def test_under_page_compares_whole_segments():
+    assert under_page("https://a.com/news/2025/story", "https://a.com/news")
+    assert under_page("https://a.com/news", "https://a.com/news/")
+    assert not under_page("https://a.com/newsletter-signup", "https://a.com/news")
+    assert not under_page("https://b.com/news/story", "https://a.com/news")
+    assert under_page("https://a.com/anything", "https://a.com/")
+
+
+def test_feed_links_and_sitemap_helpers():
+    body = (b'<html><head><link rel="alternate" type="application/rss+xml" href="/feed.rss">'
+            b'<link rel="alternate" type="text/html" href="/fr"></head></html>')
+    assert feed_links(body, "https://a.com/news") == ["https://a.com/feed.rss"]
+    robots = b"User-agent: *\nSitemap: https://a.com/news-sitemap.xml\n"
+    assert sitemap_urls(robots, "https://a.com/news") == ["https://a.com/news-sitemap.xml", "https://a.com/sitemap.xml"]
+    assert news_children(["https://a.com/pages.xml", "https://a.com/press-2025.xml"]) == ["https://a.com/press-2025.xml"]
+
+
+def test_channel_id_found_across_chunks():
+    page = ChannelIdCollector()
+    assert not page.feed(b'<html>... <link rel="canonical" href="https://www.youtube.com/chan')
+    assert page.feed(b'nel/UCabcdefghijklmnopqrstuv">')
+    assert page.channel_id == "UCabcdefghijklmnopqrstuv"
+
+
+def test_advertised_feed_needs_no_other_probes(site, discovery):
+    page = site.route("/news", b'<html><head><link rel="alternate" type="application/rss+xml" href="/press.rss">'
+                               b'</head></html>')
+    site.route("/press.rss", RSS, content_type="application/rss+xml")
+    assert discover_press_endpoint(page)[:2] == (FEED, site.url("/press.rss"))
+    assert site.hits == ["/news", "/press.rss"]
+
+
+def test_sitemaps_are_tried_before_guessed_feed_paths(site, discovery):
+    page = site.route("/news", PAGE)
+    site.route("/robots.txt", f"Sitemap: {site.url('/news-sitemap.xml')}\n".encode(), content_type="text/plain")
+    site.route("/news-sitemap.xml", news_sitemap(site.url("/news/1"), site.url("/newsletter")),
+               content_type="application/xml")
+    site.route("/news/feed", RSS, content_type="application/rss+xml")
+    assert discover_press_endpoint(page)[:2] == (SITEMAP, site.url("/news-sitemap.xml"))
+    assert "/news/feed" not in site.hits
+
+
+def test_nothing_found_is_remembered(site, discovery):
+    page = site.route("/news", PAGE)
+    kind, endpoint, body = discover_press_endpoint(page)
+    assert (kind, endpoint, body) == (NOTHING, None, PAGE)
+    probes = len(site.hits)
+    assert discover_press_endpoint(page) == (NOTHING, None, None)
+    assert len(site.hits) == probes
+
+
+def test_page_fetched_for_discovery_is_not_fetched_again(site, discovery):
+    page = site.route("/news", PAGE)
+    items = scrape_press_releases([page], "Acme")
+    assert len(items) == 3
+    assert site.hits.count("/news") == 1
+
+
+def test_probing_a_feed_does_not_shorten_later_reads(site, discovery, cache):
+    # Long enough that the one-entry probe stops reading after the first chunk
+    items = "".join(f"<item><title>Story {i}</title><link>{site.url(f'/news/{i}')}</link>"
+                    f"<description>{'x' * 2000}</description></item>" for i in range(20))
+    page = site.route("/news", b'<html><head><link rel="alternate" type="application/rss+xml" href="/press.rss">'
+                               b'</head></html>')
+    site.route("/press.rss", f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode(),
+               content_type="application/rss+xml")
+    assert len(scrape_press_releases([page], "Acme")) == 10
+    assert len(scrape_press_releases([page], "Acme")) == 10
@@ -0,0 +1,55 @@
+import time
+
+from base import _fetch_body
+from http_cache import HttpCache
+
+
+def _validated(site, path, body, etag='"v1"'):
+    """A route that answers 304 to a matching If-None-Match; ``seen`` collects the validators sent."""
+    seen = []
+
+    def respond(request_path):
+        validator = site.request_headers[-1].get("If-None-Match")
+        seen.append(validator)
+        if validator == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"ETag": etag, "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, body
+
+    return site.route(path, respond), seen
+
+
+def test_fresh_entries_are_served_without_a_request(site, cache):
+    url = site.route("/page", b"hello")
+    assert _fetch_body(url) == _fetch_body(url) == b"hello"
+    assert site.hits == ["/page"]
+    assert cache.outcomes == {"miss": 1, "hit": 1}
+
+
+def test_stale_entries_are_revalidated_and_refreshed(site, cache):
+    url, seen = _validated(site, "/page", b"hello")
+    _fetch_body(url)
+    cache.ttl = 0
+    assert _fetch_body(url) == b"hello"
+    assert seen == [None, '"v1"']
+    assert cache.outcomes == {"miss": 1, "revalidated": 1}
+    cache.ttl = 60
+    assert _fetch_body(url) == b"hello" and len(seen) == 2
+
+
+def test_validators_are_kept_and_updated(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite3")
+    cache.store("u", b"body", {"ETag": '"a"', "Last-Modified": "Mon"})
+    assert cache.get("u").conditional_headers() == {"If-None-Match": '"a"', "If-Modified-Since": "Mon"}
+    cache.refresh("u", {"ETag": '"b"'})
+    assert cache.get("u").conditional_headers() == {"If-None-Match": '"b"', "If-Modified-Since": "Mon"}
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = HttpCache(tmp_path / "cache.sqlite3", max_bytes=250)
+    for name in ("a", "b"):
+        cache.store(name, b"x" * 100, {})
+        time.sleep(0.01)
+    cache.get("a")
+    cache.store("c", b"x" * 100, {})
+    assert cache.get("a") and cache.get("c")
+    assert cache.get("b") is None
@@ -0,0 +1,70 @@
+import socket
+import time
+
+import pytest
+import requests
+
+import http_client
+from http_client import configure_client, connection_stats
+from metrics import Metrics
+
+
+@pytest.fixture
+def session():
+    yield configure_client(pool_connections=4, pool_maxsize=2)
+    configure_client()
+
+
+def _connections():
+    return connection_stats()["hosts"].get("127.0.0.1", {}).get("new_connections", 0)
+
+
+def test_sequential_requests_reuse_one_connection(site, session):
+    url = site.route("/page", b"ok")
+    before = _connections()
+    metrics = Metrics()
+    for _ in range(3):
+        with metrics.fetch(url):
+            assert session.get(url, timeout=5).content == b"ok"
+    assert _connections() - before == 1
+    assert [r.new_connections for r in metrics.fetches] == [1, 0, 0]
+
+
+def test_connection_setup_is_split_into_dns_and_connect(site, session, monkeypatch):
+    url = site.route("/page", b"ok")
+    resolve = socket.getaddrinfo
+
+    def slow_resolve(*args, **kwargs):
+        time.sleep(0.05)
+        return resolve(*args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", slow_resolve)
+    with Metrics().fetch(url) as record:
+        session.get(url, timeout=5)
+    assert record.dns_ms >= 50
+    assert 0 < record.connect_ms < 50
+    assert record.tls_ms == 0
+
+
+def test_failed_connects_are_not_counted(session):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+    before = _connections()
+    with Metrics().fetch(url) as record:
+        with pytest.raises(requests.ConnectionError):
+            session.get(url, timeout=2)
+    assert record.new_connections == 0
+    assert record.connect_ms > 0
+    assert _connections() == before
+
+
+def test_socket_options_are_restored_after_connecting(site, session):
+    url = site.route("/page", b"ok")
+    with Metrics().fetch(url):
+        session.get(url, timeout=5)
+    pools = session.get_adapter(url).poolmanager.pools
+    conns = [conn for key in pools.keys() for conn in pools[key].pool.queue if conn is not None]
+    assert [type(conn.socket_options) for conn in conns] == [list]
+    assert conns[0].socket_options == http_client.TimedHTTPConnection.default_socket_options
@@ -0,0 +1,48 @@
+import threading
+
+from metrics import Metrics, add_totals, get_metrics, metrics_scope
+from scrape_all import scrape_all
+
+
+def test_scope_routes_records_to_the_threads_collector():
+    mine, theirs = Metrics(), Metrics()
+    other_done = threading.Event()
+
+    def other():
+        with metrics_scope(theirs):
+            get_metrics().parse("u2", "a", 0.001, 1)
+        other_done.set()
+
+    with metrics_scope(mine):
+        threading.Thread(target=other).start()
+        other_done.wait(2)
+        get_metrics().parse("u1", "a", 0.001, 2)
+    assert [p.url for p in mine.parses] == ["u1"]
+    assert [p.url for p in theirs.parses] == ["u2"]
+    assert get_metrics() is not mine
+
+
+def test_scrape_all_records_into_the_callers_scope(site, fetch_env):
+    body = b"<html><body>" + b"".join(
+        b'<article><a href="/press/%d">Press release headline number %d</a></article>' % (i, i) for i in range(3)
+    ) + b"</body></html>"
+    config = {"acme": {"company": "Acme", "press_releases": site.route("/press", body)}}
+    process_wide = len(get_metrics().fetches)
+    scoped = Metrics()
+    with metrics_scope(scoped):
+        items = scrape_all(2, config=config, sources=["press_releases"])
+    assert items
+    assert [r.url for r in scoped.fetches] == [site.url("/press")]
+    assert scoped.parses and scoped.parses[0].items == len(items)
+    assert len(get_metrics().fetches) == process_wide
+
+
+def test_add_totals_keeps_counters_only():
+    m = Metrics()
+    with m.fetch("http://h/a") as record:
+        record.outcome = "miss"
+        record.bytes = 10
+    m.parse("http://h/a", "generic", 0.01, 3)
+    totals = add_totals({}, m.summary())
+    totals = add_totals(totals, m.summary())
+    assert totals == {"fetches": 2, "bytes": 20, "retries": 0, "outcomes": {"miss": 2}, "parses": 2}
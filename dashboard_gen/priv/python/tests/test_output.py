@@ -0,0 +1,55 @@
+import io
+import json
+import threading
+
+import scrape_all as scrape_all_module
+from output import NdjsonWriter, tee
+from scrape_all import main, scrape_all
+
+
+def _press(site, path, count):
+    body = b"<html><body>" + b"".join(
+        b'<article><a href="%s/%d">Press release headline number %d</a></article>' % (path.encode(), i, i)
+        for i in range(count)
+    ) + b"</body></html>"
+    return site.route(path, body)
+
+
+def test_lines_from_many_threads_never_interleave():
+    stream = io.StringIO()
+    writer = NdjsonWriter(stream)
+    threads = [threading.Thread(target=lambda n=n: [writer({"n": n, "pad": "x" * 500}) for _ in range(50)])
+               for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(records) == 400 and all(len(r["pad"]) == 500 for r in records)
+
+
+def test_tee_passes_every_record_to_each_target():
+    first, second = [], []
+    tee(first.append, second.append)({"type": "item"})
+    assert first == second == [{"type": "item"}]
+
+
+def test_streamed_sources_are_bracketed_and_nothing_is_kept(site, fetch_env):
+    config = {"acme": {"company": "Acme", "press_releases": _press(site, "/press", 3)}}
+    stream = io.StringIO()
+    assert scrape_all(2, emit=NdjsonWriter(stream), config=config, sources=["press_releases"]) == []
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["type"] for r in records] == ["source_start", "item", "item", "item", "source_finish"]
+    assert records[-1]["items"] == 3
+    assert all(r["company"] == "Acme" and r["source"] == "press_releases" for r in records)
+
+
+def test_ndjson_runs_end_with_metrics_and_run_finish(site, fetch_env, monkeypatch, capsys):
+    config = {"acme": {"company": "Acme", "press_releases": _press(site, "/press", 2)}}
+    monkeypatch.setattr(scrape_all_module, "load_config", lambda: config)
+    main(["--format", "ndjson", "--no-cache", "--no-discovery", "--sources", "press_releases"])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    types = [r["type"] for r in records]
+    assert types[-2:] == ["metrics", "run_finish"]
+    assert types.count("item") == 2
+    assert records[-2]["summary"]["fetches"] >= 1
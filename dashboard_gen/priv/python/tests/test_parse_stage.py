@@ -0,0 +1,47 @@
+import pytest
+
+import parse_stage
+from parse_stage import ParseStage, StageRetired, configure_parse_stage, parse_page, reload_parse_stage
+
+PAGE = b"<html><body>" + b"".join(
+    b'<article><a href="/press/%d">Press release headline number %d</a></article>' % (i, i) for i in range(3)
+) + b"</body></html>"
+
+
+@pytest.fixture
+def pool():
+    configure_parse_stage(1)
+    yield
+    configure_parse_stage(0)
+
+
+def titles(future):
+    return [item["title"] for item in future.result(timeout=30)]
+
+
+def test_inline_parse_without_a_pool():
+    assert parse_stage._get_stage() is None
+    assert len(titles(parse_page("generic", PAGE, "https://a.com/press", "Acme"))) == 3
+
+
+def test_pool_parse_matches_inline(pool):
+    inline = parse_stage._parse_in_worker("generic", PAGE, "https://a.com/press", "Acme")[0]
+    assert parse_page("generic", PAGE, "https://a.com/press", "Acme").result(timeout=30) == inline
+
+
+def test_retired_stage_finishes_queued_parses_and_refuses_new_ones():
+    stage = ParseStage(1)
+    queued = [stage.submit("generic", PAGE, "https://a.com/press", "Acme") for _ in range(2)]
+    stage.retire()
+    assert all(len(f.result(timeout=30)[0]) == 3 for f in queued)
+    with pytest.raises(StageRetired):
+        stage.submit("generic", PAGE, "https://a.com/press", "Acme")
+
+
+def test_parses_after_a_reload_go_to_a_fresh_pool(pool):
+    before = parse_page("generic", PAGE, "https://a.com/press", "Acme")
+    old = parse_stage._get_stage()
+    reload_parse_stage()
+    after = parse_page("generic", PAGE, "https://a.com/press", "Acme")
+    assert len(titles(before)) == len(titles(after)) == 3
+    assert parse_stage._get_stage() is not old
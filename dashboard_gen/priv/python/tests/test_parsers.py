@@ -0,0 +1,62 @@
+import pytest
+from bs4 import FeatureNotFound
+
+import parsers
+from adapters import adapter_for
+from parsers import BACKENDS, HTML_PARSER, LXML, configure_parser, make_strainer, parse_html, parser_backend
+
+PAGE = b"""<html><body><nav><a href="/press">All press releases</a></nav><ul>""" + b"".join(
+    b'<li class="article-cntnr"><a class="article-wrapper-link" href="/news/%d">'
+    b'<h2 class="title">BlackRock <b>announcement</b> %d</h2></a>'
+    b'<div class="attribution-text"><span>Jan %d, 2025</span></div></li>' % (i, i, i + 1)
+    for i in range(3)
+) + b"</ul></body></html>"
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    backend = parser_backend()
+    yield
+    configure_parser(backend)
+
+
+def _items(backend):
+    configure_parser(backend)
+    return adapter_for("https://www.blackrock.com/").parse(PAGE, "https://www.blackrock.com/", "BlackRock")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_every_backend_extracts_the_same_items(backend):
+    items = _items(backend)
+    assert [(i["url"], i["date"]) for i in items] == [
+        (f"https://www.blackrock.com/news/{i}", f"Jan {i + 1}, 2025") for i in range(3)
+    ]
+    # Nested title markup comes out as BeautifulSoup's get_text(strip=True) has it
+    assert items == _items(HTML_PARSER)
+
+
+def test_unknown_backends_are_rejected():
+    with pytest.raises(ValueError):
+        configure_parser("html5lib")
+
+
+@pytest.mark.parametrize("spec", ["li", ["li", "p"], {"name": "li", "attrs": {"class": "article-cntnr"}}])
+def test_strainers_build_only_the_declared_parts(spec):
+    soup = parse_html(PAGE, make_strainer(spec))
+    assert soup.find("nav") is None
+    assert len(soup.find_all("li")) == 3
+    assert make_strainer(None) is None and make_strainer([]) is None
+
+
+def test_missing_lxml_falls_back_to_html_parser(monkeypatch):
+    configure_parser(LXML)
+    real = parsers.BeautifulSoup
+
+    def without_lxml(body, features, **kwargs):
+        if features == LXML:
+            raise FeatureNotFound(features)
+        return real(body, features, **kwargs)
+
+    monkeypatch.setattr(parsers, "BeautifulSoup", without_lxml)
+    assert parse_html(PAGE).find("h2").get_text() == "BlackRock announcement 0"
+    assert parser_backend() == HTML_PARSER
@@ -0,0 +1,180 @@
+import time
+
+import pytest
+
+from base import _fetch_body, _probe
+from deadline import Budget, DeadlineExceeded, budget_scope
+from ratelimit import (
+    CircuitBreaker,
+    HostRateLimiter,
+    Requeue,
+    RetryLater,
+    breaker,
+    configure_rate_limits,
+    parse_retry_after,
+    requeue_scope,
+)
+
+
+def _half_open(host: str) -> None:
+    """Open the shared breaker for ``host`` with a cool-down that has already passed."""
+    configure_rate_limits(rate=1000, burst=1000, threshold=1, cooldown=0.01)
+    breaker.record_failure(host)
+    time.sleep(0.02)
+
+
+def test_breaker_opens_after_threshold_and_lets_one_trial_through():
+    b = CircuitBreaker(threshold=2, cooldown=0.05)
+    b.record_failure("h")
+    assert b.allow("h")
+    b.record_failure("h")
+    assert not b.allow("h")
+    time.sleep(0.06)
+    assert b.allow("h")
+    assert not b.allow("h")
+    b.record_success("h")
+    assert b.allow("h") and b.open_hosts() == {}
+
+
+def test_failed_trial_reopens_the_circuit():
+    b = CircuitBreaker(threshold=1, cooldown=0.05)
+    b.record_failure("h")
+    time.sleep(0.06)
+    assert b.allow("h")
+    b.record_failure("h")
+    assert not b.allow("h")
+
+
+def test_release_only_frees_the_calling_threads_trial():
+    import threading
+
+    b = CircuitBreaker(threshold=1, cooldown=0)
+    b.record_failure("h")
+    assert b.allow("h")
+    other = threading.Thread(target=b.release, args=("h",))
+    other.start()
+    other.join()
+    assert not b.allow("h")
+    b.release("h")
+    assert b.allow("h")
+
+
+def test_trial_ending_in_404_frees_the_host(site, fetch_env):
+    url = site.route("/missing", status=404)
+    _half_open(site.host)
+    assert _fetch_body(url, retries=1) is None
+    assert breaker.allow(site.host)
+
+
+def test_trial_hitting_the_deadline_frees_the_host(site, fetch_env):
+    url = site.route("/slow", b"late", delay=1.0)
+    _half_open(site.host)
+    with budget_scope(Budget(0.2)), pytest.raises(DeadlineExceeded):
+        _fetch_body(url, retries=1)
+    assert breaker.allow(site.host)
+
+
+def test_probe_trial_records_its_verdict(site, fetch_env):
+    ok = site.route("/robots.txt", b"User-agent: *\n", content_type="text/plain")
+    missing = site.route("/feed", status=404)
+    failing = site.route("/rss", status=503)
+
+    _half_open(site.host)
+    assert _probe(missing) is None
+    assert breaker.allow(site.host)
+
+    _half_open(site.host)
+    assert _probe(failing) is None
+    assert not breaker.allow(site.host)
+
+    _half_open(site.host)
+    assert _probe(ok) == b"User-agent: *\n"
+    assert site.host not in breaker.open_hosts()
+
+
+def test_reserve_books_slots_on_the_host_timeline():
+    limiter = HostRateLimiter(rate=10, burst=2)
+    assert limiter.reserve("h") == 0
+    assert limiter.reserve("h") == 0
+    assert limiter.reserve("h") == pytest.approx(0.1, abs=0.02)
+    assert limiter.reserve("other") == 0
+    limiter.pause("other", 5)
+    assert limiter.reserve("other") == pytest.approx(5, abs=0.1)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470) == pytest.approx(10)
+    assert parse_retry_after("soon") is None
+
+
+
+PRESS = b"<html><body>" + b"".join(
+    b'<article><a href="/press/%d">Press release headline number %d</a></article>' % (i, i) for i in range(3)
+) + b"</body></html>"
+
+
+def _unavailable_once(body: bytes, retry_after: str = "2"):
+    """A route answering 503 with Retry-After the first time and ``body`` afterwards."""
+    calls = []
+
+    def route(path):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return 503, {"Retry-After": retry_after}, b""
+        return 200, {"Content-Type": "text/html"}, body
+    return route, calls
+
+
+def test_requeued_fetch_resumes_without_repeating_finished_ones(site, fetch_env):
+    from scrape_all import SourceRun, scrape_source
+
+    site.route("/a", b"first")
+    route, calls = _unavailable_once(b"second")
+    site.route("/b", route)
+    bodies = []
+
+    def task():
+        bodies.append((_fetch_body(site.url("/a")), _fetch_body(site.url("/b"))))
+        return []
+
+    run, events = SourceRun(), []
+    with pytest.raises(RetryLater) as waiting:
+        scrape_source("Acme", "press_releases", task, None, events.append, run=run)
+    assert 1.5 <= waiting.value.delay <= 2
+    time.sleep(waiting.value.delay)
+    assert scrape_source("Acme", "press_releases", task, None, events.append, run=run)[2] == "ok"
+    assert bodies == [(b"first", b"second")]
+    assert site.hits.count("/a") == 1
+    assert [e["type"] for e in events] == ["source_start", "source_finish"]
+
+
+def test_short_waits_are_slept_not_requeued(site, fetch_env):
+    route, _ = _unavailable_once(b"ok", retry_after="0")
+    url = site.route("/b", route)
+    with requeue_scope(Requeue(min_wait=5)):
+        assert _fetch_body(url, delay=0.01) == b"ok"
+
+
+def test_a_waiting_source_gives_its_thread_to_the_next_one(site, fetch_env):
+    from conftest import LocalSite
+    from scrape_all import scrape_all
+
+    other = LocalSite()
+    try:
+        route, calls = _unavailable_once(PRESS)
+        config = {
+            "slow": {"company": "Slow", "press_releases": site.route("/press", route)},
+            "fast": {"company": "Fast", "press_releases": other.route("/press", PRESS)},
+        }
+        events = []
+        started = time.monotonic()
+        scrape_all(1, emit=events.append, config=config, sources=["press_releases"])
+    finally:
+        other.close()
+    finished = [(e["company"], e["items"]) for e in events if e["type"] == "source_finish"]
+    assert finished == [("Fast", 3), ("Slow", 3)]
+    assert [e["company"] for e in events if e["type"] == "source_start"] == ["Slow", "Fast"]
+    # The single pool thread served Fast while Slow waited out its Retry-After
+    assert calls[1] - calls[0] >= 2
+    assert time.monotonic() - started < 4
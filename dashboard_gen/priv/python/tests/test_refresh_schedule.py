@@ -0,0 +1,94 @@
+import pytest
+
+from refresh_schedule import BACKOFF, HOUR, INITIAL_INTERVAL, MINUTE, RefreshSchedule, items_signature
+from scrape_all import scrape_all
+
+T0 = 1_700_000_000.0
+
+
+def items(*ns):
+    return [{"url": f"https://example.com/news/{n}", "title": f"Item {n}"} for n in ns]
+
+
+@pytest.fixture
+def schedule(tmp_path):
+    s = RefreshSchedule(tmp_path / "schedule.sqlite3", min_interval=15 * MINUTE, max_interval=24 * HOUR)
+    yield s
+    s.close()
+
+
+def test_unknown_sources_are_due(schedule):
+    assert schedule.is_due("Acme", "press", now=T0)
+    assert schedule.state() == []
+
+
+def test_unchanged_sources_back_off(schedule):
+    first = schedule.record("Acme", "press", items(1, 2), now=T0)
+    assert first == T0 + INITIAL_INTERVAL / 2
+    second = schedule.record("Acme", "press", items(2, 1), now=first)
+    assert second - first == pytest.approx(INITIAL_INTERVAL * BACKOFF / 2)
+    assert not schedule.is_due("Acme", "press", now=first + 1)
+    assert schedule.is_due("Acme", "press", now=second)
+
+
+def test_changes_pull_the_interval_towards_the_publish_gap(schedule):
+    due = schedule.record("Acme", "press", items(1), now=T0)
+    for n in range(2, 8):
+        due = schedule.record("Acme", "press", items(n), now=T0 + (n - 1) * 20 * MINUTE)
+    state = schedule.state(now=due)[0]
+    assert state["changes"] == 6 and state["due"]
+    assert 20 * MINUTE < state["publish_interval_s"] < INITIAL_INTERVAL
+
+
+def test_failures_retry_at_the_minimum_interval_and_keep_the_estimate(schedule):
+    schedule.record("Acme", "press", items(1), now=T0)
+    assert schedule.record("Acme", "press", [], failed=True, now=T0 + 10) == T0 + 10 + 15 * MINUTE
+    state = schedule.state(now=T0)[0]
+    assert state["failures"] == 1 and state["publish_interval_s"] == INITIAL_INTERVAL
+
+
+def test_empty_results_back_off_like_unchanged_ones(schedule):
+    due = schedule.record("Acme", "press", items(1), now=T0)
+    quiet = schedule.record("Acme", "press", [], now=due)
+    assert quiet - due == pytest.approx(INITIAL_INTERVAL * BACKOFF / 2)
+    again = schedule.record("Acme", "press", [], now=quiet)
+    assert again - quiet > quiet - due
+    state = schedule.state(now=again)[0]
+    assert state["failures"] == 0 and state["changes"] == 0
+    # The listing from before the quiet spell is still what a change is measured against
+    schedule.record("Acme", "press", items(1), now=again)
+    assert schedule.state(now=again)[0]["changes"] == 0
+
+
+def test_stub_and_unconfigured_sources_stay_out_of_the_schedule(schedule, site, fetch_env):
+    config = {"acme": {"company": "Acme", "twitter": "https://x.com/acme", "linkedin": "https://linkedin.com/acme"}}
+    schedule.record("Acme", "twitter", [], failed=True, now=T0)
+    scrape_all(1, config=config, schedule=schedule)
+    assert schedule.state() == []
+
+
+def test_intervals_are_clamped(tmp_path):
+    s = RefreshSchedule(tmp_path / "s.sqlite3", min_interval=HOUR, max_interval=2 * HOUR)
+    due = s.record("Acme", "press", items(1), now=T0)
+    for _ in range(10):
+        due = s.record("Acme", "press", items(1), now=due)
+    assert s.state(now=due)[0]["publish_interval_s"] == 4 * HOUR
+
+
+def test_signature_ignores_order_and_tracking_params():
+    assert items_signature(items(1, 2)) == items_signature(items(2, 1))
+    tracked = [{"url": "https://example.com/news/1?utm_source=x"}, {"url": "https://example.com/news/2"}]
+    assert items_signature(tracked) == items_signature(items(1, 2))
+
+
+def test_due_only_skips_sources_not_due(schedule, site, fetch_env):
+    page = b"<html><body><article><a href='/press/1'>Press release headline number one</a></article></body></html>"
+    config = {"acme": {"company": "Acme", "press_releases": site.route("/press", page)}}
+    events = []
+    scrape_all(1, emit=events.append, config=config, sources=["press_releases"], schedule=schedule, due_only=True)
+    assert [e["type"] for e in events].count("item") == 1
+    events.clear()
+    scrape_all(1, emit=events.append, config=config, sources=["press_releases"], schedule=schedule, due_only=True)
+    assert [e["type"] for e in events] == ["source_skipped"]
+    assert events[0]["reason"] == "not_due"
+    assert site.hits == ["/press"]
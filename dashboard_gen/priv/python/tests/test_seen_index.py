@@ -0,0 +1,73 @@
+from seen_index import SeenIndex
+
+
+def item(n, title=None):
+    return {"url": f"https://example.com/news/{n}", "title": title or f"Item {n}", "content": "", "date": ""}
+
+
+def test_only_new_or_changed_items_pass_after_commit(tmp_path):
+    path = tmp_path / "seen.sqlite3"
+    index = SeenIndex(path)
+    assert len(index.filter_new("Acme", "press", [item(1), item(2)])) == 2
+    index.commit()
+    index.close()
+
+    index = SeenIndex(path)
+    fresh = index.filter_new("Acme", "press", [item(1), item(2, "Item 2, revised"), item(3)])
+    assert [i["title"] for i in fresh] == ["Item 2, revised", "Item 3"]
+    index.commit()
+    marks = index.watermarks()
+    assert [(m["company"], m["source"], m["new_items"]) for m in marks] == [("Acme", "press", 2)]
+    index.close()
+
+
+def test_repeated_item_within_one_run_passes_once(tmp_path):
+    index = SeenIndex(tmp_path / "seen.sqlite3")
+    assert len(index.filter_new("Acme", "press", [item(1), item(1)])) == 1
+
+
+def test_rollback_forgets_undelivered_items(tmp_path):
+    path = tmp_path / "seen.sqlite3"
+    index = SeenIndex(path)
+    index.filter_new("Acme", "press", [item(1)])
+    index.prepare()
+    index.rollback()
+    index.close()
+    assert len(SeenIndex(path).filter_new("Acme", "press", [item(1)])) == 1
+
+
+def test_one_index_never_commits_anothers_writes(tmp_path):
+    path = tmp_path / "seen.sqlite3"
+    first, second = SeenIndex(path), SeenIndex(path)
+    first.filter_new("Acme", "press", [item(1)])
+    second.filter_new("Acme", "youtube", [item(2)])
+    second.commit()
+    first.rollback()
+    first.close()
+    second.close()
+
+    check = SeenIndex(path)
+    assert len(check.filter_new("Acme", "press", [item(1)])) == 1
+    assert check.filter_new("Acme", "youtube", [item(2)]) == []
+
+
+def test_watermarks_include_the_run_once_prepared(tmp_path):
+    index = SeenIndex(tmp_path / "seen.sqlite3")
+    index.filter_new("Acme", "press", [item(1), item(2)])
+    assert index.watermarks() == []
+    index.prepare()
+    assert index.watermarks()[0]["high_water_mark"] == 2
+    index.commit()
+
+
+def test_a_re_rendered_date_or_metric_is_not_a_change(tmp_path):
+    path = tmp_path / "seen.sqlite3"
+    index = SeenIndex(path)
+    index.filter_new("Acme", "press", [{**item(1), "date": "2 hours ago", "views": 10}])
+    index.commit()
+    index.close()
+
+    index = SeenIndex(path)
+    assert index.filter_new("Acme", "press", [{**item(1), "date": "2024-01-01T08:00:00Z", "views": 99}]) == []
+    assert len(index.filter_new("Acme", "press", [{**item(1), "content": "Updated body"}])) == 1
+    index.close()
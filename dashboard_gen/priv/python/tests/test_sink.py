@@ -0,0 +1,100 @@
+import json
+import subprocess
+import sys
+from datetime import timezone
+from pathlib import Path
+
+import pytest
+
+from sink import PartitionedSink, item_timestamp, load_manifest, read_items, rebuild_manifest, summary
+
+
+def item(n, date):
+    return {"title": f"Item {n}", "url": f"https://example.com/{n}", "content": "", "date": date}
+
+
+@pytest.fixture
+def store(tmp_path):
+    sink = PartitionedSink(tmp_path)
+    sink({"type": "item", "company": "BlackRock, Inc.", "source": "press_releases", "data": item(1, "2025-01-02T10:00:00Z")})
+    sink({"type": "item", "company": "BlackRock, Inc.", "source": "press_releases", "data": item(2, "2025-01-02T18:00:00Z")})
+    sink({"type": "item", "company": "BlackRock, Inc.", "source": "youtube", "data": item(3, "Jan 05, 2025")})
+    sink({"type": "item", "company": "Vanguard", "source": "press_releases", "data": item(4, "Mon, 06 Jan 2025 09:00:00 GMT")})
+    sink({"type": "source_done", "company": "Vanguard", "source": "press_releases"})
+    sink.commit()
+    return tmp_path
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-01-02T10:00:00Z", "2025-01-02T10:00:00+00:00"),
+    ("2025-01-02", "2025-01-02T00:00:00+00:00"),
+    ("Mon, 06 Jan 2025 09:00:00 GMT", "2025-01-06T09:00:00+00:00"),
+    ("Jan 05, 2025", "2025-01-05T00:00:00+00:00"),
+    ("01/07/2025", "2025-01-07T00:00:00+00:00"),
+])
+def test_item_timestamp_reads_the_date_spellings_scrapers_emit(value, expected):
+    assert item_timestamp(value).astimezone(timezone.utc).isoformat() == expected
+
+
+@pytest.mark.parametrize("value", ["", None, "2 hours ago"])
+def test_item_timestamp_is_none_for_missing_or_relative_dates(value):
+    assert item_timestamp(value) is None
+
+
+def test_items_are_partitioned_by_company_source_and_day(store):
+    files = sorted(str(p.relative_to(store)) for p in store.glob("*/*/*.jsonl"))
+    assert files == [
+        "blackrock_inc/press_releases/2025-01-02.jsonl",
+        "blackrock_inc/youtube/2025-01-05.jsonl",
+        "vanguard/press_releases/2025-01-06.jsonl",
+    ]
+    entry = load_manifest(store)["partitions"]["blackrock_inc/press_releases/2025-01-02"]
+    assert entry["items"] == 2
+    assert entry["first_item"] == "2025-01-02T10:00:00+00:00"
+    assert entry["last_item"] == "2025-01-02T18:00:00+00:00"
+    assert entry["bytes"] == (store / entry["path"]).stat().st_size
+
+
+def test_a_second_batch_is_folded_into_the_manifest(store):
+    sink = PartitionedSink(store)
+    sink.write("Vanguard", "press_releases", item(5, "2025-01-06T20:00:00Z"))
+    sink.commit()
+    entry = load_manifest(store)["partitions"]["vanguard/press_releases/2025-01-06"]
+    assert (entry["items"], entry["last_item"]) == (2, "2025-01-06T20:00:00+00:00")
+
+
+def test_read_items_opens_only_matching_partitions(store):
+    assert [i["title"] for i in read_items(store, company="BlackRock, Inc.")] == ["Item 3", "Item 1", "Item 2"]
+    assert [i["title"] for i in read_items(store, source="press_releases", since="2025-01-03")] == ["Item 4"]
+    assert [i["title"] for i in read_items(store, until="2025-01-02")] == ["Item 1", "Item 2"]
+    assert len(list(read_items(store, limit=2))) == 2
+    assert all("scraped_at" in i for i in read_items(store))
+
+
+def test_rebuild_recovers_the_committed_manifest(store):
+    committed = load_manifest(store)["partitions"]
+    (store / "manifest.json").unlink()
+    assert rebuild_manifest(store)["partitions"] == committed
+    assert [(t["company"], t["source"], t["items"], t["partitions"]) for t in summary(load_manifest(store))] == [
+        ("blackrock_inc", "press_releases", 2, 1),
+        ("blackrock_inc", "youtube", 1, 1),
+        ("vanguard", "press_releases", 1, 1),
+    ]
+
+
+def test_undated_items_land_in_the_day_they_were_scraped(tmp_path):
+    sink = PartitionedSink(tmp_path)
+    sink.write("Acme", "website", item(1, "2 hours ago"))
+    sink.commit()
+    (entry,) = load_manifest(tmp_path)["partitions"].values()
+    assert entry["first_item"] == entry["first_written"]
+
+
+def test_query_cli_does_not_load_the_scraping_stack(store):
+    scrapers = Path(__file__).resolve().parent.parent / "scrapers"
+    code = ("import json, sys, sink; sink.main(sys.argv[1:]); "
+            "print(json.dumps(sorted(m for m in ('base', 'requests', 'bs4') if m in sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code, str(store), "query", "--company", "vanguard"],
+                         cwd=scrapers, capture_output=True, text=True, check=True).stdout.splitlines()
+    assert json.loads(out[0])["title"] == "Item 4"
+    assert json.loads(out[-1]) == []
@@ -0,0 +1,56 @@
+import pytest
+
+import base
+from base import _fetch_body
+from parsers import FeedCollector
+
+
+def rss(count: int, padding: int = 0) -> bytes:
+    items = "".join(
+        f"<item><title>Story {i}</title><link>https://example.com/news/{i}</link>"
+        f"<description>{'x' * padding}</description></item>" for i in range(count)
+    )
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+
+
+def test_feed_collector_stops_at_its_limit_across_chunks():
+    body = rss(20)
+    feed = FeedCollector(3)
+    chunks = [body[i:i + 64] for i in range(0, len(body), 64)]
+    read = next(n for n, chunk in enumerate(chunks, 1) if feed.feed(chunk))
+    assert read < len(chunks) // 2
+    assert [e["title"] for e in feed.entries] == ["Story 0", "Story 1", "Story 2"]
+    assert feed.entries[0]["link"] == "https://example.com/news/0"
+
+
+def test_feed_collector_reads_atom_links_and_resets():
+    feed = FeedCollector(5)
+    feed.feed(b'<feed xmlns="http://www.w3.org/2005/Atom"><entry><title>A</title>'
+              b'<link rel="enclosure" href="https://a.com/a.mp3"/><link href="https://a.com/a"/>'
+              b'<published>2025-01-01</published></entry></feed>')
+    assert feed.entries == [{"title": "A", "link": "https://a.com/a", "date": "2025-01-01", "content": ""}]
+    feed.reset()
+    assert feed.entries == []
+
+
+def test_stopping_early_downloads_less(site, fetch_env):
+    url = site.route("/feed.xml", rss(200, padding=500), content_type="application/rss+xml")
+    feed = FeedCollector(2)
+    body = _fetch_body(url, sink=feed)
+    assert len(feed.entries) == 2
+    assert len(body) < len(rss(200, padding=500))
+
+
+def test_a_body_cut_short_is_not_cached(site, cache):
+    url = site.route("/feed.xml", rss(200, padding=500), content_type="application/rss+xml")
+    _fetch_body(url, sink=FeedCollector(2))
+    assert cache.get(url) is None
+    full = _fetch_body(url)
+    assert cache.get(url).body == full == rss(200, padding=500)
+
+
+def test_a_body_over_the_size_cap_is_not_cached(site, cache, monkeypatch):
+    monkeypatch.setattr(base, "MAX_RESPONSE_BYTES", 1024)
+    url = site.route("/big", b"x" * 100_000)
+    assert len(_fetch_body(url)) < 100_000
+    assert cache.get(url) is None
@@ -0,0 +1,124 @@
+import io
+import json
+import time
+
+import pytest
+
+import worker
+from worker import ScraperWorker
+
+PRESS = b"<html><body>" + b"".join(
+    b'<article><a href="/press/%d">Press release headline number %d</a></article>' % (i, i) for i in range(3)
+) + b"</body></html>"
+
+
+@pytest.fixture
+def local_config(site, fetch_env, monkeypatch):
+    config = {"acme": {"company": "Acme", "press_releases": site.route("/press", PRESS)}}
+    monkeypatch.setattr(worker, "load_config", lambda: config)
+    return config
+
+
+def serve(lines, **kwargs):
+    out = io.StringIO()
+    server = ScraperWorker(2, 2, stream=out, **kwargs)
+    server.serve([json.dumps(line) + "\n" if isinstance(line, dict) else line for line in lines])
+    return server, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def by_type(records, kind):
+    return [r for r in records if r["type"] == kind]
+
+
+def test_done_reports_the_requests_own_metrics(local_config):
+    server, records = serve([
+        {"id": "1", "op": "scrape_all", "sources": ["press_releases"]},
+    ])
+    done = by_type(records, "done")[0]
+    assert done["items"] == 3
+    assert done["metrics"]["fetches"] == 1
+    assert done["metrics"]["adapters"]
+    assert server.totals["fetches"] == 1
+
+    _, again = serve([{"id": "2", "op": "scrape_all", "sources": ["press_releases"]}])
+    assert by_type(again, "done")[0]["metrics"]["fetches"] == 1
+
+
+def test_health_keeps_totals_not_records(local_config):
+    server = ScraperWorker(2, 2, stream=io.StringIO())
+    for request_id in ("1", "2"):
+        server._dispatch({"id": request_id, "op": "scrape_all", "sources": ["press_releases"]}, lambda event: None)
+    health = server.health()
+    assert health["metrics"]["totals"]["fetches"] == 2
+    assert health["metrics"]["last_request"]["fetches"] == 1
+
+
+@pytest.mark.parametrize("request_line, message", [
+    ({"op": "scrape_all", "sources": "youtube"}, "sources must be a list"),
+    ({"op": "scrape_all", "sources": ["press_releases", "rss"]}, "unknown source(s) rss"),
+    ({"op": "scrape_all", "deadline": "soon"}, "deadline must be a number"),
+    ({"op": "scrape_all", "deadline": True}, "deadline must be a number"),
+    ({"op": "scrape_all", "deadline": -5}, "deadline must be positive"),
+    ({"op": "scrape_all", "incremental": "yes"}, "incremental must be true or false"),
+    ({"op": "scrape_company"}, "scrape_company needs a company"),
+    ({"op": "scrape_company", "company": 7}, "company must be a string"),
+])
+def test_invalid_fields_get_a_protocol_error(request_line, message):
+    server, records = serve([{"id": "x", **request_line}])
+    assert records[-1]["type"] == "error" and records[-1]["id"] == "x"
+    assert message in records[-1]["error"]
+    assert server.served == server.failed == 0
+
+
+def test_incremental_requests_commit_only_their_own_delivery(local_config):
+    _, first = serve([{"id": "1", "op": "scrape_all", "sources": ["press_releases"], "incremental": True}])
+    assert by_type(first, "done")[0]["items"] == 3
+    assert by_type(first, "done")[0]["watermarks"][0]["new_items"] == 3
+    _, second = serve([{"id": "2", "op": "scrape_all", "sources": ["press_releases"], "incremental": True}])
+    assert by_type(second, "done")[0]["items"] == 0
+
+
+def test_failed_request_does_not_mark_items_seen(local_config, monkeypatch):
+    real = worker.scrape_all
+
+    def deliver_then_fail(*args, **kwargs):
+        real(*args, **kwargs)
+        raise RuntimeError("stdout went away")
+
+    monkeypatch.setattr(worker, "scrape_all", deliver_then_fail)
+    _, failed = serve([{"id": "1", "op": "scrape_all", "sources": ["press_releases"], "incremental": True}])
+    assert by_type(failed, "error")[0]["error"] == "stdout went away"
+
+    monkeypatch.setattr(worker, "scrape_all", real)
+    _, retried = serve([{"id": "2", "op": "scrape_all", "sources": ["press_releases"], "incremental": True}])
+    assert by_type(retried, "done")[0]["items"] == 3
+
+
+def test_reload_while_a_scrape_is_parsing_loses_no_pages(site, fetch_env, monkeypatch):
+    from parse_stage import configure_parse_stage
+
+    # Padding makes each parse slow enough that several queue up behind one process
+    padding = b"<div><span>x</span></div>" * 5_000
+    config = {
+        f"co{i}": {"company": f"Co {i}", "press_releases": site.route(f"/press/{i}", PRESS.replace(b"</body>", padding + b"</body>"))}
+        for i in range(6)
+    }
+    monkeypatch.setattr(worker, "load_config", lambda: config)
+    configure_parse_stage(1, max_in_flight=6)
+
+    def lines():
+        yield json.dumps({"id": "scrape", "op": "scrape_all", "sources": ["press_releases"]}) + "\n"
+        while len(site.hits) < 6:
+            time.sleep(0.01)
+        yield json.dumps({"id": "reload", "op": "reload_config"}) + "\n"
+
+    out = io.StringIO()
+    try:
+        ScraperWorker(8, 2, stream=out).serve(lines())
+    finally:
+        configure_parse_stage(0)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    scrape = [r for r in records if r["id"] == "scrape"]
+    assert by_type(scrape, "source_error") == []
+    assert by_type(scrape, "done")[0]["items"] == 18
+    assert by_type([r for r in records if r["id"] == "reload"], "done")
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import scrape_all as scrape_all_module
+import youtube_metrics
+from base import attach_youtube_metrics
+from scrape_all import scrape_all
+from youtube_metrics import DAY, HOUR, MAX_TTL, YouTubeMetricsService, ttl_for
+
+NOW = 1_700_000_000.0
+
+
+def iso(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+@pytest.fixture
+def api(site):
+    """Local stand-in for videos.list that answers every requested ID (except "broken" chunks)."""
+    calls = []
+
+    def videos(path):
+        ids = parse_qs(urlsplit(path).query)["id"][0].split(",")
+        calls.append(ids)
+        if "broken" in ids:
+            return 500, {}, b""
+        items = [{"id": vid, "statistics": {"viewCount": "7"}, "snippet": {"publishedAt": iso(time.time())}}
+                 for vid in ids]
+        return 200, {"Content-Type": "application/json"}, json.dumps({"items": items}).encode()
+
+    site.route("/videos", videos)
+    return site.url("/videos"), calls
+
+
+@pytest.fixture
+def service(api, fetch_env, tmp_path):
+    return YouTubeMetricsService("key", api_url=api[0], cache_path=tmp_path / "yt.sqlite3")
+
+
+@pytest.mark.parametrize("age, ttl", [(HOUR, HOUR), (10 * DAY, 12 * HOUR), (100 * DAY, 3 * DAY), (900 * DAY, MAX_TTL)])
+def test_newer_videos_are_refreshed_sooner(age, ttl):
+    assert ttl_for(iso(NOW - age), now=NOW) == ttl
+    assert ttl_for("", now=NOW) == ttl_for("not a date", now=NOW) == HOUR
+
+
+def test_ids_are_deduplicated_and_chunked(service, api):
+    ids = [f"v{i}" for i in range(120)]
+    metrics = service.fetch(ids + ids[:10] + [""])
+    assert len(metrics) == 120 and metrics["v0"]["view_count"] == 7
+    assert sorted(len(chunk) for chunk in api[1]) == [20, 50, 50]
+    assert service.api_calls == 3
+
+
+def test_cached_ids_skip_the_api(service, api):
+    service.fetch(["a", "b"])
+    assert service.fetch(["a", "b", "c"]).keys() == {"a", "b", "c"}
+    assert api[1] == [["a", "b"], ["c"]]
+    assert service.cache_hits == 2
+
+
+def test_a_failed_chunk_loses_only_its_own_ids(service, api, monkeypatch):
+    monkeypatch.setattr(youtube_metrics, "MAX_IDS_PER_CALL", 2)
+    metrics = service.fetch(["a", "b", "broken", "c"])
+    assert metrics.keys() == {"a", "b"}
+    # Nothing was cached for the failed chunk, so it is asked for again
+    service.fetch(["broken", "c"])
+    assert api[1][-1] == ["broken", "c"]
+
+
+def test_metrics_are_merged_into_youtube_items(service, monkeypatch):
+    monkeypatch.setattr("base.get_metrics_service", lambda api_key=None: service)
+    items = [
+        {"source": "social_media", "url": "https://www.youtube.com/watch?v=abc"},
+        {"source": "social_media", "url": "https://www.youtube.com/shorts/abc"},
+        {"source": "press_release", "url": "https://example.com/abc"},
+    ]
+    attach_youtube_metrics(items)
+    assert [item.get("view_count") for item in items] == [7, 7, None]
+
+
+def _video(company):
+    return [{"source": "social_media", "company": company, "date": "", "title": "Video",
+             "content": "", "url": "https://www.youtube.com/watch?v=abc"}]
+
+
+@pytest.fixture
+def two_sources(monkeypatch, fetch_env):
+    """A company whose YouTube feed is instant and whose press page takes until released."""
+    release = threading.Event()
+
+    def slow_press():
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(scrape_all_module, "source_tasks", lambda config, sources=None: [
+        ("youtube", lambda: _video(config["company"])), ("press_releases", slow_press),
+    ])
+    events = []
+
+    def emit(event):
+        events.append(event)
+        if event["type"] == "item":
+            release.set()
+    return {"acme": {"company": "Acme"}}, events, emit, release
+
+
+def test_without_an_api_key_youtube_items_stream_immediately(two_sources, monkeypatch):
+    config, events, emit, release = two_sources
+    monkeypatch.delenv("YOUTUBE_API_KEY", raising=False)
+    scrape_all(2, emit=emit, config=config)
+    finishes = [e["source"] for e in events if e["type"] == "source_finish"]
+    assert finishes == ["youtube", "press_releases"]
+
+
+def test_with_an_api_key_youtube_items_wait_for_the_batch(two_sources, monkeypatch):
+    config, events, emit, release = two_sources
+    monkeypatch.setenv("YOUTUBE_API_KEY", "key")
+    monkeypatch.setattr(YouTubeMetricsService, "fetch", lambda self, ids: {})
+    threading.Timer(0.2, release.set).start()
+    scrape_all(2, emit=emit, config=config)
+    finishes = [e["source"] for e in events if e["type"] == "source_finish"]
+    assert finishes == ["press_releases", "youtube"]